@@ -1,51 +1,289 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from pathlib import Path
 import requests
+import hashlib
 import time
 import logging
-from pathlib import Path
+import os
 
 logger = logging.getLogger(__name__)
 
 class ArquivoDownloader:
-    """Responsável por fazer download de arquivos via URL"""
-    
+    """
+    Responsável por fazer download de arquivos via URL.
+    Downloads são retomados (HTTP Range) após falhas, podem ser feitos em segmentos paralelos,
+    são verificados por SHA-256 (quando conhecido) e só substituem o destino ao final (rename atômico)
+    """
+
+    # Constantes
+    TAMANHO_BLOCO = 1024 * 1024  # 1 MB
+    TAMANHO_MINIMO_SEGMENTADO = 16 * 1024 * 1024  # arquivos menores são baixados com uma conexão
+    SUFIXO_PARCIAL = ".part"
+    SUFIXO_IDENTIFICADOR = ".id"  # ETag/Last-Modified do arquivo remoto ao qual o parcial pertence
+    SUFIXO_SEGMENTADO = ".seg"  # arquivo pré-alocado do download segmentado (nunca retomado)
+    TEMPO_ESPERA_TENTATIVA = 3  # segundos
+
     # Construtor
-    def __init__(self, timeout_default: int = 30):
+    def __init__(self, timeout_default: int = 30, espelhos: list[str] = None, num_segmentos: int = 1):
+        """
+        Args:
+            timeout_default (int): Tempo máximo (segundos) de cada operação de rede
+            espelhos (list[str]): URLs base de espelhos consultados antes da URL original (opcional)
+            num_segmentos (int): Número de conexões paralelas em arquivos grandes (1 desabilita)
+        """
         self.timeout_default = timeout_default
-    
+        self.espelhos = [espelho.strip().rstrip("/") for espelho in (espelhos or []) if espelho and espelho.strip()]
+        self.num_segmentos = max(1, num_segmentos)
+
+
+    @classmethod
+    def a_partir_configuracao(cls, controlador_configuracao, timeout_default: int = None) -> "ArquivoDownloader":
+        """
+        Cria um downloader com os espelhos e o número de segmentos definidos nas configurações
+
+        Args:
+            controlador_configuracao (ControladorConfiguracao): Fonte das configurações
+            timeout_default (int): Tempo máximo de cada operação de rede (padrão: requests_timeout)
+
+        Returns:
+            ArquivoDownloader: Downloader configurado
+        """
+        if timeout_default is None:
+            timeout_default = int(controlador_configuracao.obter_configuracao_segura('requests_timeout'))
+        espelhos = str(controlador_configuracao.obter_configuracao_segura('espelhos_download') or "").split(",")
+        num_segmentos = int(controlador_configuracao.obter_configuracao_segura('segmentos_download') or 1)
+        return cls(timeout_default, espelhos, num_segmentos)
+
+
+    def _urls_candidatas(self, url: str) -> list[str]:
+        """
+        URLs em ordem de preferência: cada espelho (URL base + caminho original) e a URL original
 
-    def baixar_arquivo(self, url: str, endereco_arquivo: str, timeout: int = None, max_tentativas: int = 3):
+        Args:
+            url (str): URL original
+
+        Returns:
+            list[str]: URLs a serem tentadas
+        """
+        caminho_url = urlparse(url).path
+        return [f"{espelho}{caminho_url}" for espelho in self.espelhos] + [url]
+
+
+    def baixar_arquivo(self, url: str, endereco_arquivo: str, timeout: int = None, max_tentativas: int = 3, sha256_esperado: str = None, url_checksum: str = None):
         """
         Faz download de um arquivo a partir de uma URL
-        
+
         Args:
             url (str): URL de download do arquivo
             endereco_arquivo (str): Endereço onde o arquivo será salvo
-            timeout (int): Tempo máximo para o download
-            max_tentativas (int): Número de tentativas de download
+            timeout (int): Tempo máximo de cada operação de rede
+            max_tentativas (int): Número de tentativas de download (em cada URL)
+            sha256_esperado (str): SHA-256 fixado do arquivo (opcional)
+            url_checksum (str): URL de um arquivo com o SHA-256 publicado, ex: '<hash>  <nome>' (opcional)
+
+        Raises:
+            ValueError: Se o SHA-256 do arquivo baixado não for o esperado
+            Exception: Erro de download após todas as tentativas
         """
         if not timeout:
             timeout = self.timeout_default
-            
-        num_tentativas = 0
-        while num_tentativas < max_tentativas:
+        endereco_arquivo = Path(endereco_arquivo)
+        caminho_parcial = endereco_arquivo.with_name(endereco_arquivo.name + self.SUFIXO_PARCIAL)
+
+        if not sha256_esperado and url_checksum:
+            sha256_esperado = self._obter_checksum_publicado(url_checksum, timeout)
+
+        ultimo_erro = None
+        for url_candidata in self._urls_candidatas(url):
+            num_tentativas = 0
+            while num_tentativas < max_tentativas:
+                try:
+                    logger.info(f"Tentando fazer o download de {endereco_arquivo} ({url_candidata})")
+                    self._baixar_para_arquivo_parcial(url_candidata, caminho_parcial, timeout)
+
+                    if sha256_esperado:
+                        sha256_obtido = self.calcular_sha256(caminho_parcial)
+                        if sha256_obtido.lower() != sha256_esperado.lower():
+                            caminho_parcial.unlink(missing_ok=True) # Conteúdo incorreto não deve ser retomado
+                            raise ValueError(f"SHA-256 inválido para {url_candidata}: esperado {sha256_esperado}, obtido {sha256_obtido}")
+
+                    os.replace(caminho_parcial, endereco_arquivo) # Atômico: o destino nunca fica truncado
+                    caminho_parcial.with_name(caminho_parcial.name + self.SUFIXO_IDENTIFICADOR).unlink(missing_ok=True)
+                    logger.info("Download feito com sucesso")
+                    return
+
+                except Exception as e:
+                    ultimo_erro = e
+                    num_tentativas += 1
+                    if num_tentativas < max_tentativas:
+                        logger.warning(f"Erro na tentativa {num_tentativas} de download para {url_candidata}: {e}")
+                        print(f"\rErro na tentativa {num_tentativas} de download, retomando...")
+                        time.sleep(self.TEMPO_ESPERA_TENTATIVA)
+            logger.warning(f"Falha ao tentar fazer o download de {url_candidata} após {max_tentativas} tentativas")
+            # Outra URL pode servir um arquivo diferente: não retomar o parcial desta
+            caminho_parcial.unlink(missing_ok=True)
+            caminho_parcial.with_name(caminho_parcial.name + self.SUFIXO_IDENTIFICADOR).unlink(missing_ok=True)
+
+        logger.error(f"Falha ao tentar fazer o download de {url}. Erro: {str(ultimo_erro)}")
+        raise ultimo_erro
+
+
+    def _baixar_para_arquivo_parcial(self, url: str, caminho_parcial: Path, timeout: int):
+        """
+        Baixa o arquivo para o caminho parcial, retomando o que já foi baixado
+
+        Args:
+            url (str): URL do arquivo
+            caminho_parcial (Path): Arquivo parcial (.part)
+            timeout (int): Tempo máximo de cada operação de rede
+        """
+        tamanho_total, aceita_range, identificador = self._obter_informacoes_arquivo(url, timeout)
+        caminho_identificador = caminho_parcial.with_name(caminho_parcial.name + self.SUFIXO_IDENTIFICADOR)
+        # Sobra de um download segmentado interrompido: pré-alocado, pode conter regiões não baixadas
+        caminho_parcial.with_name(caminho_parcial.name + self.SUFIXO_SEGMENTADO).unlink(missing_ok=True)
+        identificador_parcial = caminho_identificador.read_text(encoding="utf-8") if caminho_identificador.exists() else None
+
+        # Um parcial só é retomado se for da mesma versão do arquivo remoto (ETag/Last-Modified)
+        if caminho_parcial.exists() and (not identificador_parcial or (identificador and identificador != identificador_parcial)):
+            caminho_parcial.unlink()
+        if identificador:
+            caminho_identificador.write_text(identificador, encoding="utf-8")
+        identificador = identificador or identificador_parcial
+
+        if (self.num_segmentos > 1 and aceita_range and tamanho_total
+                and tamanho_total >= self.TAMANHO_MINIMO_SEGMENTADO and not caminho_parcial.exists()):
+            self._baixar_segmentado(url, caminho_parcial, tamanho_total, timeout)
+            return
+
+        tamanho_parcial = caminho_parcial.stat().st_size if caminho_parcial.exists() else 0
+        if tamanho_total and tamanho_parcial == tamanho_total:
+            return # Download completo numa tentativa anterior (ex: falha na verificação do checksum)
+        if tamanho_total and tamanho_parcial > tamanho_total:
+            caminho_parcial.unlink()
+            tamanho_parcial = 0
+
+        # Mesmo sem Accept-Ranges no HEAD, o servidor pode aceitar Range; If-Range faz o servidor
+        # responder 200 (arquivo inteiro) se o arquivo remoto mudou
+        cabecalhos = {'Range': f"bytes={tamanho_parcial}-", 'If-Range': identificador} if tamanho_parcial and identificador else {}
+        with requests.get(url, stream=True, timeout=timeout, headers=cabecalhos) as response:
+            if response.status_code == 416: # Parcial incompatível com o arquivo remoto
+                caminho_parcial.unlink(missing_ok=True)
+            response.raise_for_status()
+            retomando = response.status_code == 206
+            if tamanho_parcial and retomando:
+                logger.info(f"Retomando download a partir de {tamanho_parcial} bytes")
+            with caminho_parcial.open("ab" if retomando else "wb") as arquivo_baixado:
+                for chunk in response.iter_content(chunk_size=self.TAMANHO_BLOCO):
+                    arquivo_baixado.write(chunk)
+
+        if tamanho_total and caminho_parcial.stat().st_size != tamanho_total:
+            raise IOError(f"Download incompleto: {caminho_parcial.stat().st_size} de {tamanho_total} bytes")
+
+
+    def _obter_informacoes_arquivo(self, url: str, timeout: int) -> tuple[int|None, bool, str|None]:
+        """
+        Obtém o tamanho do arquivo, se o servidor aceita requisições parciais e a versão do arquivo (HEAD)
+
+        Returns:
+            tuple[int|None, bool, str|None]: (tamanho em bytes ou None, aceita Range, ETag/Last-Modified ou None)
+        """
+        try:
+            response = requests.head(url, allow_redirects=True, timeout=timeout)
+            if response.status_code >= 400:
+                return None, False, None
+            tamanho_total = response.headers.get('Content-Length')
+            aceita_range = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+            identificador = response.headers.get('ETag') or response.headers.get('Last-Modified')
+            return (int(tamanho_total) if tamanho_total and tamanho_total.isdigit() else None), aceita_range, identificador
+        except requests.exceptions.RequestException:
+            return None, False, None
+
+
+    def _baixar_segmentado(self, url: str, caminho_parcial: Path, tamanho_total: int, timeout: int):
+        """
+        Baixa o arquivo em segmentos paralelos (um intervalo de bytes por conexão)
+
+        Os segmentos são escritos num arquivo pré-alocado separado (.seg), que só se torna o parcial
+        ao final: um .part nunca contém regiões não baixadas e pode sempre ser retomado
+
+        Args:
+            url (str): URL do arquivo
+            caminho_parcial (Path): Arquivo parcial, criado apenas quando todos os segmentos terminam
+            tamanho_total (int): Tamanho do arquivo em bytes
+            timeout (int): Tempo máximo de cada operação de rede
+        """
+        logger.info(f"Download segmentado em {self.num_segmentos} conexões ({tamanho_total} bytes)")
+        caminho_segmentado = caminho_parcial.with_name(caminho_parcial.name + self.SUFIXO_SEGMENTADO)
+        with caminho_segmentado.open("wb") as arquivo_segmentado:
+            arquivo_segmentado.truncate(tamanho_total)
+
+        tamanho_segmento = -(-tamanho_total // self.num_segmentos)
+        intervalos = [
+            (inicio, min(inicio + tamanho_segmento, tamanho_total) - 1)
+            for inicio in range(0, tamanho_total, tamanho_segmento)
+        ]
+        try:
+            with ThreadPoolExecutor(max_workers=len(intervalos), thread_name_prefix="fut-download") as executor:
+                for futuro in [executor.submit(self._baixar_intervalo, url, caminho_segmentado, inicio, fim, timeout) for inicio, fim in intervalos]:
+                    futuro.result()
+        except BaseException:
+            # Segmentos não são retomáveis individualmente: a próxima tentativa recomeça
+            caminho_segmentado.unlink(missing_ok=True)
+            raise
+        os.replace(caminho_segmentado, caminho_parcial)
+
+
+    def _baixar_intervalo(self, url: str, caminho_segmentado: Path, inicio: int, fim: int, timeout: int):
+        """Baixa um intervalo de bytes e o escreve na posição correspondente do arquivo segmentado"""
+        posicao = inicio
+        with requests.get(url, stream=True, timeout=timeout, headers={'Range': f"bytes={inicio}-{fim}"}) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise IOError("O servidor não respeitou a requisição parcial")
+            # Cada segmento usa seu próprio descritor, escrevendo em regiões disjuntas do arquivo
+            with caminho_segmentado.open("r+b") as arquivo_segmentado:
+                arquivo_segmentado.seek(inicio)
+                for chunk in response.iter_content(chunk_size=self.TAMANHO_BLOCO):
+                    arquivo_segmentado.write(chunk)
+                    posicao += len(chunk)
+        if posicao != fim + 1:
+            raise IOError(f"Segmento incompleto: bytes {inicio}-{fim}")
+
+
+    def _obter_checksum_publicado(self, url_checksum: str, timeout: int) -> str|None:
+        """
+        Obtém o SHA-256 publicado junto ao arquivo (ex: arquivos .sha256.txt do Adoptium)
+
+        Returns:
+            str|None: SHA-256 publicado ou None se não for possível obtê-lo
+        """
+        for url_candidata in self._urls_candidatas(url_checksum):
             try:
-                logger.info(f"Tentando fazer o download de {endereco_arquivo}")
-                response = requests.get(url, stream=True, timeout=timeout)
+                response = requests.get(url_candidata, timeout=timeout)
                 response.raise_for_status()
+                checksum = response.text.strip().split()[0] if response.text.strip() else ""
+                if len(checksum) == 64:
+                    return checksum
+            except requests.exceptions.RequestException as e:
+                logger.info(f"Não foi possível obter o checksum em {url_candidata}: {e}")
+        logger.warning(f"Checksum publicado indisponível ({url_checksum}), download não será verificado")
+        return None
+
+
+    @staticmethod
+    def calcular_sha256(caminho_arquivo: Path) -> str:
+        """
+        Calcula o SHA-256 de um arquivo
+
+        Args:
+            caminho_arquivo (Path): Arquivo
 
-                endereco_arquivo = Path(endereco_arquivo)
-                with endereco_arquivo.open("wb") as arquivo_baixado:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        arquivo_baixado.write(chunk)
-                logger.info("Download feito com sucesso")
-                return 
-
-            except Exception as e:
-                num_tentativas += 1
-                if num_tentativas < max_tentativas:
-                    logger.warning(f"Erro na tentativa {num_tentativas} de download para {url}")
-                    print(f"\rErro na tentativa {num_tentativas} de download, reiniciando...")
-                    time.sleep(3)
-                else:
-                    logger.error(f"Falha ao tentar fazer o download de {url} após {max_tentativas} tentativas. Erro: {str(e)}")
-                    raise e
\ No newline at end of file
+        Returns:
+            str: SHA-256 em hexadecimal
+        """
+        hash_arquivo = hashlib.sha256()
+        with open(caminho_arquivo, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1024 * 1024), b""):
+                hash_arquivo.update(bloco)
+        return hash_arquivo.hexdigest()
@@ -0,0 +1,281 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturoTimeoutError, wait
+from pathlib import Path
+import threading
+import requests
+import hashlib
+import logging
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class BackendCacheRemoto:
+    """
+    Armazenamento compartilhado (entre máquinas de CI) dos resultados do validator_cli.
+    Aceita um servidor HTTP com GET/PUT de blobs endereçados pela chave (http:// ou https://)
+    ou um diretório compartilhado (ex: NFS).
+
+    Cada blob é um envelope JSON com o SHA-256 do OperationOutcome, verificado na leitura.
+    Leituras respeitam o timeout configurado e escritas são feitas em segundo plano,
+    de modo que um cache lento nunca torna a execução mais lenta que uma sem cache
+    """
+
+    # Constantes
+    VERSAO_ENVELOPE = 1
+    MAXIMO_FALHAS_CONSECUTIVAS = 3  # depois disso o backend é desativado até o fim da execução
+    MAXIMO_ESCRITAS_PENDENTES = 256
+    TEMPO_MAXIMO_FINALIZACAO = 10  # segundos aguardando escritas pendentes ao encerrar
+
+    # Construtor
+    def __init__(self, endereco: str, tempo_timeout_ms: int):
+        """
+        Inicializa o backend remoto
+
+        Args:
+            endereco (str): URL base do servidor HTTP ou caminho do diretório compartilhado
+            tempo_timeout_ms (int): Tempo máximo de cada operação no cache remoto (milissegundos)
+        """
+        self.endereco = endereco.strip()
+        self.eh_http = self.endereco.lower().startswith(("http://", "https://"))
+        self.tempo_timeout = max(1, tempo_timeout_ms) / 1000
+        self.acertos = 0
+        self.falhas = 0
+        self.erros = 0
+        self.blobs_corrompidos = 0
+        self.escritas = 0
+        self.desativado = False
+        self._falhas_consecutivas = 0
+        self._escritas_pendentes = set()
+        self._lock = threading.Lock()
+        self._sessao = requests.Session() if self.eh_http else None
+        # Leituras em uma thread separada: diretórios de rede podem bloquear além do timeout
+        self._executor_leitura = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fut-cache-leitura")
+        self._executor_escrita = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fut-cache-escrita")
+
+
+    @staticmethod
+    def calcular_hash(conteudo: bytes) -> str:
+        """Hash SHA-256 usado na verificação de integridade"""
+        return hashlib.sha256(conteudo).hexdigest()
+
+
+    def _montar_envelope(self, chave: str, conteudo: bytes) -> bytes:
+        """
+        Envolve o OperationOutcome com os dados de integridade
+
+        Args:
+            chave (str): Chave do resultado
+            conteudo (bytes): OperationOutcome serializado
+
+        Returns:
+            bytes: Envelope serializado
+        """
+        envelope = {
+            'versao': self.VERSAO_ENVELOPE,
+            'chave': chave,
+            'sha256': self.calcular_hash(conteudo),
+            'outcome': conteudo.decode("utf-8"),
+        }
+        return json.dumps(envelope, ensure_ascii=False).encode("utf-8")
+
+
+    def _abrir_envelope(self, chave: str, dados: bytes) -> bytes|None:
+        """
+        Verifica a integridade de um envelope
+
+        Args:
+            chave (str): Chave esperada
+            dados (bytes): Envelope lido do backend
+
+        Returns:
+            bytes|None: OperationOutcome serializado ou None se o envelope for inválido
+        """
+        try:
+            envelope = json.loads(dados)
+            conteudo = envelope['outcome'].encode("utf-8")
+            if envelope.get('versao') != self.VERSAO_ENVELOPE or envelope.get('chave') != chave:
+                return None
+            if envelope.get('sha256') != self.calcular_hash(conteudo):
+                return None
+            if json.loads(conteudo).get('resourceType') != 'OperationOutcome':
+                return None
+            return conteudo
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+
+    def _caminho_blob(self, chave: str) -> Path:
+        """Caminho do blob no diretório compartilhado (dividido por prefixo para evitar diretórios enormes)"""
+        return Path(self.endereco).expanduser() / chave[:2] / f"{chave}.json"
+
+
+    def _url_blob(self, chave: str) -> str:
+        """URL do blob no servidor HTTP"""
+        return f"{self.endereco.rstrip('/')}/{chave}"
+
+
+    def _ler_blob(self, chave: str) -> bytes|None:
+        """
+        Lê um blob do backend (None se não existir)
+
+        Raises:
+            OSError, requests.exceptions.RequestException: Erros de acesso ao backend
+        """
+        if self.eh_http:
+            resposta = self._sessao.get(self._url_blob(chave), timeout=self.tempo_timeout)
+            if resposta.status_code == 404:
+                return None
+            resposta.raise_for_status()
+            return resposta.content
+        try:
+            return self._caminho_blob(chave).read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+    def _escrever_blob(self, chave: str, dados: bytes):
+        """
+        Escreve um blob no backend
+
+        Raises:
+            OSError, requests.exceptions.RequestException: Erros de acesso ao backend
+        """
+        if self.eh_http:
+            resposta = self._sessao.put(
+                self._url_blob(chave), data=dados, timeout=self.tempo_timeout,
+                headers={'Content-Type': 'application/json'}
+            )
+            resposta.raise_for_status()
+            return
+        caminho_blob = self._caminho_blob(chave)
+        caminho_blob.parent.mkdir(parents=True, exist_ok=True)
+        caminho_temporario = caminho_blob.with_name(f"{chave}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            caminho_temporario.write_bytes(dados)
+            os.replace(caminho_temporario, caminho_blob)  # Atômico também em NFS (mesmo diretório)
+        finally:
+            caminho_temporario.unlink(missing_ok=True)
+
+
+    def _registrar_erro(self, operacao: str, erro: Exception):
+        """Contabiliza um erro e desativa o backend após falhas consecutivas"""
+        with self._lock:
+            self.erros += 1
+            self._falhas_consecutivas += 1
+            if self._falhas_consecutivas >= self.MAXIMO_FALHAS_CONSECUTIVAS and not self.desativado:
+                self.desativado = True
+                logger.warning(f"Cache remoto desativado nesta execução após {self._falhas_consecutivas} falhas consecutivas")
+        logger.info(f"Erro no cache remoto ({operacao}): {type(erro).__name__}: {erro}")
+
+
+    def _registrar_sucesso(self):
+        """Reinicia a contagem de falhas consecutivas"""
+        with self._lock:
+            self._falhas_consecutivas = 0
+
+
+    def obter(self, chave: str) -> bytes|None:
+        """
+        Busca um resultado no backend (leitura com timeout)
+
+        Args:
+            chave (str): Chave do resultado
+
+        Returns:
+            bytes|None: OperationOutcome serializado ou None (ausente, inválido, lento ou com erro)
+        """
+        if self.desativado:
+            return None
+        futuro = self._executor_leitura.submit(self._ler_blob, chave)
+        try:
+            dados = futuro.result(timeout=self.tempo_timeout)
+        except FuturoTimeoutError as e:
+            futuro.cancel()
+            self._registrar_erro("leitura", e)
+            return None
+        except (OSError, requests.exceptions.RequestException) as e:
+            self._registrar_erro("leitura", e)
+            return None
+        self._registrar_sucesso()
+
+        if dados is None:
+            with self._lock:
+                self.falhas += 1
+            return None
+        conteudo = self._abrir_envelope(chave, dados)
+        with self._lock:
+            if conteudo is None:
+                self.blobs_corrompidos += 1
+                self.falhas += 1
+            else:
+                self.acertos += 1
+        if conteudo is None:
+            logger.warning(f"Resultado do cache remoto com integridade inválida ignorado: {chave}")
+        return conteudo
+
+
+    def armazenar_em_segundo_plano(self, chave: str, conteudo: bytes):
+        """
+        Envia um resultado ao backend sem bloquear a execução dos testes
+
+        Args:
+            chave (str): Chave do resultado
+            conteudo (bytes): OperationOutcome serializado
+        """
+        with self._lock:
+            if self.desativado or len(self._escritas_pendentes) >= self.MAXIMO_ESCRITAS_PENDENTES:
+                return
+        futuro = self._executor_escrita.submit(self._armazenar, chave, conteudo)
+        with self._lock:
+            self._escritas_pendentes.add(futuro)
+        futuro.add_done_callback(self._finalizar_escrita)
+
+
+    def _armazenar(self, chave: str, conteudo: bytes):
+        """Escrita executada em segundo plano"""
+        if self.desativado:
+            return
+        try:
+            self._escrever_blob(chave, self._montar_envelope(chave, conteudo))
+            self._registrar_sucesso()
+            with self._lock:
+                self.escritas += 1
+        except (OSError, requests.exceptions.RequestException) as e:
+            self._registrar_erro("escrita", e)
+
+
+    def _finalizar_escrita(self, futuro):
+        """Remove uma escrita concluída da lista de pendentes"""
+        with self._lock:
+            self._escritas_pendentes.discard(futuro)
+
+
+    def encerrar(self):
+        """Aguarda (por tempo limitado) as escritas pendentes e libera os recursos"""
+        with self._lock:
+            pendentes = list(self._escritas_pendentes)
+        if pendentes:
+            wait(pendentes, timeout=self.TEMPO_MAXIMO_FINALIZACAO)
+        self._executor_escrita.shutdown(wait=False, cancel_futures=True)
+        self._executor_leitura.shutdown(wait=False, cancel_futures=True)
+        if self._sessao is not None:
+            self._sessao.close()
+
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna as estatísticas de uso do backend remoto
+
+        Returns:
+            dict: Acertos, falhas, erros, blobs corrompidos, escritas e se o backend foi desativado
+        """
+        with self._lock:
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'erros': self.erros,
+                'blobs_corrompidos': self.blobs_corrompidos,
+                'escritas': self.escritas,
+                'desativado': self.desativado,
+            }
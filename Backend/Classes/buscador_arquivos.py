@@ -0,0 +1,247 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from typing import Iterator
+from pathlib import Path
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class BuscadorArquivos:
+    """
+    Busca os arquivos de teste a partir de arquivos, pastas (recursivamente) ou padrões glob
+    (*, ?, [...] e ** para qualquer número de pastas). As pastas são lidas com os.scandir por
+    várias threads e os arquivos são entregues pasta a pasta, em uma ordem determinística,
+    sem montar a lista da árvore inteira. Caminhos listados em arquivos .futignore (sintaxe
+    do .gitignore: *, **, / inicial ou final e ! para reincluir) são ignorados
+    """
+
+    # Constantes
+    ARQUIVO_IGNORAR = ".futignore"
+    EXTENSOES = (".yaml", ".yml")
+    PASTAS_IGNORADAS = frozenset({".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv"})
+    CARACTERES_GLOB = ("*", "?", "[")
+    NUM_THREADS_PADRAO = 8
+    PASTAS_POR_THREAD = 4  # pastas lidas antecipadamente por thread
+
+    # Construtor
+    def __init__(self, num_threads: int = NUM_THREADS_PADRAO, pasta_base: Path = None):
+        """
+        Args:
+            num_threads (int): Pastas lidas em paralelo
+            pasta_base (Path): Pasta dos caminhos relativos (padrão: pasta atual)
+        """
+        self.num_threads = max(1, num_threads)
+        self.pasta_base = pasta_base or Path.cwd()
+
+
+    def buscar(self, argumento: str) -> Iterator[Path]:
+        """
+        Entrega os arquivos de teste (.yaml/.yml) de um argumento:
+        1. Arquivo: o próprio arquivo
+        2. Pasta: todos os arquivos de teste da pasta e das subpastas
+        3. Padrão glob: os arquivos que correspondem a ele; a extensão pode ser omitida (ex: testes/**/patient-*)
+
+        Args:
+            argumento (str): Arquivo, pasta ou padrão
+
+        Yields:
+            Path: Cada arquivo encontrado
+        """
+        caminho = Path(argumento).expanduser()
+        if not caminho.is_absolute():
+            caminho = self.pasta_base / caminho
+
+        partes = caminho.parts
+        indice_glob = next((indice for indice, parte in enumerate(partes) if any(caractere in parte for caractere in self.CARACTERES_GLOB)), None)
+        if indice_glob is None:
+            if caminho.is_dir():
+                yield from self._percorrer(caminho, "**/*")
+            elif caminho.suffix in self.EXTENSOES and caminho.is_file():
+                yield caminho
+            return
+
+        pasta_raiz = Path(*partes[:indice_glob])
+        if pasta_raiz.is_dir():
+            yield from self._percorrer(pasta_raiz, "/".join(partes[indice_glob:]))
+
+
+    def _percorrer(self, pasta_raiz: Path, padrao: str) -> Iterator[Path]:
+        """
+        Percorre a pasta em largura, lendo até num_threads * PASTAS_POR_THREAD pastas em paralelo
+        e entregando os arquivos de cada pasta na ordem em que as pastas foram encontradas
+
+        Args:
+            pasta_raiz (Path): Pasta inicial
+            padrao (str): Padrão glob relativo à pasta inicial
+
+        Yields:
+            Path: Cada arquivo que corresponde ao padrão
+        """
+        regex_padrao = self._traduzir_padrao(padrao)
+        profundidade_maxima = None if "**" in padrao else padrao.count("/")
+        a_ler = deque([(str(pasta_raiz), "", self._regras_iniciais(pasta_raiz), 0)])
+        em_andamento = deque()
+        executor = ThreadPoolExecutor(max_workers=self.num_threads, thread_name_prefix="fut-busca-pastas")
+        try:
+            while a_ler or em_andamento:
+                while a_ler and len(em_andamento) < self.num_threads * self.PASTAS_POR_THREAD:
+                    em_andamento.append(executor.submit(self._ler_pasta, *a_ler.popleft(), regex_padrao, profundidade_maxima))
+                arquivos, subpastas = em_andamento.popleft().result()
+                a_ler.extend(subpastas)
+                for arquivo in arquivos:
+                    yield Path(arquivo)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def _ler_pasta(self, pasta: str, relativo: str, regras: tuple, profundidade: int, regex_padrao: re.Pattern, profundidade_maxima: int|None) -> tuple[list[str], list[tuple]]:
+        """
+        Lê uma pasta (executado pelas threads da busca)
+
+        Args:
+            pasta (str): Pasta a ser lida
+            relativo (str): Caminho da pasta relativo à pasta inicial (com "/" no final, ou vazio)
+            regras (tuple): Regras de .futignore das pastas acima
+            profundidade (int): Profundidade da pasta em relação à pasta inicial
+            regex_padrao (re.Pattern): Padrão dos arquivos
+            profundidade_maxima (int|None): Profundidade máxima das pastas lidas (None: sem limite)
+
+        Returns:
+            tuple[list[str], list[tuple]]: Arquivos que correspondem ao padrão e subpastas a serem lidas
+        """
+        try:
+            with os.scandir(pasta) as entradas:
+                entradas = sorted(entradas, key=lambda entrada: entrada.name)
+        except OSError as e:
+            logger.warning(f"Não foi possível ler a pasta {pasta}: {e}")
+            return [], []
+
+        if any(entrada.name == self.ARQUIVO_IGNORAR for entrada in entradas):
+            regras = regras + self._ler_regras(os.path.join(pasta, self.ARQUIVO_IGNORAR))
+
+        arquivos = []
+        subpastas = []
+        for entrada in entradas:
+            caminho_relativo = relativo + entrada.name
+            try:
+                if entrada.is_dir(follow_symlinks=False):
+                    if entrada.name in self.PASTAS_IGNORADAS or (profundidade_maxima is not None and profundidade >= profundidade_maxima):
+                        continue
+                    if not self._ignorado(entrada.path, True, regras):
+                        subpastas.append((entrada.path, caminho_relativo + "/", regras, profundidade + 1))
+                elif entrada.name.endswith(self.EXTENSOES) and entrada.is_file():
+                    corresponde = regex_padrao.fullmatch(caminho_relativo) or regex_padrao.fullmatch(caminho_relativo.rpartition(".")[0])
+                    if corresponde and not self._ignorado(entrada.path, False, regras):
+                        arquivos.append(entrada.path)
+            except OSError as e:
+                logger.warning(f"Não foi possível ler {entrada.path}: {e}")
+        return arquivos, subpastas
+
+
+    def _regras_iniciais(self, pasta_raiz: Path) -> tuple:
+        """Regras dos .futignore das pastas entre a pasta base e a pasta inicial (exclusive)"""
+        try:
+            partes = pasta_raiz.relative_to(self.pasta_base).parts
+        except ValueError:
+            return ()
+        regras = ()
+        pasta = self.pasta_base
+        for parte in partes:
+            arquivo_ignorar = pasta / self.ARQUIVO_IGNORAR
+            if arquivo_ignorar.is_file():
+                regras = regras + self._ler_regras(str(arquivo_ignorar))
+            pasta = pasta / parte
+        return regras
+
+
+    def _ler_regras(self, arquivo_ignorar: str) -> tuple:
+        """
+        Lê as regras de um .futignore
+
+        Returns:
+            tuple: Regras (pasta do arquivo, padrão, se reinclui, se vale apenas para pastas)
+        """
+        prefixo = os.path.join(os.path.dirname(arquivo_ignorar), "")
+        regras = []
+        try:
+            with open(arquivo_ignorar, "r", encoding="utf-8") as arquivo:
+                linhas = arquivo.read().splitlines()
+        except OSError as e:
+            logger.warning(f"Não foi possível ler {arquivo_ignorar}: {e}")
+            return ()
+        for linha in linhas:
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            reincluir = linha.startswith("!")
+            linha = linha[1:] if reincluir else linha
+            somente_pasta = linha.endswith("/")
+            linha = linha.rstrip("/")
+            if not linha:
+                continue
+            # Padrões com "/" são relativos à pasta do .futignore; os demais valem em qualquer nível
+            padrao = linha.lstrip("/") if "/" in linha else f"**/{linha}"
+            regras.append((prefixo, self._traduzir_padrao(padrao), reincluir, somente_pasta))
+        return tuple(regras)
+
+
+    @staticmethod
+    def _ignorado(caminho: str, eh_pasta: bool, regras: tuple) -> bool:
+        """Aplica as regras de .futignore a um caminho (a última regra que corresponde decide)"""
+        ignorado = False
+        for prefixo, regex_regra, reincluir, somente_pasta in regras:
+            if somente_pasta and not eh_pasta:
+                continue
+            if regex_regra.fullmatch(caminho[len(prefixo):].replace(os.sep, "/")):
+                ignorado = not reincluir
+        return ignorado
+
+
+    @classmethod
+    def _traduzir_padrao(cls, padrao: str) -> re.Pattern:
+        """
+        Converte um padrão glob de caminho em expressão regular: * e ? não atravessam pastas,
+        ** corresponde a qualquer número de pastas
+
+        Args:
+            padrao (str): Padrão com "/" entre as pastas
+
+        Returns:
+            re.Pattern: Expressão aplicada ao caminho relativo completo
+        """
+        partes = padrao.split("/")
+        expressao = ""
+        for indice, parte in enumerate(partes):
+            ultima = indice == len(partes) - 1
+            if parte == "**":
+                expressao += ".*" if ultima else "(?:.*/)?"
+            else:
+                expressao += cls._traduzir_parte(parte) + ("" if ultima else "/")
+        return re.compile(expressao, re.DOTALL)
+
+
+    @staticmethod
+    def _traduzir_parte(parte: str) -> str:
+        """Converte o padrão de um nome (sem "/") em expressão regular"""
+        expressao = []
+        indice = 0
+        while indice < len(parte):
+            caractere = parte[indice]
+            if caractere == "*":
+                expressao.append("[^/]*")
+            elif caractere == "?":
+                expressao.append("[^/]")
+            elif caractere == "[" and parte.find("]", indice + 2) != -1:
+                fim = parte.find("]", indice + 2)
+                conteudo = parte[indice + 1:fim].replace("\\", "\\\\")
+                if conteudo.startswith("!"):
+                    conteudo = "^" + conteudo[1:]
+                expressao.append(f"[{conteudo}]")
+                indice = fim
+            else:
+                expressao.append(re.escape(caractere))
+            indice += 1
+        return "".join(expressao)
@@ -0,0 +1,193 @@
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import logging
+import shutil
+import time
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class CacheFerramentas:
+    """
+    Pasta compartilhada (entre execuções simultâneas e containers) com as ferramentas
+    baixadas pelo fut: o JDK e o validator_cli.
+
+    Instalações e atualizações são protegidas por locks entre processos e cada versão do
+    validator é instalada lado a lado em uma pasta endereçada pelo conteúdo
+    (<versão>-<sha256>), de modo que a atualização feita por uma execução nunca
+    substitui o jar que outra execução está usando
+    """
+
+    # Constantes
+    VARIAVEL_AMBIENTE = "FUT_CACHE_FERRAMENTAS"
+    PASTA_PADRAO = "ferramentas"
+    PASTA_LOCKS = ".locks"
+    PASTA_VALIDATOR = "validator"
+    PASTA_JDK = "jdk"
+    ARQUIVO_VERSAO_ATUAL = "ATUAL"
+    NOME_VALIDATOR = "validator_cli.jar"
+    VERSOES_MANTIDAS = 3  # versões antigas do validator mantidas para execuções em andamento
+    TEMPO_ESPERA_LOCK = 0.5  # segundos entre tentativas de obter o lock (Windows)
+
+    # Construtor
+    def __init__(self, path_arquivos: Path):
+        """
+        Inicializa o cache de ferramentas. A pasta é definida pela variável de ambiente
+        FUT_CACHE_FERRAMENTAS ou, por padrão, fica dentro da pasta de arquivos
+
+        Args:
+            path_arquivos (Path): Pasta de arquivos do projeto
+        """
+        pasta_ambiente = os.environ.get(self.VARIAVEL_AMBIENTE, "").strip()
+        self.raiz = Path(pasta_ambiente).expanduser().resolve() if pasta_ambiente else path_arquivos / self.PASTA_PADRAO
+        self.pasta_validator = self.raiz / self.PASTA_VALIDATOR
+        self.pasta_jdk = self.raiz / self.PASTA_JDK
+        for pasta in (self.raiz / self.PASTA_LOCKS, self.pasta_validator, self.pasta_jdk):
+            pasta.mkdir(parents=True, exist_ok=True)
+        logger.debug(f"Cache de ferramentas em: {self.raiz}")
+
+
+    @contextmanager
+    def bloqueio(self, nome: str):
+        """
+        Lock exclusivo entre processos (e threads) para instalar ou atualizar uma ferramenta
+
+        Args:
+            nome (str): Nome do recurso protegido (ex: "validator", "jdk")
+        """
+        caminho_lock = self.raiz / self.PASTA_LOCKS / f"{nome}.lock"
+        with open(caminho_lock, "a+b") as arquivo_lock:
+            self._adquirir_lock(arquivo_lock)
+            try:
+                yield
+            finally:
+                self._liberar_lock(arquivo_lock)
+
+
+    def _adquirir_lock(self, arquivo_lock):
+        """Bloqueia até obter o lock do arquivo"""
+        if fcntl is not None:
+            fcntl.flock(arquivo_lock.fileno(), fcntl.LOCK_EX)
+            return
+        arquivo_lock.seek(0)
+        while True:
+            try:
+                msvcrt.locking(arquivo_lock.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(self.TEMPO_ESPERA_LOCK)
+
+
+    @staticmethod
+    def _liberar_lock(arquivo_lock):
+        """Libera o lock do arquivo"""
+        if fcntl is not None:
+            fcntl.flock(arquivo_lock.fileno(), fcntl.LOCK_UN)
+            return
+        arquivo_lock.seek(0)
+        msvcrt.locking(arquivo_lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+    def caminho_validator_atual(self) -> Path|None:
+        """
+        Retorna o validator_cli atualmente em uso
+
+        Returns:
+            Path|None: Caminho do jar ou None se nenhum validator estiver instalado
+        """
+        try:
+            identificador = (self.pasta_validator / self.ARQUIVO_VERSAO_ATUAL).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        caminho_validator = self.pasta_validator / identificador / self.NOME_VALIDATOR
+        return caminho_validator if identificador and caminho_validator.exists() else None
+
+
+    def caminho_temporario_validator(self) -> Path:
+        """Caminho exclusivo deste processo para baixar um validator antes de instalá-lo"""
+        return self.pasta_validator / f"temp_{os.getpid()}_{self.NOME_VALIDATOR}"
+
+
+    def instalar_validator(self, caminho_origem: Path, versao: str) -> Path:
+        """
+        Instala um validator_cli em sua pasta versionada e o torna o validator atual.
+        Deve ser chamado com o lock "validator" adquirido
+
+        Args:
+            caminho_origem (Path): Jar baixado (movido para o cache)
+            versao (str): Versão do validator_cli
+
+        Returns:
+            Path: Caminho do validator instalado
+        """
+        sha256 = hashlib.sha256()
+        with open(caminho_origem, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1024 * 1024), b""):
+                sha256.update(bloco)
+        identificador = f"{versao}-{sha256.hexdigest()[:12]}"
+        pasta_versao = self.pasta_validator / identificador
+
+        if (pasta_versao / self.NOME_VALIDATOR).exists():
+            Path(caminho_origem).unlink(missing_ok=True)
+        else:
+            # Montado em uma pasta temporária e publicado com um rename (atômico)
+            pasta_temporaria = self.pasta_validator / f".{identificador}.{os.getpid()}.tmp"
+            pasta_temporaria.mkdir(exist_ok=True)
+            shutil.move(str(caminho_origem), pasta_temporaria / self.NOME_VALIDATOR)
+            try:
+                os.replace(pasta_temporaria, pasta_versao)
+            except OSError:
+                shutil.rmtree(pasta_temporaria, ignore_errors=True)
+                if not (pasta_versao / self.NOME_VALIDATOR).exists():
+                    raise
+
+        caminho_atual = self.pasta_validator / self.ARQUIVO_VERSAO_ATUAL
+        caminho_temporario = caminho_atual.with_name(f"{self.ARQUIVO_VERSAO_ATUAL}.{os.getpid()}.tmp")
+        caminho_temporario.write_text(identificador, encoding="utf-8")
+        os.replace(caminho_temporario, caminho_atual)
+        logger.info(f"validator_cli {versao} instalado no cache de ferramentas: {pasta_versao}")
+
+        self._remover_versoes_antigas(identificador)
+        return pasta_versao / self.NOME_VALIDATOR
+
+
+    def _remover_versoes_antigas(self, identificador_atual: str):
+        """Remove as versões mais antigas do validator, mantendo a atual e as VERSOES_MANTIDAS mais recentes"""
+        versoes = [
+            entrada for entrada in os.scandir(self.pasta_validator)
+            if entrada.is_dir() and not entrada.name.startswith(".") and entrada.name != identificador_atual
+        ]
+        versoes.sort(key=lambda entrada: entrada.stat().st_mtime, reverse=True)
+        for entrada in versoes[self.VERSOES_MANTIDAS:]:
+            shutil.rmtree(entrada.path, ignore_errors=True)
+            logger.info(f"Versão antiga do validator_cli removida do cache: {entrada.name}")
+
+
+    def migrar_instalacao_legada(self, path_arquivos: Path):
+        """
+        Move para o cache o JDK baixado por versões anteriores do fut (direto na pasta de arquivos),
+        evitando um novo download. O validator legado é migrado pelo GerenciadorValidator
+
+        Args:
+            path_arquivos (Path): Pasta de arquivos do projeto
+        """
+        if path_arquivos.resolve() == self.pasta_jdk.resolve():
+            return
+        with self.bloqueio(self.PASTA_JDK):
+            for nome_arquivo in ("jdk-windows.zip", "jdk-macos.tar.gz", "jdk-linux.tar.gz"):
+                caminho_legado = path_arquivos / nome_arquivo
+                caminho_cache = self.pasta_jdk / nome_arquivo
+                if caminho_legado.exists() and not caminho_cache.exists():
+                    try:
+                        shutil.move(str(caminho_legado), caminho_cache)
+                        logger.info(f"JDK legado movido para o cache de ferramentas: {caminho_cache}")
+                    except OSError as e:
+                        logger.warning(f"Não foi possível migrar o JDK legado: {e}")
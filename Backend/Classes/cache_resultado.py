@@ -0,0 +1,289 @@
+from Backend.Classes.backend_cache_remoto import BackendCacheRemoto
+from pathlib import Path
+from json import loads
+import threading
+import hashlib
+import logging
+import shutil
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class CacheResultado:
+    """
+    Cache persistente dos resultados do validator_cli, endereçado pelo conteúdo:
+    a chave combina os bytes da instância, os argumentos do teste, o conteúdo dos
+    arquivos e pastas locais passados com -ig/-profile e as versões do validator,
+    do JDK e do FHIR. Quando excede o tamanho máximo, os resultados
+    usados há mais tempo são removidos (LRU pela data de modificação).
+    Opcionalmente, um backend remoto compartilhado é consultado quando o resultado
+    não está no cache local (read-through) e recebe os novos resultados (write-back)
+    """
+
+    # Constantes
+    PASTA_CACHE = "cache_resultados"
+    VERSAO_FHIR = "4.0.1"
+    FRACAO_APOS_LIMPEZA = 0.9  # após exceder o limite, reduz o cache a 90% dele
+    ARGUMENTOS_LOCAIS = ("-ig", "-profile")  # argumentos cujo valor pode ser um arquivo ou pasta local
+
+    # Construtor
+    def __init__(self, path_arquivos: Path, tamanho_maximo_mb: int, versao_validator: str|None, versao_java: str|None, backend_remoto: BackendCacheRemoto = None):
+        """
+        Inicializa o cache de resultados
+
+        Args:
+            path_arquivos (Path): Pasta de arquivos do projeto (onde o cache é guardado)
+            tamanho_maximo_mb (int): Tamanho máximo do cache em MB
+            versao_validator (str): Versão do validator_cli usada na execução
+            versao_java (str): Versão do JDK usada na execução
+            backend_remoto (BackendCacheRemoto): Cache compartilhado entre máquinas (opcional)
+        """
+        self.pasta_cache = path_arquivos / self.PASTA_CACHE
+        self.pasta_cache.mkdir(parents=True, exist_ok=True)
+        self.tamanho_maximo_bytes = max(1, tamanho_maximo_mb) * 1024 * 1024
+        self.versao_validator = versao_validator or "desconhecida"
+        self.versao_java = versao_java or "desconhecida"
+        self.backend_remoto = backend_remoto
+        self.acertos = 0
+        self.falhas = 0
+        self.removidos = 0
+        self._lock = threading.Lock()
+        self._hashes_arquivos = {}  # (caminho, tamanho, data de modificação) => hash do conteúdo (nesta execução)
+        self._tamanho_atual = sum(entrada.stat().st_size for entrada in os.scandir(self.pasta_cache) if entrada.is_file())
+
+
+    def calcular_chave(self, arquivo_instancia: Path, argumentos_validator: list[str]) -> str:
+        """
+        Calcula a chave de um resultado
+
+        Args:
+            arquivo_instancia (Path): Arquivo FHIR validado
+            argumentos_validator (list[str]): Argumentos de contexto do teste (-ig, -profile)
+
+        Returns:
+            str: Hash SHA-256 que identifica o resultado
+
+        Raises:
+            OSError: Se o arquivo da instância (ou um recurso local) não puder ser lido
+        """
+        hash_chave = hashlib.sha256()
+        with open(arquivo_instancia, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1024 * 1024), b""):
+                hash_chave.update(bloco)
+        argumentos_validator = argumentos_validator or []
+        for componente in ("\0".join(argumentos_validator), self.versao_validator, self.versao_java, self.VERSAO_FHIR):
+            hash_chave.update(b"\0" + componente.encode("utf-8"))
+        # Recursos locais (perfis, ValueSets, pastas de IG): editá-los deve invalidar o resultado
+        for argumento, valor in zip(argumentos_validator, argumentos_validator[1:]):
+            if argumento in self.ARGUMENTOS_LOCAIS:
+                hash_chave.update(b"\0" + self._hash_local(Path(valor).expanduser()))
+        return hash_chave.hexdigest()
+
+
+    def _hash_local(self, caminho: Path) -> bytes:
+        """
+        Hash do conteúdo de um arquivo ou pasta local (recursivamente, incluindo os nomes dos arquivos)
+
+        Args:
+            caminho (Path): Valor de -ig/-profile
+
+        Returns:
+            bytes: Hash do conteúdo, ou vazio se o valor não for um caminho local (ex: pacote ou URL)
+        """
+        try:
+            if caminho.is_file():
+                return self._hash_arquivo(caminho)
+            if not caminho.is_dir():
+                return b""
+        except (OSError, ValueError):
+            return b""  # Valor não representa um caminho (ex: URL canônica)
+        hash_pasta = hashlib.sha256()
+        for pasta, subpastas, arquivos in os.walk(caminho):
+            subpastas.sort()
+            for nome in sorted(arquivos):
+                caminho_arquivo = Path(pasta) / nome
+                hash_pasta.update(caminho_arquivo.relative_to(caminho).as_posix().encode("utf-8") + b"\0")
+                hash_pasta.update(self._hash_arquivo(caminho_arquivo))
+        return hash_pasta.digest()
+
+
+    def _hash_arquivo(self, caminho: Path) -> bytes:
+        """
+        Hash do conteúdo de um arquivo, lido apenas uma vez por execução enquanto não mudar
+
+        Raises:
+            OSError: Se o arquivo não puder ser lido
+        """
+        informacoes = os.stat(caminho)
+        assinatura = (os.path.realpath(caminho), informacoes.st_size, informacoes.st_mtime_ns)
+        with self._lock:
+            hash_arquivo = self._hashes_arquivos.get(assinatura)
+        if hash_arquivo is None:
+            hash_conteudo = hashlib.sha256()
+            with open(caminho, "rb") as arquivo:
+                for bloco in iter(lambda: arquivo.read(1024 * 1024), b""):
+                    hash_conteudo.update(bloco)
+            hash_arquivo = hash_conteudo.digest()
+            with self._lock:
+                self._hashes_arquivos[assinatura] = hash_arquivo
+        return hash_arquivo
+
+
+    def _caminho_entrada(self, chave: str) -> Path:
+        """Caminho do arquivo de um resultado no cache"""
+        return self.pasta_cache / f"{chave}.json"
+
+
+    def obter(self, chave: str, caminho_destino: Path) -> bool:
+        """
+        Copia o resultado em cache para o caminho do relatório do teste
+
+        Args:
+            chave (str): Chave do resultado
+            caminho_destino (Path): Onde o OperationOutcome deve ser escrito
+
+        Returns:
+            bool: True se o resultado estava em cache
+        """
+        caminho_entrada = self._caminho_entrada(chave)
+        try:
+            shutil.copyfile(caminho_entrada, caminho_destino)
+            os.utime(caminho_entrada)  # Marca como usado recentemente (LRU)
+        except OSError:
+            if self._obter_remoto(chave, caminho_destino):
+                return True
+            with self._lock:
+                self.falhas += 1
+            return False
+        with self._lock:
+            self.acertos += 1
+        return True
+
+
+    def _obter_remoto(self, chave: str, caminho_destino: Path) -> bool:
+        """
+        Busca o resultado no backend remoto e, se encontrado, o guarda também no cache local
+
+        Args:
+            chave (str): Chave do resultado
+            caminho_destino (Path): Onde o OperationOutcome deve ser escrito
+
+        Returns:
+            bool: True se o resultado estava no backend remoto
+        """
+        if self.backend_remoto is None:
+            return False
+        conteudo = self.backend_remoto.obter(chave)
+        if conteudo is None:
+            return False
+        try:
+            caminho_destino.write_bytes(conteudo)
+        except OSError as e:
+            logger.warning(f"Não foi possível escrever o resultado do cache remoto: {e}")
+            return False
+        self._armazenar_local(chave, caminho_destino)
+        with self._lock:
+            self.acertos += 1
+        return True
+
+
+    def armazenar(self, chave: str, caminho_relatorio: Path) -> bool:
+        """
+        Armazena o resultado de uma validação. Apenas saídas reais do validator são
+        armazenadas (relatórios de timeout/erro criados pelo fut não possuem resourceType)
+
+        Args:
+            chave (str): Chave do resultado
+            caminho_relatorio (Path): OperationOutcome gerado pelo validator
+
+        Returns:
+            bool: True se o resultado foi armazenado
+        """
+        try:
+            conteudo = caminho_relatorio.read_bytes()
+            if loads(conteudo).get('resourceType') != 'OperationOutcome':
+                return False
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Não foi possível armazenar o resultado em cache: {e}")
+            return False
+        if not self._armazenar_local(chave, caminho_relatorio):
+            return False
+        if self.backend_remoto is not None:
+            self.backend_remoto.armazenar_em_segundo_plano(chave, conteudo)
+        return True
+
+
+    def _armazenar_local(self, chave: str, caminho_relatorio: Path) -> bool:
+        """
+        Copia um resultado para o cache local, removendo os menos usados se o limite for excedido
+
+        Args:
+            chave (str): Chave do resultado
+            caminho_relatorio (Path): OperationOutcome a ser armazenado
+
+        Returns:
+            bool: True se o resultado foi armazenado
+        """
+        try:
+            caminho_entrada = self._caminho_entrada(chave)
+            caminho_temporario = caminho_entrada.with_name(f"{chave}.{threading.get_ident()}.tmp")
+            shutil.copyfile(caminho_relatorio, caminho_temporario)
+            os.replace(caminho_temporario, caminho_entrada)  # Atômico: leitores nunca veem um arquivo parcial
+        except OSError as e:
+            logger.warning(f"Não foi possível armazenar o resultado em cache: {e}")
+            return False
+
+        with self._lock:
+            self._tamanho_atual += caminho_entrada.stat().st_size
+            if self._tamanho_atual > self.tamanho_maximo_bytes:
+                self._remover_menos_usados()
+        return True
+
+
+    def _remover_menos_usados(self):
+        """Remove os resultados usados há mais tempo até o cache voltar abaixo do limite (chamado com o lock adquirido)"""
+        entradas = []
+        for entrada in os.scandir(self.pasta_cache):
+            if entrada.is_file() and entrada.name.endswith(".json"):
+                estatisticas = entrada.stat()
+                entradas.append((estatisticas.st_mtime, estatisticas.st_size, entrada.path))
+        entradas.sort()
+
+        self._tamanho_atual = sum(tamanho for _, tamanho, _ in entradas)
+        tamanho_alvo = self.tamanho_maximo_bytes * self.FRACAO_APOS_LIMPEZA
+        for _, tamanho, caminho in entradas:
+            if self._tamanho_atual <= tamanho_alvo:
+                break
+            try:
+                os.remove(caminho)
+                self._tamanho_atual -= tamanho
+                self.removidos += 1
+            except OSError:
+                continue
+        logger.info(f"Cache de resultados reduzido para {self._tamanho_atual / (1024 * 1024):.1f} MB")
+
+
+    def encerrar(self):
+        """Finaliza o backend remoto, aguardando as escritas pendentes por tempo limitado"""
+        if self.backend_remoto is not None:
+            self.backend_remoto.encerrar()
+
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna as estatísticas de uso do cache na execução
+
+        Returns:
+            dict: Acertos, falhas, removidos, tamanho atual em MB e estatísticas do backend remoto
+        """
+        with self._lock:
+            estatisticas = {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'removidos': self.removidos,
+                'tamanho_mb': round(self._tamanho_atual / (1024 * 1024), 1),
+            }
+        if self.backend_remoto is not None:
+            estatisticas['remoto'] = self.backend_remoto.obter_estatisticas()
+        return estatisticas
@@ -0,0 +1,133 @@
+from Backend.Classes.leitor_schema import LeitorSchema
+from typing import Callable
+from pathlib import Path
+import jsonschema
+import threading
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fastjsonschema  # Gera uma função Python de validação para o schema (em requirements.txt; sem ele, jsonschema)
+except ImportError:
+    fastjsonschema = None
+
+
+class CacheSchema:
+    """
+    Cache dos schemas JSON do sistema, compartilhado por todo o processo.
+    Cada schema é lido e compilado em um validador uma única vez; a entrada é
+    invalidada quando o arquivo muda (data de modificação ou tamanho)
+    """
+
+    _schemas = {}  # caminho => [assinatura do arquivo, dados do schema, validador compilado]
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _assinatura(caminho_schema: Path) -> tuple[int, int]|None:
+        """Data de modificação e tamanho do arquivo (None se ele não puder ser lido)"""
+        try:
+            informacoes = os.stat(caminho_schema)
+        except OSError:
+            return None
+        return informacoes.st_mtime_ns, informacoes.st_size
+
+
+    @classmethod
+    def _obter_entrada(cls, caminho_schema: Path) -> list:
+        """
+        Entrada do cache do schema, carregando-o se ainda não estiver em cache ou se o arquivo mudou
+
+        Raises:
+            FileNotFoundError: Se o arquivo de schema não for encontrado
+            ValueError: Se o JSON for inválido
+        """
+        caminho_schema = os.fspath(caminho_schema)
+        assinatura = cls._assinatura(caminho_schema)
+        with cls._lock:
+            entrada = cls._schemas.get(caminho_schema)
+            if entrada is None or assinatura is None or entrada[0] != assinatura:
+                entrada = [assinatura, LeitorSchema(caminho_schema).return_dados_schema(), None]
+                cls._schemas[caminho_schema] = entrada
+            return entrada
+
+
+    @classmethod
+    def obter_dados(cls, caminho_schema: Path) -> dict:
+        """
+        Retorna os dados do schema (lidos do disco apenas na primeira chamada ou se o arquivo mudou)
+
+        Args:
+            caminho_schema (Path): Arquivo JSON do schema
+
+        Returns:
+            dict: Dados do schema (compartilhados, não devem ser alterados)
+
+        Raises:
+            FileNotFoundError: Se o arquivo de schema não for encontrado
+            ValueError: Se o JSON for inválido
+        """
+        return cls._obter_entrada(caminho_schema)[1]
+
+
+    @classmethod
+    def obter_validador(cls, caminho_schema: Path) -> Callable[[object], None]:
+        """
+        Retorna o validador compilado do schema
+
+        Args:
+            caminho_schema (Path): Arquivo JSON do schema
+
+        Returns:
+            Callable[[object], None]: Função que valida uma instância
+
+        Raises:
+            FileNotFoundError: Se o arquivo de schema não for encontrado
+            ValueError: Se o JSON for inválido
+            jsonschema.SchemaError: Se o schema não for válido
+        """
+        entrada = cls._obter_entrada(caminho_schema)
+        with cls._lock:
+            if entrada[2] is None:
+                entrada[2] = cls._compilar(entrada[1])
+            return entrada[2]
+
+
+    @staticmethod
+    def _compilar(dados_schema: dict) -> Callable[[object], None]:
+        """
+        Compila o schema (verificado uma única vez) em uma função de validação.
+        Com o fastjsonschema instalado a validação usa o código gerado por ele e o jsonschema
+        é usado apenas para detalhar os erros encontrados
+
+        Args:
+            dados_schema (dict): Schema a ser compilado
+
+        Returns:
+            Callable[[object], None]: Função que lança jsonschema.ValidationError (o erro mais relevante,
+                                      como jsonschema.validate) se a instância for inválida
+        """
+        classe_validador = jsonschema.validators.validator_for(dados_schema)
+        classe_validador.check_schema(dados_schema)
+        validador = classe_validador(dados_schema)
+
+        def validar_jsonschema(instancia):
+            erro = jsonschema.exceptions.best_match(validador.iter_errors(instancia))
+            if erro is not None:
+                raise erro
+
+        if fastjsonschema is None:
+            return validar_jsonschema
+        try:
+            validar_codigo_gerado = fastjsonschema.compile(dados_schema)
+        except Exception as e:
+            logger.info(f"Schema não compilado pelo fastjsonschema, usando o jsonschema: {e}")
+            return validar_jsonschema
+
+        def validar(instancia):
+            try:
+                validar_codigo_gerado(instancia)
+            except fastjsonschema.JsonSchemaException:
+                validar_jsonschema(instancia)  # Mensagem de erro no formato do jsonschema
+        return validar
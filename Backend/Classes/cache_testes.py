@@ -0,0 +1,162 @@
+from pathlib import Path
+import threading
+import hashlib
+import logging
+import pickle
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class CacheTestes:
+    """
+    Cache persistente dos arquivos de teste já lidos (YAML) e validados pelo schema.
+    Cada arquivo é identificado pelo caminho, tamanho, data de modificação e hash do conteúdo:
+    arquivos inalterados são entregues sem PyYAML nem jsonschema. O cache inteiro é
+    descartado quando o schema dos arquivos de teste (ou o formato do cache) muda
+    """
+
+    # Constantes
+    PASTA_CACHE = "cache_testes"
+    ARQUIVO_CACHE = "testes.pickle"
+    VERSAO_FORMATO = 1  # mudar invalida o cache
+    MAXIMO_ENTRADAS = 500_000  # arquivos mantidos (os não usados nesta execução são removidos primeiro)
+
+    # Construtor
+    def __init__(self, path_arquivos: Path, path_schema: Path):
+        """
+        Carrega o cache do disco
+
+        Args:
+            path_arquivos (Path): Pasta de arquivos do projeto (onde o cache é guardado)
+            path_schema (Path): Schema dos arquivos de teste (o cache só vale para o mesmo schema)
+        """
+        self.caminho_cache = path_arquivos / self.PASTA_CACHE / self.ARQUIVO_CACHE
+        self.acertos = 0
+        self.falhas = 0
+        try:
+            self.hash_schema = hashlib.sha256(Path(path_schema).read_bytes()).hexdigest()
+        except OSError:
+            self.hash_schema = None
+        self._entradas = {}  # caminho => (tamanho, data de modificação, hash, conteúdo serializado)
+        self._usados = set()
+        self._alterado = False
+        self._lock = threading.Lock()
+        self._carregar()
+
+
+    @staticmethod
+    def calcular_hash(conteudo: bytes) -> bytes:
+        """Hash do conteúdo de um arquivo de teste"""
+        return hashlib.blake2b(conteudo, digest_size=16).digest()
+
+
+    def _carregar(self):
+        """Lê o arquivo do cache, descartando-o se for de outro formato ou de outro schema"""
+        try:
+            with open(self.caminho_cache, "rb") as arquivo:
+                dados = pickle.load(arquivo)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Cache de testes ilegível, descartado: {e}")
+            return
+        if dados.get('versao') != self.VERSAO_FORMATO or dados.get('schema') != self.hash_schema:
+            logger.info("Schema dos testes alterado, cache de testes descartado")
+            self._alterado = True
+            return
+        self._entradas = dados.get('entradas') or {}
+
+
+    def obter(self, arquivo: Path) -> tuple[dict, str|None]|None:
+        """
+        Retorna o teste em cache se o arquivo não mudou
+
+        Args:
+            arquivo (Path): Arquivo de teste
+
+        Returns:
+            tuple[dict, str|None]|None: Conteúdo e motivo de o teste ser inválido, ou None se não estiver em cache
+        """
+        caminho = os.path.abspath(arquivo)
+        entrada = self._entradas.get(caminho)
+        if entrada is None or self.hash_schema is None:
+            return self._registrar_falha()
+        try:
+            informacoes = os.stat(caminho)
+        except OSError:
+            return self._registrar_falha()
+        tamanho, data_modificacao, hash_conteudo, conteudo_serializado = entrada
+        if informacoes.st_size != tamanho:
+            return self._registrar_falha()
+        if informacoes.st_mtime_ns != data_modificacao:
+            # Data alterada (ex: checkout): o arquivo ainda vale se o conteúdo for o mesmo
+            try:
+                with open(caminho, "rb") as arquivo_teste:
+                    mesmo_conteudo = self.calcular_hash(arquivo_teste.read()) == hash_conteudo
+            except OSError:
+                mesmo_conteudo = False
+            if not mesmo_conteudo:
+                return self._registrar_falha()
+            with self._lock:
+                self._entradas[caminho] = (tamanho, informacoes.st_mtime_ns, hash_conteudo, conteudo_serializado)
+                self._alterado = True
+        with self._lock:
+            self._usados.add(caminho)
+            self.acertos += 1
+        return pickle.loads(conteudo_serializado)  # Cópia: o teste pode alterar o próprio conteúdo
+
+
+    def _registrar_falha(self) -> None:
+        """Contabiliza um arquivo fora do cache"""
+        with self._lock:
+            self.falhas += 1
+        return None
+
+
+    def guardar(self, arquivo: Path, conteudo: dict, justificativa: str|None, assinatura: tuple[int, int, bytes]|None):
+        """
+        Guarda um teste lido e validado
+
+        Args:
+            arquivo (Path): Arquivo de teste
+            conteudo (dict): Conteúdo lido
+            justificativa (str|None): Motivo de o teste ser inválido (YAML ou schema)
+            assinatura (tuple[int, int, bytes]|None): Tamanho, data de modificação e hash do arquivo lido
+                                                      (None se o arquivo não pôde ser lido: não é guardado)
+        """
+        if assinatura is None or self.hash_schema is None:
+            return
+        try:
+            conteudo_serializado = pickle.dumps((conteudo, justificativa), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"Teste {arquivo} não guardado no cache: {e}")
+            return
+        caminho = os.path.abspath(arquivo)
+        with self._lock:
+            self._entradas[caminho] = (*assinatura, conteudo_serializado)
+            self._usados.add(caminho)
+            self._alterado = True
+
+
+    def salvar(self):
+        """Grava o cache no disco (apenas se mudou), de forma atômica"""
+        with self._lock:
+            if not self._alterado:
+                return
+            entradas = dict(self._entradas)
+            if len(entradas) > self.MAXIMO_ENTRADAS:
+                mantidas = sorted(entradas, key=lambda caminho: caminho not in self._usados)[:self.MAXIMO_ENTRADAS]
+                entradas = {caminho: entradas[caminho] for caminho in mantidas}
+            dados = {'versao': self.VERSAO_FORMATO, 'schema': self.hash_schema, 'entradas': entradas}
+            self._alterado = False
+        caminho_temporario = self.caminho_cache.with_name(f"{self.caminho_cache.name}.{os.getpid()}.tmp")
+        try:
+            self.caminho_cache.parent.mkdir(parents=True, exist_ok=True)
+            with open(caminho_temporario, "wb") as arquivo:
+                pickle.dump(dados, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(caminho_temporario, self.caminho_cache)
+        except OSError as e:
+            logger.warning(f"Não foi possível gravar o cache de testes: {e}")
+        finally:
+            caminho_temporario.unlink(missing_ok=True)
@@ -0,0 +1,204 @@
+from pathlib import Path
+import threading
+import tarfile
+import hashlib
+import logging
+import json
+import time
+import io
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class CompiladorRecursos:
+    """
+    Compila os recursos locais de um teste (context.resources: ValueSets, CodeSystems,
+    StructureDefinitions...) em um pacote FHIR (.tgz) endereçado pelo conteúdo.
+    Cada conjunto distinto de recursos é compilado uma única vez e o validator_cli recebe
+    um único -ig com o pacote (já indexado) em vez de um -ig por arquivo
+    """
+
+    # Constantes
+    PASTA_PACOTES = "pacotes_locais"
+    VERSAO_FORMATO = 1  # mudar invalida os pacotes já compilados
+    VERSAO_FHIR = "4.0.1"
+    MAXIMO_PACOTES = 64  # pacotes mantidos em disco (os usados há mais tempo são removidos)
+    CAMPOS_INDICE = ("id", "url", "version", "kind", "type", "supplements", "content")
+
+    # Construtor
+    def __init__(self, path_arquivos: Path):
+        """
+        Inicializa o compilador
+
+        Args:
+            path_arquivos (Path): Pasta de arquivos do projeto (onde os pacotes são guardados)
+        """
+        self.pasta_pacotes = path_arquivos / self.PASTA_PACOTES
+        self.pasta_pacotes.mkdir(parents=True, exist_ok=True)
+        self._compilados = {}  # chave dos recursos => pacote (nesta execução)
+        self._por_assinatura = {}  # arquivos (caminho, tamanho, data de modificação) => pacote ou None (nesta execução)
+        self._lock = threading.Lock()
+
+
+    @staticmethod
+    def _listar_arquivos(entradas: list) -> list[Path]|None:
+        """
+        Expande as entradas de context.resources em arquivos JSON
+
+        Returns:
+            list[Path]|None: Arquivos encontrados ou None se alguma entrada não puder ser compilada
+                             (inexistente ou em outro formato, ex: XML)
+        """
+        arquivos = []
+        for entrada in entradas:
+            caminho = Path(str(entrada).strip()).expanduser()
+            if caminho.is_dir():
+                arquivos.extend(sorted(caminho.rglob("*.json")))
+            elif caminho.is_file() and caminho.suffix.lower() == ".json":
+                arquivos.append(caminho)
+            else:
+                return None
+        return arquivos
+
+
+    @staticmethod
+    def _assinatura(arquivos: list[Path]) -> tuple|None:
+        """
+        Identifica os arquivos pelo caminho resolvido, tamanho e data de modificação
+
+        Returns:
+            tuple|None: Assinatura dos arquivos ou None se algum não puder ser lido
+        """
+        assinatura = []
+        for arquivo in arquivos:
+            try:
+                informacoes = os.stat(arquivo)
+            except OSError:
+                return None
+            assinatura.append((os.path.realpath(arquivo), informacoes.st_size, informacoes.st_mtime_ns))
+        return tuple(sorted(assinatura))
+
+
+    def compilar(self, entradas: list) -> Path|None:
+        """
+        Retorna o pacote com os recursos informados, compilando-o se ainda não existir.
+        Os arquivos só são lidos na primeira vez em que aparecem nesta execução (ou se mudarem)
+
+        Args:
+            entradas (list): Arquivos/pastas de context.resources
+
+        Returns:
+            Path|None: Pacote .tgz ou None se os recursos não puderem ser compilados
+                       (nesse caso os arquivos devem ser passados individualmente ao validator)
+        """
+        arquivos = self._listar_arquivos([entrada for entrada in entradas if entrada and str(entrada).strip()])
+        if not arquivos:
+            return None
+        assinatura = self._assinatura(arquivos)
+        if assinatura is None:
+            return None
+
+        with self._lock:
+            if assinatura in self._por_assinatura:
+                return self._por_assinatura[assinatura]
+        caminho_pacote = self._compilar_arquivos(arquivos)
+        with self._lock:
+            self._por_assinatura[assinatura] = caminho_pacote
+        return caminho_pacote
+
+
+    def _compilar_arquivos(self, arquivos: list[Path]) -> Path|None:
+        """
+        Lê os recursos e escreve o pacote se nenhum outro com o mesmo conteúdo existir
+
+        Args:
+            arquivos (list[Path]): Arquivos JSON dos recursos
+
+        Returns:
+            Path|None: Pacote .tgz ou None se os recursos não puderem ser compilados
+        """
+        recursos = []
+        hash_chave = hashlib.sha256(f"fut-pacote-local-{self.VERSAO_FORMATO}".encode("utf-8"))
+        try:
+            for conteudo in sorted(arquivo.read_bytes() for arquivo in arquivos):
+                recurso = json.loads(conteudo)
+                if not isinstance(recurso, dict) or not recurso.get('resourceType'):
+                    return None
+                hash_chave.update(hashlib.sha256(conteudo).digest())
+                recursos.append((recurso, conteudo))
+        except (OSError, ValueError) as e:
+            logger.info(f"Recursos locais não compilados, usados individualmente: {e}")
+            return None
+        chave = hash_chave.hexdigest()
+
+        with self._lock:
+            if chave in self._compilados:
+                return self._compilados[chave]
+            caminho_pacote = self.pasta_pacotes / f"{chave[:16]}.tgz"
+            if caminho_pacote.exists():
+                os.utime(caminho_pacote)  # Marca como usado recentemente
+            else:
+                try:
+                    self._escrever_pacote(caminho_pacote, chave, recursos)
+                except OSError as e:
+                    logger.warning(f"Não foi possível compilar os recursos locais: {e}")
+                    return None
+                logger.info(f"{len(recursos)} recursos locais compilados em {caminho_pacote.name}")
+                self._remover_pacotes_antigos()
+            self._compilados[chave] = caminho_pacote.resolve()
+            return self._compilados[chave]
+
+
+    def _escrever_pacote(self, caminho_pacote: Path, chave: str, recursos: list[tuple[dict, bytes]]):
+        """
+        Escreve o pacote: package.json, .index.json (lido pelo validator sem reindexar) e os recursos
+
+        Args:
+            caminho_pacote (Path): Destino do .tgz
+            chave (str): Hash do conteúdo dos recursos
+            recursos (list[tuple[dict, bytes]]): Recursos e seus bytes originais
+        """
+        manifesto = {
+            'name': f"fut.local.r{chave[:12]}",
+            'version': "1.0.0",
+            'fhirVersions': [self.VERSAO_FHIR],
+            'type': "fhir.ig",
+            'dependencies': {'hl7.fhir.r4.core': self.VERSAO_FHIR},
+        }
+        arquivos_pacote = {}
+        indice = []
+        for recurso, conteudo in recursos:
+            nome_base = f"{recurso['resourceType']}-{recurso.get('id') or len(arquivos_pacote)}"
+            nome_arquivo = f"{nome_base}.json"
+            contador = 1
+            while nome_arquivo in arquivos_pacote:
+                contador += 1
+                nome_arquivo = f"{nome_base}-{contador}.json"
+            arquivos_pacote[nome_arquivo] = conteudo
+            entrada_indice = {'filename': nome_arquivo, 'resourceType': recurso['resourceType']}
+            entrada_indice.update({campo: recurso[campo] for campo in self.CAMPOS_INDICE if isinstance(recurso.get(campo), str)})
+            indice.append(entrada_indice)
+        arquivos_pacote['package.json'] = json.dumps(manifesto, indent=2).encode("utf-8")
+        arquivos_pacote['.index.json'] = json.dumps({'index-version': 1, 'files': indice}, indent=2).encode("utf-8")
+
+        caminho_temporario = caminho_pacote.with_name(f"{caminho_pacote.name}.{os.getpid()}.tmp")
+        try:
+            with tarfile.open(caminho_temporario, "w:gz") as tar:
+                for nome_arquivo, conteudo in arquivos_pacote.items():
+                    informacoes = tarfile.TarInfo(f"package/{nome_arquivo}")
+                    informacoes.size = len(conteudo)
+                    informacoes.mtime = int(time.time())
+                    tar.addfile(informacoes, io.BytesIO(conteudo))
+            os.replace(caminho_temporario, caminho_pacote)
+        finally:
+            caminho_temporario.unlink(missing_ok=True)
+
+
+    def _remover_pacotes_antigos(self):
+        """Mantém apenas os MAXIMO_PACOTES pacotes usados mais recentemente (chamado com o lock adquirido)"""
+        em_uso = set(self._compilados.values())
+        pacotes = sorted(self.pasta_pacotes.glob("*.tgz"), key=lambda pacote: pacote.stat().st_mtime, reverse=True)
+        for pacote in pacotes[self.MAXIMO_PACOTES:]:
+            if pacote.resolve() not in em_uso:
+                pacote.unlink(missing_ok=True)
@@ -1,6 +1,8 @@
 from Backend.Classes.controlador_configuracao import ControladorConfiguracao
+from Backend.Classes.controlador_admissao import ControladorAdmissao
+from Backend.Classes.detector_recursos import DetectorRecursos
+from Backend.Classes.metricas_execucao import MetricasExecucao
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +24,70 @@ class ConfiguradorExecucao:
             int: O valor de threads a ser usado"""
         try:
             max_threads = int(self.controlador_configuracao.obter_configuracao_segura('max_threads'))
-            cpu_cores = os.cpu_count() or 1
-            return min(max_threads, max(1, (cpu_cores - 2)))
+            cpu_cores = DetectorRecursos().obter_cpus_disponiveis() # Respeita cgroup e afinidade (containers)
+            num_threads = min(max_threads, max(1, (cpu_cores - 2)))
+
+            # Cada validator é uma JVM => limitar também pela memória disponível
+            memoria_disponivel = ControladorAdmissao.obter_memoria_disponivel_mb()
+            if self.controle_memoria_ativo() and memoria_disponivel is not None:
+                memoria_por_validator = int(self.controlador_configuracao.obter_configuracao_segura('memoria_por_validator_mb'))
+                limite_memoria = int((memoria_disponivel - ControladorAdmissao.RESERVA_MEMORIA_MB) // memoria_por_validator)
+                if limite_memoria < num_threads:
+                    logger.info(f"Threads limitadas de {num_threads} para {max(1, limite_memoria)} pela memória disponível ({memoria_disponivel:.0f} MB)")
+                num_threads = min(num_threads, max(1, limite_memoria))
+            return num_threads
         except Exception as e:
             logger.warning(f"Erro ao calcular threads usando valor padrão: {e}")
             return 1  # por segurança
     
 
+    def controle_memoria_ativo(self) -> bool:
+        """
+        Indica se a concorrência dos processos do validator deve ser limitada pela memória
+        
+        Returns:
+            bool: True se o controle de memória estiver habilitado
+        """
+        return bool(self.controlador_configuracao.obter_configuracao_segura('controle_memoria'))
+
+
+    def criar_controlador_admissao(self, num_threads: int, metricas: MetricasExecucao = None) -> ControladorAdmissao|None:
+        """
+        Cria o controlador que ajusta a concorrência de acordo com a memória disponível
+        
+        Args:
+            num_threads (int): Número máximo de processos simultâneos
+            metricas (MetricasExecucao): Onde registrar as decisões de concorrência (opcional)
+        
+        Returns:
+            ControladorAdmissao|None: O controlador ou None se o controle de memória estiver desabilitado
+        """
+        if not self.controle_memoria_ativo():
+            return None
+        memoria_por_validator = int(self.controlador_configuracao.obter_configuracao_segura('memoria_por_validator_mb'))
+        return ControladorAdmissao(num_threads, memoria_por_validator, metricas)
+
+
+    def usar_java_sistema(self) -> bool:
+        """
+        Indica se um Java 17+ do sistema deve ser usado no lugar do JDK baixado pelo fut
+        
+        Returns:
+            bool: True se o Java do sistema deve ser usado quando encontrado
+        """
+        return bool(self.controlador_configuracao.obter_configuracao_segura('usar_java_sistema'))
+
+
+    def modo_offline(self) -> bool:
+        """
+        Indica se o fut deve executar sem nenhum acesso à rede
+        
+        Returns:
+            bool: True se o modo offline estiver ativo
+        """
+        return bool(self.controlador_configuracao.obter_configuracao_segura('modo_offline'))
+
+
     def obter_timeout(self) -> int:
         """
         Obtém o timeout configurado para execução dos testes
@@ -38,6 +97,109 @@ class ConfiguradorExecucao:
         """
         return int(self.controlador_configuracao.obter_configuracao_segura('timeout'))
 
+
+    def obter_tamanho_lote(self) -> int:
+        """
+        Obtém o número máximo de testes validados por uma única execução do validator
+        
+        Returns:
+            int: Tamanho máximo do lote (1 desabilita a execução em lotes)
+        """
+        return max(1, int(self.controlador_configuracao.obter_configuracao_segura('tamanho_maximo_lote')))
+
+
+    def obter_configuracao_pool(self) -> dict:
+        """
+        Obtém as configurações do pool de processos do validator
+        
+        Returns:
+            dict: 'ativo', 'max_validacoes' e 'limite_memoria_mb'
+        """
+        return {
+            'ativo': bool(self.controlador_configuracao.obter_configuracao_segura('usar_pool_validator')),
+            'max_validacoes': int(self.controlador_configuracao.obter_configuracao_segura('max_validacoes_por_trabalhador')),
+            'limite_memoria_mb': int(self.controlador_configuracao.obter_configuracao_segura('limite_memoria_trabalhador_mb')),
+        }
+
+    
+    def obter_configuracao_jvm(self) -> dict:
+        """
+        Obtém as configurações da JVM do validator
+        
+        Returns:
+            dict: 'perfil' (perfil de flags) e 'usar_cds' (Class Data Sharing)
+        """
+        return {
+            'perfil': str(self.controlador_configuracao.obter_configuracao_segura('perfil_jvm')),
+            'usar_cds': bool(self.controlador_configuracao.obter_configuracao_segura('usar_cds')),
+        }
+
+    
+    def obter_configuracao_cache(self) -> dict:
+        """
+        Obtém as configurações do cache de resultados
+        
+        Returns:
+            dict: 'ativo', 'tamanho_maximo_mb', 'endereco_remoto' e 'timeout_remoto_ms'
+        """
+        return {
+            'ativo': bool(self.controlador_configuracao.obter_configuracao_segura('usar_cache_resultados')),
+            'tamanho_maximo_mb': int(self.controlador_configuracao.obter_configuracao_segura('tamanho_maximo_cache_mb')),
+            'endereco_remoto': str(self.controlador_configuracao.obter_configuracao_segura('endereco_cache_remoto') or "").strip(),
+            'timeout_remoto_ms': int(self.controlador_configuracao.obter_configuracao_segura('timeout_cache_remoto_ms')),
+        }
+
+    
+    def obter_configuracao_proxy_terminologia(self) -> dict:
+        """
+        Obtém as configurações do proxy local de terminologia e pacotes
+        
+        Returns:
+            dict: 'ativo', 'servidor', 'validade_horas' e 'modo_replay' (sempre ativo no modo offline)
+        """
+        return {
+            'ativo': bool(self.controlador_configuracao.obter_configuracao_segura('usar_proxy_terminologia')),
+            'servidor': str(self.controlador_configuracao.obter_configuracao_segura('servidor_terminologia') or "").strip(),
+            'validade_horas': float(self.controlador_configuracao.obter_configuracao_segura('validade_cache_terminologia_horas')),
+            'modo_replay': bool(self.controlador_configuracao.obter_configuracao_segura('modo_replay_terminologia')) or self.modo_offline(),
+        }
+
+    
+    def obter_configuracao_pacotes(self) -> dict:
+        """
+        Obtém as configurações do download antecipado dos pacotes (IGs) dos testes
+        
+        Returns:
+            dict: 'prefetch' (baixar antes da execução) e 'servidor' (registro de pacotes)
+        """
+        return {
+            'prefetch': bool(self.controlador_configuracao.obter_configuracao_segura('prefetch_pacotes')),
+            'servidor': str(self.controlador_configuracao.obter_configuracao_segura('servidor_pacotes') or "").strip(),
+        }
+
+    
+    def obter_configuracao_executor(self) -> dict:
+        """
+        Obtém as configurações do executor assíncrono dos processos do validator
+        
+        Returns:
+            dict: 'ativo' (usar o executor) e 'salvar_logs' (gravar a saída de cada teste)
+        """
+        return {
+            'ativo': bool(self.controlador_configuracao.obter_configuracao_segura('usar_executor_assincrono')),
+            'salvar_logs': bool(self.controlador_configuracao.obter_configuracao_segura('armazenar_saida_validator', False)),
+        }
+
+    
+    def obter_saida_em_memoria(self) -> bool:
+        """
+        Indica se a saída do validator deve ser lida uma única vez e mantida em memória para o relatório
+        
+        Returns:
+            bool: True se a saída em memória estiver habilitada
+        """
+        return bool(self.controlador_configuracao.obter_configuracao_segura('saida_validator_em_memoria'))
+
     
     def obter_tipo_relatorio(self) -> str:
         """
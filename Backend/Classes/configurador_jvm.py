@@ -0,0 +1,159 @@
+from Backend.Classes.gerenciador_validator import GerenciadorValidator
+from Backend.Classes.gerenciador_java import GerenciadorJava
+from pathlib import Path
+import subprocess
+import tempfile
+import logging
+import shutil
+import json
+import re
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class ConfiguradorJvm:
+    """
+    Responsável pelos argumentos da JVM usados ao executar o validator_cli:
+    perfis de flags (inicialização ou vazão) e o arquivo de Class Data Sharing (AppCDS)
+    """
+
+    # Constantes
+    PASTA_CDS = "cds"
+    VERSAO_MINIMA_CDS_DINAMICO = 13  # -XX:ArchiveClassesAtExit
+    PERFIS = {
+        # JVMs de vida curta (uma por teste): compilação C1 e GC simples
+        'inicializacao': ["-XX:TieredStopAtLevel=1", "-XX:+UseSerialGC", "-XX:-UsePerfData"],
+        # JVMs de vida longa (pool/lotes grandes): compilação completa e GC paralelo
+        'vazao': ["-XX:+UseParallelGC", "-XX:-UsePerfData"],
+        'padrao': [],
+    }
+    # Recurso mínimo validado para carregar as classes usadas em uma validação real
+    RECURSO_TREINO_CDS = {"resourceType": "Basic", "code": {"text": "fut"}}
+
+    # Construtor
+    def __init__(self, path_arquivos: Path, caminho_validator: Path):
+        """
+        Inicializa o configurador da JVM
+
+        Args:
+            path_arquivos (Path): Pasta de arquivos do projeto (onde os arquivos CDS são guardados)
+            caminho_validator (Path): Caminho do validator_cli.jar
+        """
+        self.pasta_cds = path_arquivos / self.PASTA_CDS
+        self.caminho_validator = caminho_validator
+
+
+    def obter_argumentos_perfil(self, perfil: str) -> list[str]:
+        """
+        Retorna as flags da JVM de um perfil
+
+        Args:
+            perfil (str): 'inicializacao', 'vazao' ou 'padrao'
+
+        Returns:
+            list[str]: Flags do perfil (perfil desconhecido usa 'padrao')
+        """
+        if perfil not in self.PERFIS:
+            logger.warning(f"Perfil de JVM '{perfil}' desconhecido, usando 'padrao'")
+        return list(self.PERFIS.get(perfil, self.PERFIS['padrao']))
+
+
+    def _caminho_arquivo_cds(self, versao_java: str, perfil: str) -> Path|None:
+        """
+        Caminho do arquivo CDS, identificado pela versão do validator e do JDK e pelo perfil
+        (um arquivo gerado com um GC não é aceito pela JVM iniciada com outro)
+
+        Args:
+            versao_java (str): Versão do JDK
+            perfil (str): Perfil de flags usado no treino e na execução
+
+        Returns:
+            Path|None: Caminho do arquivo ou None se a versão do validator for desconhecida
+        """
+        versao_validator = GerenciadorValidator.verificar_versao_validator(self.caminho_validator)
+        if not versao_validator or not versao_java:
+            return None
+        perfil = perfil if perfil in self.PERFIS else 'padrao'
+        chave = re.sub(r'[^0-9A-Za-z._-]', '_', f"validator-{versao_validator}_jdk-{versao_java}_perfil-{perfil}")
+        return self.pasta_cds / f"{chave}.jsa"
+
+
+    def _remover_arquivos_obsoletos(self, arquivo_atual: Path):
+        """Remove arquivos CDS de outras versões do validator/JDK (os dos outros perfis são mantidos)"""
+        prefixo_versoes = arquivo_atual.name.rsplit("_perfil-", 1)[0] + "_perfil-"
+        for arquivo_cds in self.pasta_cds.glob("*.jsa"):
+            if not arquivo_cds.name.startswith(prefixo_versoes):
+                logger.info(f"Removendo arquivo CDS obsoleto: {arquivo_cds.name}")
+                arquivo_cds.unlink(missing_ok=True)
+
+
+    def preparar_arquivo_cds(self, java_path: Path|None, perfil: str, tempo_timeout: int) -> Path|None:
+        """
+        Garante que existe um arquivo CDS para a combinação atual de validator, JDK e perfil.
+        Se não existir, executa uma validação de treino para gerá-lo
+
+        Args:
+            java_path (Path): Caminho para o executável Java
+            perfil (str): Perfil de flags usado também no treino
+            tempo_timeout (int): Tempo máximo da validação de treino
+
+        Returns:
+            Path|None: Caminho do arquivo CDS ou None se não for possível usá-lo
+        """
+        versao_java = GerenciadorJava.obter_versao_java(java_path)
+        versao_principal = GerenciadorJava.obter_versao_principal_java(versao_java)
+        if versao_principal is None or versao_principal < self.VERSAO_MINIMA_CDS_DINAMICO:
+            logger.info(f"CDS dinâmico indisponível para o Java {versao_java}")
+            return None
+
+        arquivo_cds = self._caminho_arquivo_cds(versao_java, perfil)
+        if arquivo_cds is None:
+            return None
+        self.pasta_cds.mkdir(parents=True, exist_ok=True)
+        self._remover_arquivos_obsoletos(arquivo_cds)
+        if arquivo_cds.exists():
+            return arquivo_cds
+
+        logger.info(f"Gerando arquivo CDS {arquivo_cds.name} (apenas na primeira execução desta versão)")
+        print("\rPreparando inicialização rápida do validator (apenas na primeira execução)...")
+        pasta_treino = Path(tempfile.mkdtemp(prefix="fut-cds-"))
+        arquivo_temporario = arquivo_cds.with_name(f"{arquivo_cds.stem}.{os.getpid()}.tmp")
+        try:
+            arquivo_recurso = pasta_treino / "treino.json"
+            arquivo_recurso.write_text(json.dumps(self.RECURSO_TREINO_CDS), encoding="utf-8")
+            gerenciador_validator = GerenciadorValidator(
+                self.caminho_validator,
+                self.obter_argumentos_perfil(perfil) + [f"-XX:ArchiveClassesAtExit={arquivo_temporario}"]
+            )
+            comando = gerenciador_validator.montar_comando([arquivo_recurso], pasta_treino / "saida.json", java_path)
+            subprocess.run(comando, capture_output=True, text=True, timeout=tempo_timeout)
+            if not arquivo_temporario.exists():
+                logger.warning("A JVM não gerou o arquivo CDS, seguindo sem CDS")
+                return None
+            os.replace(arquivo_temporario, arquivo_cds)  # Atômico: outras execuções nunca veem um arquivo parcial
+            return arquivo_cds
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Erro ao gerar arquivo CDS: {e}")
+            return None
+        finally:
+            arquivo_temporario.unlink(missing_ok=True)
+            shutil.rmtree(pasta_treino, ignore_errors=True)
+
+
+    def obter_argumentos_jvm(self, perfil: str, arquivo_cds: Path|None) -> list[str]:
+        """
+        Monta os argumentos da JVM do validator
+
+        Args:
+            perfil (str): Perfil de flags da JVM
+            arquivo_cds (Path): Arquivo CDS a ser usado (opcional)
+
+        Returns:
+            list[str]: Argumentos da JVM
+        """
+        argumentos = self.obter_argumentos_perfil(perfil)
+        if arquivo_cds is not None and arquivo_cds.exists():
+            # -Xshare:auto => a JVM ignora o arquivo se ele for incompatível, sem falhar
+            argumentos += [f"-XX:SharedArchiveFile={arquivo_cds}", "-Xshare:auto"]
+        return argumentos
@@ -1,8 +1,12 @@
 from Backend.Classes.controlador_configuracao import ControladorConfiguracao
 from Backend.Classes.gerenciador_validator import GerenciadorValidator
 from Backend.Classes.arquivo_downloader import ArquivoDownloader
+from Backend.Classes.cache_ferramentas import CacheFerramentas
 from pathlib import Path
+import hashlib
+import shutil
 import sys
+import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,18 +20,21 @@ class ConfiguradorValidator:
     VALIDATOR_FILE = "validator_cli.jar"
     TEMP_DIR = ".temp-fut"
     RESULTS_DIR = "resultados-fut"
+    PASTA_MEMORIA = Path("/dev/shm")  # tmpfs (Linux) usado para a saída temporária em memória
     
     # Construtor
-    def __init__(self, controlador_configuracao: ControladorConfiguracao, path_arquivos: Path):
+    def __init__(self, controlador_configuracao: ControladorConfiguracao, path_arquivos: Path, cache_ferramentas: CacheFerramentas = None):
         """
         Inicializa o configurador do validator
         
         Args:
             controlador_configuracao (ControladorConfiguracao): Instância do controlador de configuração
             path_arquivos (Path): Caminho da pasta de arquivos
+            cache_ferramentas (CacheFerramentas): Cache compartilhado usado pelo validator padrão (opcional)
         """
         self.controlador_configuracao = controlador_configuracao
         self.path_arquivos = path_arquivos
+        self.cache_ferramentas = cache_ferramentas
     
 
     def resolver_caminho_validator(self) -> Path:
@@ -45,6 +52,8 @@ class ConfiguradorValidator:
         path_validator_str = self.controlador_configuracao.obter_configuracao_segura('caminho_validator', "default")
 
         if path_validator_str == "default":
+            if self.cache_ferramentas is not None:
+                return self._configurar_validator(self._caminho_validator_cache(), self.cache_ferramentas)
             path_validator = self.path_arquivos / self.VALIDATOR_FILE
         else:
             path_validator = Path(path_validator_str)
@@ -54,6 +63,28 @@ class ConfiguradorValidator:
         return self._configurar_validator(path_validator)
     
 
+    def _caminho_validator_cache(self) -> Path:
+        """
+        Caminho do validator padrão no cache de ferramentas. Um validator baixado por versões
+        anteriores do fut (direto na pasta de arquivos) é copiado para o cache, evitando um novo download
+
+        Returns:
+            Path: Validator atual do cache (ou o destino da instalação, se não houver nenhum)
+        """
+        caminho_atual = self.cache_ferramentas.caminho_validator_atual()
+        caminho_legado = self.path_arquivos / self.VALIDATOR_FILE
+        if caminho_atual is None and caminho_legado.exists():
+            versao_legada = GerenciadorValidator.verificar_versao_validator(caminho_legado)
+            if versao_legada:
+                with self.cache_ferramentas.bloqueio(CacheFerramentas.PASTA_VALIDATOR):
+                    caminho_atual = self.cache_ferramentas.caminho_validator_atual()
+                    if caminho_atual is None:
+                        caminho_temporario = self.cache_ferramentas.caminho_temporario_validator()
+                        shutil.copyfile(caminho_legado, caminho_temporario)
+                        caminho_atual = self.cache_ferramentas.instalar_validator(caminho_temporario, versao_legada)
+        return caminho_atual or self.cache_ferramentas.pasta_validator / self.VALIDATOR_FILE
+    
+
     def definir_pasta_validator(self) -> Path:
         """
         Determina a pasta onde os arquivos do validator serão salvos
@@ -66,6 +97,12 @@ class ConfiguradorValidator:
         if flag_salvar_output:
             pasta_relatorio = Path.cwd() / self.RESULTS_DIR
             logger.debug("Usando pasta permanente para resultados do validator")
+        elif self.controlador_configuracao.obter_configuracao_segura('saida_validator_em_memoria', False) and self.PASTA_MEMORIA.is_dir() and os.access(self.PASTA_MEMORIA, os.W_OK):
+            # Uma pasta por execução: os arquivos são lidos e removidos logo após cada validação
+            identificador = hashlib.sha256(str(Path.cwd()).encode("utf-8")).hexdigest()[:12]
+            self._remover_pastas_memoria_orfas(identificador)
+            pasta_relatorio = self.PASTA_MEMORIA / f"fut-{identificador}-{os.getpid()}"
+            logger.debug("Usando pasta temporária em memória (tmpfs) para resultados do validator")
         else:
             pasta_relatorio = Path.cwd() / self.TEMP_DIR
             logger.debug("Usando pasta temporária para resultados do validator")
@@ -74,12 +111,48 @@ class ConfiguradorValidator:
         return pasta_relatorio
     
     
-    def _configurar_validator(self, path_validator: Path) -> Path:
+    def _remover_pastas_memoria_orfas(self, identificador: str):
+        """
+        Remove as pastas em memória deixadas por execuções interrompidas (processo já finalizado),
+        que ocupariam a RAM até a reinicialização do sistema
+
+        Args:
+            identificador (str): Identificador do diretório de trabalho
+        """
+        for pasta in self.PASTA_MEMORIA.glob(f"fut-{identificador}*"):
+            pid = pasta.name.removeprefix(f"fut-{identificador}").lstrip("-")
+            if pid.isdigit():
+                try:
+                    os.kill(int(pid), 0)
+                    continue  # Execução ainda em andamento
+                except ProcessLookupError:
+                    pass
+                except OSError:
+                    continue  # Processo de outro usuário
+            shutil.rmtree(pasta, ignore_errors=True)
+
+
+    @classmethod
+    def eh_pasta_temporaria(cls, pasta_relatorio: Path) -> bool:
+        """
+        Indica se a pasta de resultados do validator é temporária (removida ao final da execução)
+
+        Args:
+            pasta_relatorio (Path): Pasta definida por definir_pasta_validator
+
+        Returns:
+            bool: True para a pasta .temp-fut ou a pasta em memória
+        """
+        return pasta_relatorio.name == cls.TEMP_DIR or pasta_relatorio.parent == cls.PASTA_MEMORIA
+
+
+    def _configurar_validator(self, path_validator: Path, cache_ferramentas: CacheFerramentas = None) -> Path:
         """
         Configura o validator_cli usando GerenciadorValidator
 
         Args:
             path_validator (Path): Caminho do validator_cli.jar
+            cache_ferramentas (CacheFerramentas): Cache onde o validator é instalado por versão (opcional)
 
         Returns:
             Path: Caminho do validator_cli.jar configurado
@@ -88,15 +161,22 @@ class ConfiguradorValidator:
             SystemExit: Se não for possível configurar o validator_cli
         """
         try:
-            gerenciador_validator = GerenciadorValidator(path_validator)
+            gerenciador_validator = GerenciadorValidator(path_validator, cache_ferramentas=cache_ferramentas, sha256_validator=self.controlador_configuracao.obter_configuracao_segura('sha256_validator'))
             
             # Usar a funcionalidade segura do GerenciadorValidator
             timeout = self.controlador_configuracao.obter_configuracao_segura('requests_timeout', 300)
-            downloader = ArquivoDownloader(timeout)
+            downloader = ArquivoDownloader.a_partir_configuracao(self.controlador_configuracao, timeout)
             
-            if not gerenciador_validator.atualizar_validator_cli_seguro(timeout, downloader):
+            if not gerenciador_validator.atualizar_validator_cli_seguro(
+                timeout, downloader,
+                self.controlador_configuracao.obter_configuracao_segura('intervalo_verificacao_validator_horas'),
+                bool(self.controlador_configuracao.obter_configuracao_segura('modo_offline')),
+                em_segundo_plano=True,
+            ) and not gerenciador_validator.caminho_validador.exists():
                 logger.fatal("Erro ao configurar o validator_cli")
                 sys.exit("Erro ao configurar o validator_cli")
+            # No cache de ferramentas a instalação/atualização define a pasta da versão
+            path_validator = gerenciador_validator.caminho_validador
             
             # Verificar se o validator está funcional
             versao = GerenciadorValidator.verificar_versao_validator(path_validator)
@@ -0,0 +1,248 @@
+from Backend.Classes.detector_recursos import DetectorRecursos
+from Backend.Classes.metricas_execucao import MetricasExecucao
+from contextlib import contextmanager
+from collections import deque
+import threading
+import logging
+import glob
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class ControladorAdmissao:
+    """
+    Controla quantos processos do validator podem executar ao mesmo tempo
+    de acordo com a memória disponível e o pico de memória observado nas validações.
+    O pico é o maior VmHWM dos processos do validator em execução e dos últimos finalizados
+    (Linux), amostrado enquanto houver processos admitidos
+    """
+
+    # Constantes
+    RESERVA_MEMORIA_MB = 512  # memória mantida livre para o sistema
+    FATOR_SEGURANCA_PICO = 1.2  # margem sobre o pico observado
+    MEMORIA_MINIMA_PROCESSO_MB = 256  # nenhuma JVM do validator usa menos que isso
+    FRACAO_HEAP_JVM = 0.75  # fração da memória de cada processo destinada ao heap
+    XMX_MINIMO_MB = 512
+    XMX_MAXIMO_MB = 8192
+    LIMIAR_PRESSAO_MEMORIA = 10.0  # % de tempo com tarefas bloqueadas por memória (PSI avg10)
+    INTERVALO_REAVALIACAO = 0.5  # segundos (também o intervalo de amostragem da memória)
+    JANELA_PICOS = 2  # processos finalizados considerados no pico recente, por vaga de concorrência
+    NOME_PROCESSO_VALIDATOR = "java"
+
+    # Construtor
+    def __init__(self, max_concorrencia: int, memoria_estimada_mb: int, metricas: MetricasExecucao = None):
+        """
+        Inicializa o controlador de admissão
+
+        Args:
+            max_concorrencia (int): Limite superior de processos simultâneos
+            memoria_estimada_mb (int): Estimativa inicial de memória de um processo do validator
+            metricas (MetricasExecucao): Onde registrar as decisões de concorrência (opcional)
+        """
+        self.max_concorrencia = max(1, max_concorrencia)
+        self.memoria_estimada_mb = max(1, memoria_estimada_mb)
+        self.metricas = metricas
+        self._em_execucao = 0
+        self._ultimo_limite = None
+        self._pico_observado_mb = None
+        self._picos_ativos = {}  # pid => maior VmHWM (MB) lido do processo em execução
+        self._picos_recentes = deque(maxlen=self.max_concorrencia * self.JANELA_PICOS)  # VmHWM dos últimos finalizados
+        self._amostrador = None
+        self._condicao = threading.Condition()
+        self._historico_limites = []
+
+
+    @staticmethod
+    def obter_memoria_disponivel_mb() -> float|None:
+        """
+        Obtém a memória disponível para novos processos (respeitando limites de cgroup)
+
+        Returns:
+            float|None: Memória disponível em MB ou None se não for possível medir
+        """
+        return DetectorRecursos().obter_memoria_disponivel_mb()
+
+
+    @classmethod
+    def sistema_sob_pressao(cls) -> bool:
+        """
+        Verifica se o sistema está sob pressão de memória (Linux PSI)
+
+        Returns:
+            bool: True se a pressão de memória estiver acima do limiar
+        """
+        try:
+            with open("/proc/pressure/memory", "r", encoding="utf-8") as arquivo_pressao:
+                for linha in arquivo_pressao:
+                    if linha.startswith("some"):
+                        campos = dict(campo.split("=") for campo in linha.split()[1:])
+                        return float(campos.get("avg10", 0)) > cls.LIMIAR_PRESSAO_MEMORIA
+        except (OSError, ValueError):
+            return False
+        return False
+
+
+    @staticmethod
+    def _listar_processos_filhos() -> list[int]:
+        """PIDs dos processos filhos deste processo (vazio se /proc não estiver disponível)"""
+        pids = []
+        for arquivo_filhos in glob.glob(f"/proc/{os.getpid()}/task/*/children"):
+            try:
+                with open(arquivo_filhos, "r", encoding="utf-8") as arquivo:
+                    pids += [int(pid) for pid in arquivo.read().split()]
+            except (OSError, ValueError):
+                continue
+        return pids
+
+
+    @classmethod
+    def _ler_pico_processo_mb(cls, pid: int) -> float|None:
+        """
+        Obtém o pico de memória residente (VmHWM) de um processo do validator
+
+        Returns:
+            float|None: Pico em MB ou None se o processo não for uma JVM ou já tiver terminado
+        """
+        try:
+            with open(f"/proc/{pid}/status", "r", encoding="utf-8") as arquivo_status:
+                for linha in arquivo_status:
+                    if linha.startswith("Name:") and linha.split()[1] != cls.NOME_PROCESSO_VALIDATOR:
+                        return None
+                    if linha.startswith("VmHWM:"):
+                        return int(linha.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            return None
+        return None
+
+
+    def _atualizar_pico(self):
+        """
+        Amostra o VmHWM dos processos do validator em execução e arquiva o dos que terminaram;
+        o pico observado passa a ser o maior entre eles (chamado com a condição adquirida)
+        """
+        ativos = {}
+        for pid in self._listar_processos_filhos():
+            pico_mb = self._ler_pico_processo_mb(pid)
+            if pico_mb is not None:
+                ativos[pid] = max(pico_mb, self._picos_ativos.get(pid, 0))
+        for pid, pico_mb in self._picos_ativos.items():
+            if pid not in ativos:
+                self._picos_recentes.append(pico_mb)
+        self._picos_ativos = ativos
+
+        picos = list(ativos.values()) + list(self._picos_recentes)
+        pico_mb = max(picos) if picos else None
+        if pico_mb is not None and pico_mb != self._pico_observado_mb:
+            self._pico_observado_mb = pico_mb
+            if self.metricas is not None:
+                self.metricas.registrar('pico_memoria_validator_mb', round(pico_mb, 1))
+
+
+    def _amostrar_memoria(self):
+        """Amostra a memória dos processos enquanto houver processos admitidos (executado em uma thread própria)"""
+        with self._condicao:
+            while self._em_execucao > 0:
+                self._atualizar_pico()
+                self._condicao.wait(timeout=self.INTERVALO_REAVALIACAO)
+            self._amostrador = None
+
+
+    def _memoria_por_processo_mb(self) -> float:
+        """Estimativa atual de memória usada por um processo do validator"""
+        if self._pico_observado_mb:
+            return max(self.MEMORIA_MINIMA_PROCESSO_MB, self._pico_observado_mb * self.FATOR_SEGURANCA_PICO)
+        return self.memoria_estimada_mb
+
+
+    def calcular_concorrencia(self, em_execucao: int = 0) -> int:
+        """
+        Calcula quantos processos podem executar simultaneamente
+
+        Args:
+            em_execucao (int): Processos já em execução (sua memória já não está disponível)
+
+        Returns:
+            int: Limite de processos simultâneos (no mínimo 1)
+        """
+        memoria_disponivel = self.obter_memoria_disponivel_mb()
+        if memoria_disponivel is None:
+            return self.max_concorrencia
+
+        if self.sistema_sob_pressao():
+            # Não admitir novos processos enquanto a pressão persistir
+            return max(1, min(em_execucao, self.max_concorrencia))
+
+        processos_adicionais = int((memoria_disponivel - self.RESERVA_MEMORIA_MB) // self._memoria_por_processo_mb())
+        return max(1, min(self.max_concorrencia, em_execucao + processos_adicionais))
+
+
+    def obter_argumentos_jvm(self) -> list[str]:
+        """
+        Calcula o -Xmx de cada processo do validator de acordo com a memória de cada trabalhador
+
+        Returns:
+            list[str]: Argumentos da JVM (vazio se a memória não puder ser medida)
+        """
+        memoria_disponivel = self.obter_memoria_disponivel_mb()
+        if memoria_disponivel is None:
+            return []
+        concorrencia = self.calcular_concorrencia()
+        memoria_por_trabalhador = (memoria_disponivel - self.RESERVA_MEMORIA_MB) / concorrencia
+        xmx_mb = int(min(self.XMX_MAXIMO_MB, max(self.XMX_MINIMO_MB, memoria_por_trabalhador * self.FRACAO_HEAP_JVM)))
+        logger.info(f"Heap de cada processo do validator definido em {xmx_mb} MB (concorrência inicial {concorrencia})")
+        if self.metricas is not None:
+            self.metricas.registrar('xmx_validator_mb', xmx_mb)
+        return [f"-Xmx{xmx_mb}m"]
+
+
+    def _registrar_decisao(self, limite: int):
+        """Registra no log (e nas métricas) mudanças na concorrência efetiva"""
+        if limite == self._ultimo_limite:
+            return
+        logger.info(
+            f"Concorrência efetiva do validator: {limite} "
+            f"(em execução: {self._em_execucao}, memória estimada por processo: {self._memoria_por_processo_mb():.0f} MB)"
+        )
+        self._ultimo_limite = limite
+        self._historico_limites.append(limite)
+        if self.metricas is not None:
+            self.metricas.registrar('concorrencia_efetiva', {
+                'inicial': self._historico_limites[0],
+                'minima': min(self._historico_limites),
+                'maxima': max(self._historico_limites),
+                'ajustes': len(self._historico_limites) - 1,
+            })
+
+
+    def adquirir(self):
+        """Bloqueia até que um novo processo do validator possa ser iniciado"""
+        with self._condicao:
+            while True:
+                limite = self.calcular_concorrencia(self._em_execucao)
+                self._registrar_decisao(limite)
+                if self._em_execucao < limite:
+                    self._em_execucao += 1
+                    if self._amostrador is None:
+                        self._amostrador = threading.Thread(target=self._amostrar_memoria, name="fut-memoria-validator", daemon=True)
+                        self._amostrador.start()
+                    return
+                self._condicao.wait(timeout=self.INTERVALO_REAVALIACAO)
+
+
+    def liberar(self):
+        """Libera a vaga de um processo finalizado e atualiza o pico de memória observado"""
+        with self._condicao:
+            self._em_execucao -= 1
+            self._atualizar_pico()
+            self._condicao.notify_all()
+
+
+    @contextmanager
+    def reservar(self):
+        """Context manager que adquire e libera uma vaga de execução"""
+        self.adquirir()
+        try:
+            yield
+        finally:
+            self.liberar()
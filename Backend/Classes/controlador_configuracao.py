@@ -1,4 +1,4 @@
-from Backend.Classes.leitor_schema import LeitorSchema
+from Backend.Classes.cache_schema import CacheSchema
 from pathlib import Path
 import configparser
 import logging
@@ -23,7 +23,7 @@ class ControladorConfiguracao:
         """
         self.path_configuracoes = path_configuracoes
         self.path_schema = path_schema
-        self.schema = LeitorSchema(self.path_schema).return_dados_schema()
+        self.schema = CacheSchema.obter_dados(self.path_schema)
 
 
     def _obter_tipo_configuracao(self, nome_configuracao: str) -> type:
@@ -191,6 +191,7 @@ class ControladorConfiguracao:
             try:
                 if isinstance(novo_valor_convertido, (int, float)):
                     self._validar_limites_configuracao(configuracao_ser_alterada, novo_valor_convertido)
+                self._validar_valores_permitidos(configuracao_ser_alterada, novo_valor_convertido)
                 return self._salvar_configuracao(configuracao_ser_alterada, str(novo_valor_convertido))
             except ValueError as e:
                 logger.error(f"Erro ao alterar configuração '{configuracao_ser_alterada}'. Novo valor está fora do escopo permitido!")
@@ -309,6 +310,22 @@ class ControladorConfiguracao:
             raise ValueError(f"Valor muito alto para {descricao}. Máximo: {maximo}")
 
 
+    def _validar_valores_permitidos(self, configuracao: str, novo_valor):
+        """
+        Valida se o novo valor está entre os valores permitidos pelo schema (se definidos).
+
+        Args:
+            configuracao (str): Nome da configuração.
+            novo_valor: Valor a ser validado.
+
+        Raises:
+            ValueError: Se o valor não estiver entre os permitidos.
+        """
+        valores_permitidos = self._obter_limites_configuracao(configuracao)['validation'].get('allowed_values')
+        if valores_permitidos and novo_valor not in valores_permitidos:
+            raise ValueError(f"Valor inválido para {configuracao}. Valores aceitos: {valores_permitidos}")
+
+
     def _salvar_configuracao(self, configuracao: str, novo_valor: str) -> bool:
         """
         Salva a configuração no arquivo settings.ini.
@@ -1,8 +1,18 @@
 from Backend.Classes.servico_execucao_teste import ServicoExecucaoTeste
 from Backend.Classes.configurador_execucao import ConfiguradorExecucao
+from Backend.Classes.metricas_execucao import MetricasExecucao
 from Backend.Classes.servico_relatorio import ServicoRelatorio
 from Backend.Classes.gerenciador_java import GerenciadorJava
+from Backend.Classes.arquivo_downloader import ArquivoDownloader
 from Backend.Classes.gestor_caminho import GestorCaminho
+from Backend.Classes.cache_ferramentas import CacheFerramentas
+from Backend.Classes.configurador_validator import ConfiguradorValidator
+from Backend.Classes.estagio_pipeline import EstagioPipeline
+from Backend.Classes.estagio_pacotes import EstagioPacotes
+from Backend.Classes.gerador_relatorio import GeradorRelatorios
+from pathlib import Path
+import itertools
+import shutil
 import threading
 import logging
 import time
@@ -14,6 +24,8 @@ class CoordenadorTestes:
     
     _instance = None
     _lock = threading.Lock()
+    TAMANHO_FILA_ESTAGIO = 256  # itens prontos aguardando o próximo estágio do pipeline de leitura
+    TESTES_AGUARDANDO_PACOTES = 2048  # testes lidos mantidos enquanto os seus pacotes são baixados
     
     def __init__(self, gestor_caminho: GestorCaminho):
         if CoordenadorTestes._instance is not None:
@@ -23,7 +35,7 @@ class CoordenadorTestes:
         self.executor_service = ServicoExecucaoTeste(gestor_caminho)
         self.configurador = ConfiguradorExecucao(gestor_caminho.controlador_configuracao)
         self.servico_relatorio = ServicoRelatorio()
-        self.gerenciador_java = GerenciadorJava(self.gestor_caminho.return_path('arquivos'))
+        self.gerenciador_java = GerenciadorJava(self.gestor_caminho.return_path('jdk'))
         
         CoordenadorTestes._instance = self
 
@@ -40,12 +52,13 @@ class CoordenadorTestes:
         return cls._instance
 
 
-    def executar_testes_completo(self, args: list):
+    def executar_testes_completo(self, args: list, usar_cache: bool = True):
         """
         Executa o fluxo completo de testes
         
         Args:
             args: Argumentos para lista de testes
+            usar_cache: Se False, ignora o cache de resultados (--no-cache)
             
         Yields:
             list: [resultado, porcentagem] se entrega_gradual=True
@@ -53,34 +66,204 @@ class CoordenadorTestes:
             dict: Resultado da execução com métricas se entrega_gradual=False
         """
         start_time = time.time()
+        pool_validator = None
+        cache_resultado = None
+        proxy_terminologia = None
+        executor_processos = None
+        metricas = MetricasExecucao()
+        estagios = []
+        resultado_pacotes = {'em_cache': [], 'instalados': [], 'ignorados': [], 'ausentes': {}, 'erros': {}}
+        estatisticas_leitura = {}
+        pasta_temporaria = self._obter_pasta_temporaria()
         
         try:
             # 1. Preparação
+            # Busca, leitura e pacotes dos testes correm em paralelo com a preparação do ambiente
+            estagio_testes = self._iniciar_pipeline_testes(args, estagios, resultado_pacotes, estatisticas_leitura)
+            testes = iter(estagio_testes)
+            primeiro_teste = next(testes, None)
+            if primeiro_teste is None:
+                raise ValueError("Nenhum arquivo de teste encontrado. Verifique os argumentos.")
             self._preparar_ambiente()
-            lista_testes = self._obter_lista_testes(args)
             config_execucao = self._obter_configuracao_execucao()
+            config_execucao['metricas'] = metricas
+            config_execucao['controlador_admissao'] = self.configurador.criar_controlador_admissao(
+                config_execucao['num_threads'], metricas
+            )
+            config_execucao['argumentos_jvm'] = self._obter_argumentos_jvm(config_execucao)
+            cache_resultado = self._criar_cache_resultado(config_execucao, usar_cache)
+            config_execucao['cache_resultado'] = cache_resultado
+            proxy_terminologia = self._criar_proxy_terminologia(config_execucao)
+            config_execucao['argumentos_validator'] = proxy_terminologia.obter_argumentos_validator() if proxy_terminologia else []
+            pool_validator = self._criar_pool_validator(config_execucao)
+            config_execucao['pool_validator'] = pool_validator
+            executor_processos = self._criar_executor_processos(config_execucao)
+            config_execucao['executor_processos'] = executor_processos
             
             # 2. Execução
-            # Modo gradual - yielda cada resultado
-            resultados = []
-            for resultado in self._executar_testes_gradual(lista_testes, config_execucao):
-                resultados.append(resultado[0])
+            # Modo gradual - yielda cada resultado, já comparado e agregado ao relatório
+            gerador_relatorio = self.servico_relatorio.iniciar_relatorio()
+            for resultado in self._executar_testes_gradual(itertools.chain([primeiro_teste], testes), config_execucao, estagios):
+                gerador_relatorio.adicionarCasoDeTeste(resultado[0])
                 yield resultado  # [resultado, porcentagem]
                 
             # 3. Relatório após todos os yields
+            self._registrar_pacotes(resultado_pacotes, metricas)
+            self._registrar_leitura(estatisticas_leitura, metricas)
+            if proxy_terminologia is not None:
+                metricas.registrar('proxy_terminologia', proxy_terminologia.obter_estatisticas())
             tempo_total = time.time() - start_time
-            self._gerar_relatorio(resultados, tempo_total)
+            self._gerar_relatorio(gerador_relatorio, tempo_total, metricas, pasta_temporaria)
 
         except Exception as e:
             logger.error(f"Erro durante execução de testes: {e}")
             raise e
+        finally:
+            for estagio in estagios:
+                estagio.cancelar()
+            # Garantir que nenhum processo do validator continue vivo
+            if pool_validator is not None:
+                pool_validator.encerrar()
+            if executor_processos is not None:
+                executor_processos.encerrar()
+            if cache_resultado is not None:
+                cache_resultado.encerrar()
+            if proxy_terminologia is not None:
+                proxy_terminologia.encerrar()
+            # Saídas de execuções interrompidas não permanecem no disco nem na memória (/dev/shm)
+            if pasta_temporaria is not None:
+                shutil.rmtree(pasta_temporaria, ignore_errors=True)
+
+
+    def _obter_pasta_temporaria(self) -> Path|None:
+        """
+        Garante a pasta das saídas do validator (removida ao final de uma execução anterior)
+
+        Returns:
+            Path|None: A pasta, se for temporária (removida ao final desta execução), ou None
+        """
+        pasta_validator = Path(self.gestor_caminho.return_path('pasta_validator'))
+        pasta_validator.mkdir(parents=True, exist_ok=True)
+        return pasta_validator if ConfiguradorValidator.eh_pasta_temporaria(pasta_validator) else None
+
+
+    def planejar_execucao(self, args: list, caminho_saida: Path = None) -> dict:
+        """
+        Compila o plano de execução dos testes sem iniciar nenhuma JVM (dry-run).
+        O arquivo CDS não é gerado e o proxy de terminologia não é iniciado
+
+        Args:
+            args: Argumentos para lista de testes
+            caminho_saida: Arquivo JSON onde o plano é exportado (opcional)
+
+        Returns:
+            dict: Plano de execução (ver PlanoExecucao.para_dict), com o tempo de planejamento
+        """
+        inicio = time.time()
+        lista_testes = self._obter_lista_testes(args)
+        config_execucao = self._obter_configuracao_execucao()
+        argumentos_jvm = self.executor_service.preparar_argumentos_jvm(config_execucao['jvm']['perfil'], False, config_execucao['timeout'])
+        controlador_admissao = self.configurador.criar_controlador_admissao(config_execucao['num_threads'])
+        if controlador_admissao is not None:
+            argumentos_jvm += controlador_admissao.obter_argumentos_jvm()
+        tamanho_lote = 1 if config_execucao['pool']['ativo'] else config_execucao['tamanho_lote']
+
+        plano = self.executor_service.compilar_plano(lista_testes, tamanho_lote, argumentos_jvm)
+        if caminho_saida is not None:
+            plano.exportar_json(caminho_saida)
+        resultado = plano.para_dict()
+        resultado['tempo_planejamento'] = round(time.time() - inicio, 3)
+        return resultado
+
+
+    def prefetch_pacotes(self, args: list) -> dict:
+        """
+        Baixa os pacotes (IGs) usados pelos testes e suas dependências, sem executar os testes
+
+        Args:
+            args: Argumentos para lista de testes
+
+        Returns:
+            dict: Pacotes em cache, instalados, ignorados, ausentes e com erro
+        """
+        lista_testes = self._obter_lista_testes(args)
+        logger.info("Baixando os pacotes usados pelos testes...")
+        return self.executor_service.prefetch_pacotes(
+            lista_testes, self.configurador.obter_configuracao_pacotes()['servidor'],
+            self.configurador.calcular_threads_otimas(), self.configurador.modo_offline()
+        )
+
+
+    def _iniciar_pipeline_testes(self, args: list, estagios: list, resultado_pacotes: dict, estatisticas_leitura: dict = None) -> EstagioPipeline|EstagioPacotes:
+        """
+        Conecta os estágios que entregam os testes à execução: busca dos arquivos,
+        leitura/validação dos YAML e (se habilitado) download dos pacotes dos testes,
+        concorrente com a leitura
+
+        Args:
+            args: Argumentos para lista de testes
+            estagios: Recebe os estágios criados (cancelados ao final da execução)
+            resultado_pacotes: Acumula o resultado do download dos pacotes
+            estatisticas_leitura: Recebe o número de arquivos lidos e o tempo de leitura (opcional)
+
+        Returns:
+            EstagioPipeline|EstagioPacotes: Último estágio, que entrega os testes prontos para execução
+        """
+        logger.info("Iniciando a leitura dos testes...")
+        estagio_arquivos = EstagioPipeline(self.executor_service.gerar_arquivos_teste(args), self.TAMANHO_FILA_ESTAGIO, "fut-busca")
+        estagios.append(estagio_arquivos)
+        testes = self.executor_service.gerar_testes(estagio_arquivos, estatisticas_leitura)
+        config_pacotes = self.configurador.obter_configuracao_pacotes()
+        if config_pacotes['prefetch']:
+            estagio_testes = self.executor_service.criar_estagio_pacotes(
+                testes, config_pacotes['servidor'], self.configurador.calcular_threads_otimas(), self.configurador.modo_offline(),
+                self.TESTES_AGUARDANDO_PACOTES, resultado_pacotes, self._informar_pacote_ausente
+            )
+        else:
+            estagio_testes = EstagioPipeline(testes, self.TAMANHO_FILA_ESTAGIO, "fut-leitura")
+        estagios.append(estagio_testes)
+        return estagio_testes
+
+
+    @staticmethod
+    def _informar_pacote_ausente(referencia: str, motivo: str):
+        """Informa um pacote indisponível assim que ele é identificado (chamado pelo estágio de pacotes)"""
+        print(f"\rPacote {referencia} indisponível (testes que o usam foram marcados como inválidos): {motivo}")
+
+
+    def _registrar_pacotes(self, resultado_pacotes: dict, metricas: MetricasExecucao):
+        """Registra o resumo dos pacotes baixados durante a execução"""
+        if not any(resultado_pacotes.values()):
+            return
+        metricas.registrar('prefetch_pacotes', {situacao: len(pacotes) for situacao, pacotes in resultado_pacotes.items()})
+
+
+    def _registrar_leitura(self, estatisticas_leitura: dict, metricas: MetricasExecucao):
+        """Registra a vazão da leitura dos arquivos de teste (arquivos por segundo)"""
+        if not estatisticas_leitura.get('arquivos'):
+            return
+        tempo_leitura = estatisticas_leitura['tempo_leitura']
+        metricas.registrar('leitura_testes', {
+            'arquivos': estatisticas_leitura['arquivos'],
+            'em_cache': estatisticas_leitura['em_cache'],
+            'processos': estatisticas_leitura['processos'],
+            'tempo_leitura': round(tempo_leitura, 3),
+            'arquivos_por_segundo': round(estatisticas_leitura['arquivos'] / tempo_leitura, 1) if tempo_leitura > 0 else None,
+        })
 
 
     def _preparar_ambiente(self):
-        """Prepara o ambiente para execução dos testes"""
+        """Prepara o ambiente para execução dos testes (JDK e validator)"""
         logger.info("Preparando ambiente...")
-        self.gerenciador_java.java_instalado()
-        self.gerenciador_java.extrair_java()
+        self.gerenciador_java.usar_java_sistema = self.configurador.usar_java_sistema()
+        # Execuções simultâneas não baixam nem extraem o JDK ao mesmo tempo
+        with self.gestor_caminho.cache_ferramentas.bloqueio(CacheFerramentas.PASTA_JDK):
+            if not self.configurador.modo_offline():
+                self.gerenciador_java.java_instalado(ArquivoDownloader.a_partir_configuracao(
+                    self.gestor_caminho.controlador_configuracao, GerenciadorJava.TEMPO_ESPERA_TENTATIVA
+                ))
+            self.gerenciador_java.extrair_java()
+        self.gerenciador_java.resolver_java_executavel()
         self.executor_service.garantir_atualizacao_validator()
 
 
@@ -101,42 +284,157 @@ class CoordenadorTestes:
         """Obtém configurações otimizadas para execução"""
         return {
             'num_threads': self.configurador.calcular_threads_otimas(),
-            'timeout': self.configurador.obter_timeout()
+            'timeout': self.configurador.obter_timeout(),
+            'pool': self.configurador.obter_configuracao_pool(),
+            'tamanho_lote': self.configurador.obter_tamanho_lote(),
+            'jvm': self.configurador.obter_configuracao_jvm(),
+            'cache': self.configurador.obter_configuracao_cache(),
+            'proxy_terminologia': self.configurador.obter_configuracao_proxy_terminologia(),
+            'executor': self.configurador.obter_configuracao_executor(),
+            'saida_em_memoria': self.configurador.obter_saida_em_memoria(),
+            'pacotes': self.configurador.obter_configuracao_pacotes(),
         }
 
 
-    def _executar_testes_gradual(self, lista_testes: list, config: dict):
+    def _criar_cache_resultado(self, config: dict, usar_cache: bool):
+        """
+        Cria o cache de resultados, se habilitado nas configurações e não desativado pelo usuário
+
+        Args:
+            config: Configuração de execução
+            usar_cache: False quando o usuário pediu --no-cache
+
+        Returns:
+            CacheResultado|None: O cache ou None se desabilitado
+        """
+        if not usar_cache or not config['cache']['ativo']:
+            logger.info("Cache de resultados desabilitado")
+            return None
+        try:
+            return self.executor_service.criar_cache_resultado(
+                config['cache']['tamanho_maximo_mb'], config['cache']['endereco_remoto'], config['cache']['timeout_remoto_ms']
+            )
+        except OSError as e:
+            logger.warning(f"Não foi possível criar o cache de resultados, executando sem cache: {e}")
+            return None
+
+
+    def _criar_proxy_terminologia(self, config: dict):
+        """
+        Inicia o proxy local de terminologia e pacotes, se habilitado nas configurações
+
+        Args:
+            config: Configuração de execução
+
+        Returns:
+            ProxyTerminologia|None: O proxy iniciado ou None se desabilitado
+        """
+        config_proxy = config['proxy_terminologia']
+        if not config_proxy['ativo']:
+            return None
+        try:
+            return self.executor_service.criar_proxy_terminologia(
+                config_proxy['servidor'], config_proxy['validade_horas'], config_proxy['modo_replay'], config['pacotes']['servidor']
+            )
+        except OSError as e:
+            logger.warning(f"Não foi possível iniciar o proxy de terminologia, usando o servidor diretamente: {e}")
+            return None
+
+
+    def _obter_argumentos_jvm(self, config: dict) -> list[str]:
+        """
+        Monta os argumentos da JVM do validator: perfil de flags, arquivo CDS e heap (-Xmx)
+
+        Args:
+            config: Configuração de execução
+
+        Returns:
+            list[str]: Argumentos da JVM
+        """
+        argumentos_jvm = self.executor_service.preparar_argumentos_jvm(
+            config['jvm']['perfil'], config['jvm']['usar_cds'], config['timeout']
+        )
+        controlador_admissao = config.get('controlador_admissao')
+        if controlador_admissao is not None:
+            argumentos_jvm += controlador_admissao.obter_argumentos_jvm()
+        return argumentos_jvm
+
+
+    def _criar_pool_validator(self, config: dict):
+        """
+        Cria o pool de processos do validator, se habilitado nas configurações
+
+        Args:
+            config: Configuração de execução
+
+        Returns:
+            PoolValidator|None: O pool criado ou None se o modo estiver desabilitado
+        """
+        if not config['pool']['ativo']:
+            return None
+        logger.info("Execução usando pool de processos do validator")
+        return self.executor_service.criar_pool_validator(
+            config['num_threads'], config['pool']['max_validacoes'], config['pool']['limite_memoria_mb'], config.get('argumentos_jvm'),
+            config.get('argumentos_validator')
+        )
+
+
+    def _criar_executor_processos(self, config: dict):
+        """
+        Cria o executor asyncio dos processos do validator, se habilitado e sem o pool ativo
+        (o pool mantém seus próprios processos persistentes)
+
+        Args:
+            config: Configuração de execução
+
+        Returns:
+            ExecutorProcessos|None: O executor criado ou None
+        """
+        if not config['executor']['ativo'] or config.get('pool_validator') is not None:
+            return None
+        return self.executor_service.criar_executor_processos(config['num_threads'], config['executor']['salvar_logs'])
+
+
+    def _executar_testes_gradual(self, testes, config: dict, estagios: list):
         """
         Executa testes e yielda resultados gradualmente
         
         Args:
-            lista_testes: Lista de arquivos de teste
+            testes: Testes entregues pelo pipeline de leitura
             config: Configuração de execução
+            estagios: Estágios do pipeline de leitura (o total só é conhecido ao fim da leitura)
             
         Yields:
             list: [resultado, porcentagem] para cada teste executado
         """
-        logger.info(f"Iniciando execução gradual de {len(lista_testes)} testes...")
+        logger.info("Iniciando execução gradual dos testes à medida que são lidos...")
         resultados_processados = 0
         
         for resultado in self.executor_service.executar_testes_paralelos(
-            lista_testes, config['num_threads'], config['timeout']
+            testes, config['num_threads'], config['timeout'], config.get('pool_validator'), config['tamanho_lote'], config.get('metricas'),
+            config.get('controlador_admissao'), config.get('argumentos_jvm'), config.get('cache_resultado'), config.get('argumentos_validator'),
+            config.get('executor_processos'), config['saida_em_memoria']
         ):
             resultados_processados += 1
-            porcentagem = round(resultados_processados / len(lista_testes), 4)
+            # Enquanto a leitura não termina, o total é estimado pelo estágio mais adiantado (a busca)
+            total_estimado = max(max(estagio.produzidos for estagio in estagios), resultados_processados)
+            porcentagem = round(resultados_processados / total_estimado, 4)
+            if not all(estagio.finalizado for estagio in estagios):
+                porcentagem = min(porcentagem, 0.99)
             yield [resultado, porcentagem]
 
 
-    def _gerar_relatorio(self, resultados: list, tempo_execucao: float):
-        """Gera o relatório final"""
+    def _gerar_relatorio(self, gerador_relatorio: GeradorRelatorios, tempo_execucao: float, metricas: MetricasExecucao = None, pasta_temporaria: Path = None):
+        """Gera o relatório final a partir dos resultados já agregados e remove a pasta temporária das saídas do validator"""
         logger.info("Testes listados completos")
         
         # Determinar o tipo de relatório a ser gerado
         versao_relatorio = self.configurador.obter_tipo_relatorio()
         
         try:
-            self.servico_relatorio.criar_relatorio_completo(
-                resultados, versao_relatorio, tempo_execucao, self.gestor_caminho.return_path('csv'), self.gestor_caminho.return_path('template_html')
+            self.servico_relatorio.finalizar_relatorio(
+                gerador_relatorio, versao_relatorio, tempo_execucao, self.gestor_caminho.return_path('csv'), self.gestor_caminho.return_path('template_html'),
+                metricas.return_metricas() if metricas is not None else None, pasta_temporaria
             )
         except PermissionError as e:
             logger.error(f"Erro de permissão ao gerar relatório: {e}")
@@ -0,0 +1,248 @@
+from pathlib import Path
+import math
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class DetectorRecursos:
+    """
+    Detecta os recursos (CPU e memória) realmente disponíveis para o processo,
+    respeitando limites de containers (cgroup v1/v2) e a afinidade de CPU
+    """
+
+    # Constantes
+    RAIZ_CGROUP = Path("/sys/fs/cgroup")
+    LIMITE_CGROUP_V1_ILIMITADO = 2 ** 60  # valores acima disso indicam "sem limite" no cgroup v1
+
+    # Construtor
+    def __init__(self, raiz_cgroup: Path = None):
+        """
+        Inicializa o detector
+
+        Args:
+            raiz_cgroup (Path): Ponto de montagem do cgroup (opcional, usado para testes)
+        """
+        self.raiz_cgroup = raiz_cgroup or self.RAIZ_CGROUP
+
+
+    @staticmethod
+    def _ler_arquivo(caminho: Path) -> str|None:
+        """Lê o conteúdo de um arquivo de controle do cgroup (None se não existir)"""
+        try:
+            return caminho.read_text(encoding="utf-8").strip()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+
+    def _caminhos_cgroup_v2(self, nome_arquivo: str) -> list[Path]:
+        """
+        Caminhos candidatos de um arquivo do cgroup v2: o cgroup do processo e a raiz
+        (dentro de containers o cgroup do processo normalmente é montado como raiz)
+        """
+        candidatos = []
+        conteudo_cgroup = self._ler_arquivo(Path("/proc/self/cgroup")) or ""
+        for linha in conteudo_cgroup.splitlines():
+            if linha.startswith("0::"):
+                caminho_relativo = linha[3:].lstrip("/")
+                if caminho_relativo:
+                    candidatos.append(self.raiz_cgroup / caminho_relativo / nome_arquivo)
+        candidatos.append(self.raiz_cgroup / nome_arquivo)
+        return candidatos
+
+
+    def _caminhos_cgroup_v1(self, controlador: str, nome_arquivo: str) -> list[Path]:
+        """
+        Caminhos candidatos de um arquivo do cgroup v1 para um controlador (cpu, memory)
+        """
+        candidatos = []
+        pastas = [pasta.name for pasta in self.raiz_cgroup.glob(f"*{controlador}*") if controlador in pasta.name.split(",")]
+        conteudo_cgroup = self._ler_arquivo(Path("/proc/self/cgroup")) or ""
+        for linha in conteudo_cgroup.splitlines():
+            partes = linha.split(":", 2)
+            if len(partes) == 3 and controlador in partes[1].split(","):
+                caminho_relativo = partes[2].lstrip("/")
+                if caminho_relativo:
+                    candidatos += [self.raiz_cgroup / pasta / caminho_relativo / nome_arquivo for pasta in pastas]
+        candidatos += [self.raiz_cgroup / pasta / nome_arquivo for pasta in pastas]
+        return candidatos
+
+
+    def obter_versao_cgroup(self) -> int|None:
+        """
+        Detecta a versão do cgroup em uso
+
+        Returns:
+            int|None: 2, 1 ou None se não houver cgroup (ex: Windows/macOS)
+        """
+        if (self.raiz_cgroup / "cgroup.controllers").exists():
+            return 2
+        if (self.raiz_cgroup / "memory").exists() or (self.raiz_cgroup / "cpu").exists():
+            return 1
+        return None
+
+
+    def obter_cota_cpu(self) -> float|None:
+        """
+        Obtém a cota de CPU definida pelo cgroup (ex: 4.0 para um limite de 4 CPUs)
+
+        Returns:
+            float|None: Número de CPUs permitidas ou None se não houver limite
+        """
+        versao = self.obter_versao_cgroup()
+        if versao == 2:
+            for caminho in self._caminhos_cgroup_v2("cpu.max"):
+                conteudo = self._ler_arquivo(caminho)
+                if conteudo:
+                    cota, _, periodo = conteudo.partition(" ")
+                    if cota == "max":
+                        return None
+                    try:
+                        return int(cota) / int(periodo or 100000)
+                    except ValueError:
+                        return None
+        elif versao == 1:
+            for caminho in self._caminhos_cgroup_v1("cpu", "cpu.cfs_quota_us"):
+                cota = self._ler_arquivo(caminho)
+                periodo = self._ler_arquivo(caminho.with_name("cpu.cfs_period_us"))
+                if cota and periodo:
+                    try:
+                        if int(cota) <= 0:
+                            return None
+                        return int(cota) / int(periodo)
+                    except ValueError:
+                        return None
+        return None
+
+
+    @staticmethod
+    def obter_cpus_afinidade() -> int|None:
+        """
+        Obtém o número de CPUs em que o processo pode executar (afinidade)
+
+        Returns:
+            int|None: Número de CPUs ou None se o sistema não suportar afinidade
+        """
+        if hasattr(os, "sched_getaffinity"):
+            try:
+                return len(os.sched_getaffinity(0))
+            except OSError:
+                return None
+        return None
+
+
+    def obter_cpus_disponiveis(self) -> int:
+        """
+        Obtém o número efetivo de CPUs: o menor entre sistema, afinidade e cota do cgroup
+
+        Returns:
+            int: Número de CPUs disponíveis (no mínimo 1)
+        """
+        candidatos = [os.cpu_count() or 1]
+        cpus_afinidade = self.obter_cpus_afinidade()
+        if cpus_afinidade:
+            candidatos.append(cpus_afinidade)
+        cota_cpu = self.obter_cota_cpu()
+        if cota_cpu:
+            candidatos.append(math.ceil(cota_cpu))
+        return max(1, min(candidatos))
+
+
+    def _ler_memoria_cgroup(self, arquivo_v2: str, arquivo_v1: str) -> float|None:
+        """Lê um valor de memória (em MB) do cgroup, None se ilimitado ou indisponível"""
+        versao = self.obter_versao_cgroup()
+        conteudo = None
+        if versao == 2:
+            for caminho in self._caminhos_cgroup_v2(arquivo_v2):
+                conteudo = self._ler_arquivo(caminho)
+                if conteudo:
+                    break
+        elif versao == 1:
+            for caminho in self._caminhos_cgroup_v1("memory", arquivo_v1):
+                conteudo = self._ler_arquivo(caminho)
+                if conteudo:
+                    break
+        if not conteudo or conteudo == "max":
+            return None
+        try:
+            valor = int(conteudo)
+        except ValueError:
+            return None
+        if valor >= self.LIMITE_CGROUP_V1_ILIMITADO:
+            return None
+        return valor / (1024 * 1024)
+
+
+    def obter_limite_memoria_mb(self) -> float|None:
+        """
+        Obtém o limite de memória do cgroup (memory.max / memory.limit_in_bytes)
+
+        Returns:
+            float|None: Limite em MB ou None se não houver limite
+        """
+        return self._ler_memoria_cgroup("memory.max", "memory.limit_in_bytes")
+
+
+    @staticmethod
+    def _ler_meminfo(campo: str) -> float|None:
+        """Lê um campo do /proc/meminfo em MB"""
+        try:
+            with open("/proc/meminfo", "r", encoding="utf-8") as arquivo_meminfo:
+                for linha in arquivo_meminfo:
+                    if linha.startswith(f"{campo}:"):
+                        return int(linha.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            return None
+        return None
+
+
+    def obter_memoria_total_mb(self) -> float|None:
+        """
+        Obtém a memória total visível ao processo (limite do cgroup se menor que a do sistema)
+
+        Returns:
+            float|None: Memória total em MB ou None se não for possível medir
+        """
+        candidatos = [valor for valor in (self._ler_meminfo("MemTotal"), self.obter_limite_memoria_mb()) if valor is not None]
+        return min(candidatos) if candidatos else None
+
+
+    def obter_memoria_disponivel_mb(self) -> float|None:
+        """
+        Obtém a memória disponível para novos processos, considerando o limite do cgroup
+
+        Returns:
+            float|None: Memória disponível em MB ou None se não for possível medir
+        """
+        candidatos = []
+        memoria_disponivel_sistema = self._ler_meminfo("MemAvailable")
+        if memoria_disponivel_sistema is not None:
+            candidatos.append(memoria_disponivel_sistema)
+        limite_cgroup = self.obter_limite_memoria_mb()
+        if limite_cgroup is not None:
+            uso_cgroup = self._ler_memoria_cgroup("memory.current", "memory.usage_in_bytes") or 0
+            candidatos.append(max(0, limite_cgroup - uso_cgroup))
+        return min(candidatos) if candidatos else None
+
+
+    def obter_recursos(self) -> dict:
+        """
+        Retorna um resumo dos recursos detectados (usado para inspeção pelo usuário)
+
+        Returns:
+            dict: CPUs e memória do sistema, da afinidade e do cgroup
+        """
+        def _arredondar(valor):
+            return round(valor, 1) if valor is not None else None
+
+        return {
+            'versao_cgroup': self.obter_versao_cgroup(),
+            'cpus_sistema': os.cpu_count(),
+            'cpus_afinidade': self.obter_cpus_afinidade(),
+            'cota_cpu_cgroup': _arredondar(self.obter_cota_cpu()),
+            'cpus_efetivas': self.obter_cpus_disponiveis(),
+            'memoria_total_mb': _arredondar(self.obter_memoria_total_mb()),
+            'limite_memoria_cgroup_mb': _arredondar(self.obter_limite_memoria_mb()),
+            'memoria_disponivel_mb': _arredondar(self.obter_memoria_disponivel_mb()),
+        }
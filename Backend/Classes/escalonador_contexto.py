@@ -0,0 +1,155 @@
+from Backend.Classes.teste import Teste
+from collections import deque
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EscalonadorContexto:
+    """
+    Escalonador que distribui os testes por afinidade de contexto (IGs, perfis e recursos).
+    Cada trabalhador continua no mesmo contexto enquanto houver testes dele,
+    reduzindo as trocas de contexto (e o recarregamento de pacotes) do validator.
+    """
+
+    # Construtor
+    def __init__(self):
+        self._filas_por_contexto = {}
+        self._contexto_trabalhador = {}
+        self._trocas_contexto = {}
+        self._total_por_contexto = {}
+        self._fechado = False
+        self._cancelado = False
+        self._condicao = threading.Condition()
+
+
+    @staticmethod
+    def normalizar_contexto(teste: Teste) -> tuple:
+        """
+        Gera a chave normalizada do contexto de validação de um teste
+
+        Args:
+            teste (Teste): Teste cujo contexto será normalizado
+
+        Returns:
+            tuple: (igs, profiles, resources), cada um ordenado e sem repetições/vazios
+        """
+        conteudo = teste.conteudo if isinstance(teste.conteudo, dict) else {}
+        contexto = conteudo.get('context') or {}
+        if not isinstance(contexto, dict):
+            return ((), (), ())
+
+        def _normalizar_secao(secao: str) -> tuple:
+            valores = contexto.get(secao) or []
+            if not isinstance(valores, list):
+                valores = [valores]
+            return tuple(sorted({str(valor).strip() for valor in valores if valor and str(valor).strip()}))
+
+        return (_normalizar_secao('igs'), _normalizar_secao('profiles'), _normalizar_secao('resources'))
+
+
+    def adicionar(self, item, chave_contexto: tuple):
+        """
+        Adiciona um item ao plano de execução
+
+        Args:
+            item: Item a ser executado (ex: par (número do teste, Teste))
+            chave_contexto (tuple): Chave normalizada do contexto do item
+        """
+        with self._condicao:
+            self._filas_por_contexto.setdefault(chave_contexto, deque()).append(item)
+            self._total_por_contexto[chave_contexto] = self._total_por_contexto.get(chave_contexto, 0) + 1
+            self._condicao.notify()
+
+
+    def fechar(self):
+        """Indica que nenhum item novo será adicionado"""
+        with self._condicao:
+            self._fechado = True
+            self._condicao.notify_all()
+
+
+    def cancelar(self):
+        """Descarta os itens pendentes e libera os trabalhadores em espera"""
+        with self._condicao:
+            self._cancelado = True
+            self._filas_por_contexto.clear()
+            self._condicao.notify_all()
+
+
+    def _escolher_contexto(self, id_trabalhador: int) -> tuple|None:
+        """
+        Escolhe o contexto do próximo item de um trabalhador (chamado com o lock adquirido)
+
+        Args:
+            id_trabalhador (int): Identificador do trabalhador
+
+        Returns:
+            tuple|None: Chave do contexto escolhido ou None se não houver itens pendentes
+        """
+        contexto_atual = self._contexto_trabalhador.get(id_trabalhador)
+        if contexto_atual in self._filas_por_contexto:
+            return contexto_atual
+        if not self._filas_por_contexto:
+            return None
+
+        # Preferir contextos que nenhum outro trabalhador está atendendo, depois o maior pendente
+        contextos_ocupados = set(self._contexto_trabalhador.values())
+        return max(
+            self._filas_por_contexto,
+            key=lambda chave: (chave not in contextos_ocupados, len(self._filas_por_contexto[chave]))
+        )
+
+
+    def proximo(self, id_trabalhador: int, quantidade: int = 1) -> list:
+        """
+        Obtém os próximos itens de um trabalhador, todos do mesmo contexto.
+        Bloqueia enquanto não houver itens e o escalonador não estiver fechado
+
+        Args:
+            id_trabalhador (int): Identificador do trabalhador
+            quantidade (int): Número máximo de itens retornados
+
+        Returns:
+            list: Itens a serem executados (lista vazia quando não há mais trabalho)
+        """
+        with self._condicao:
+            while True:
+                if self._cancelado:
+                    return []
+                chave_contexto = self._escolher_contexto(id_trabalhador)
+                if chave_contexto is not None:
+                    break
+                if self._fechado:
+                    self._contexto_trabalhador.pop(id_trabalhador, None)
+                    return []
+                self._condicao.wait()
+
+            contexto_anterior = self._contexto_trabalhador.get(id_trabalhador)
+            if contexto_anterior is not None and contexto_anterior != chave_contexto:
+                self._trocas_contexto[id_trabalhador] = self._trocas_contexto.get(id_trabalhador, 0) + 1
+            self._trocas_contexto.setdefault(id_trabalhador, 0)
+            self._contexto_trabalhador[id_trabalhador] = chave_contexto
+
+            fila = self._filas_por_contexto[chave_contexto]
+            itens = [fila.popleft() for _ in range(min(max(1, quantidade), len(fila)))]
+            if not fila:
+                del self._filas_por_contexto[chave_contexto]
+            return itens
+
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna as estatísticas do plano de execução
+
+        Returns:
+            dict: Número de contextos distintos e trocas de contexto por trabalhador
+        """
+        with self._condicao:
+            return {
+                'contextos_distintos': len(self._total_por_contexto),
+                'trocas_contexto_por_trabalhador': {
+                    str(id_trabalhador): trocas for id_trabalhador, trocas in sorted(self._trocas_contexto.items())
+                },
+            }
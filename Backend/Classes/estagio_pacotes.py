@@ -0,0 +1,166 @@
+from Backend.Classes.resolvedor_pacotes import ResolvedorPacotes
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Iterable
+import threading
+import logging
+import queue
+
+logger = logging.getLogger(__name__)
+
+
+class EstagioPacotes:
+    """
+    Estágio do pipeline que garante os pacotes (IGs) dos testes antes da execução.
+    Uma thread lê os testes e envia cada referência nova, assim que ela aparece, a um pool
+    de downloads compartilhado por todos os testes; cada teste segue para a execução quando
+    os seus pacotes estiverem resolvidos, sem bloquear a leitura nem os testes que não
+    dependem deles. Pacotes indisponíveis são informados assim que identificados
+    """
+
+    # Constantes
+    _FIM = object()  # marca o fim dos testes na fila
+    TEMPO_ESPERA = 0.5  # segundos entre verificações de cancelamento
+
+    # Construtor
+    def __init__(self, testes: Iterable, resolvedor: ResolvedorPacotes, limite_testes: int, resultado: dict, marcar_ausente: Callable, informar_ausente: Callable = None, nome: str = "fut-leitura"):
+        """
+        Inicia o estágio
+
+        Args:
+            testes (Iterable): Testes lidos (gerador do estágio anterior)
+            resolvedor (ResolvedorPacotes): Resolve e baixa cada pacote e suas dependências
+            limite_testes (int): Número máximo de testes lidos e ainda não entregues (aguardando pacotes ou a execução)
+            resultado (dict): Acumula o resultado de ResolvedorPacotes.resolver de todos os pacotes
+            marcar_ausente (Callable): Marca um teste como inválido: (teste, referência, motivo)
+            informar_ausente (Callable): Chamado uma vez por pacote indisponível: (referência, motivo) (opcional)
+            nome (str): Nome da thread que lê os testes
+        """
+        self.produzidos = 0
+        self.finalizado = False
+        self.resultado = resultado
+        self._resolvedor = resolvedor
+        self._marcar_ausente = marcar_ausente
+        self._informar_ausente = informar_ausente
+        self._executor = ThreadPoolExecutor(max_workers=resolvedor.num_threads, thread_name_prefix="fut-pacotes")
+        self._futuros = {}  # referência => Future da resolução
+        self._vagas = threading.Semaphore(max(1, limite_testes))
+        self._fila = queue.Queue()
+        self._condicao = threading.Condition()
+        self._aguardando = 0  # testes à espera dos seus pacotes
+        self._cancelado = threading.Event()
+        self._erro = None
+        self._thread = threading.Thread(target=self._ler_testes, args=(testes,), name=nome, daemon=True)
+        self._thread.start()
+
+
+    def _ler_testes(self, testes: Iterable):
+        """Consome os testes, iniciando a resolução das referências novas (executado pela thread do estágio)"""
+        try:
+            for teste in testes:
+                if not self._reservar_vaga():
+                    return
+                referencias = list(ResolvedorPacotes.coletar_igs([teste]))
+                pendentes = [futuro for futuro in map(self._obter_futuro, referencias) if not futuro.done()]
+                if not pendentes:
+                    self._entregar(teste, referencias)
+                    continue
+                with self._condicao:
+                    self._aguardando += 1
+                restantes = [len(pendentes)]
+                lock_teste = threading.Lock()
+
+                def _ao_resolver(_futuro: Future, teste=teste, referencias=referencias, restantes=restantes, lock_teste=lock_teste):
+                    with lock_teste:
+                        restantes[0] -= 1
+                        pronto = restantes[0] == 0
+                    if pronto:
+                        self._entregar(teste, referencias)
+                        with self._condicao:
+                            self._aguardando -= 1
+                            self._condicao.notify_all()
+
+                for futuro in pendentes:
+                    futuro.add_done_callback(_ao_resolver)
+            # Fim da leitura: aguarda os testes que ainda dependem de downloads
+            with self._condicao:
+                while self._aguardando and not self._cancelado.is_set():
+                    self._condicao.wait(self.TEMPO_ESPERA)
+        except Exception as e:
+            logger.error(f"Erro no estágio {self._thread.name}: {e}")
+            self._erro = e
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self.finalizado = True
+            self._fila.put(self._FIM)
+
+
+    def _reservar_vaga(self) -> bool:
+        """Aguarda uma vaga para mais um teste; retorna False se o estágio foi cancelado"""
+        while not self._cancelado.is_set():
+            if self._vagas.acquire(timeout=self.TEMPO_ESPERA):
+                return True
+        return False
+
+
+    def _obter_futuro(self, referencia: str) -> Future:
+        """Resolução da referência, iniciada na primeira vez em que ela aparece (executado pela thread do estágio)"""
+        futuro = self._futuros.get(referencia)
+        if futuro is None:
+            futuro = self._executor.submit(self._resolver, referencia)
+            self._futuros[referencia] = futuro
+        return futuro
+
+
+    def _resolver(self, referencia: str):
+        """Resolve um pacote e suas dependências, acumulando o resultado (executado pelo pool de downloads)"""
+        try:
+            resultado_parcial = self._resolvedor.resolver([referencia])
+        except Exception as e:
+            logger.warning(f"Erro ao obter o pacote {referencia}: {e}")
+            resultado_parcial = {'em_cache': [], 'instalados': [], 'ignorados': [], 'ausentes': {}, 'erros': {referencia: str(e)}}
+        novos_ausentes = {}
+        with self._condicao:
+            for situacao in ('em_cache', 'instalados', 'ignorados'):
+                self.resultado[situacao].extend(pacote for pacote in resultado_parcial[situacao] if pacote not in self.resultado[situacao])
+            self.resultado['erros'].update(resultado_parcial['erros'])
+            for referencia_ausente, motivo in resultado_parcial['ausentes'].items():
+                if referencia_ausente not in self.resultado['ausentes']:
+                    self.resultado['ausentes'][referencia_ausente] = motivo
+                    novos_ausentes[referencia_ausente] = motivo
+        for referencia_ausente, motivo in novos_ausentes.items():
+            logger.warning(f"Pacote {referencia_ausente} indisponível: {motivo}")
+            if self._informar_ausente is not None:
+                self._informar_ausente(referencia_ausente, motivo)
+
+
+    def _entregar(self, teste, referencias: list[str]):
+        """Marca o teste se algum dos seus pacotes estiver indisponível e o envia à execução"""
+        with self._condicao:
+            ausentes = [(referencia, self.resultado['ausentes'][referencia]) for referencia in referencias if referencia in self.resultado['ausentes']]
+            self.produzidos += 1
+        for referencia, motivo in ausentes:
+            self._marcar_ausente(teste, referencia, motivo)
+        self._fila.put(teste)
+
+
+    def __iter__(self):
+        """
+        Entrega os testes à medida que os seus pacotes ficam prontos
+
+        Raises:
+            Exception: Erro ocorrido na leitura dos testes (após os testes já entregues)
+        """
+        while True:
+            teste = self._fila.get()
+            if teste is self._FIM:
+                break
+            self._vagas.release()
+            yield teste
+        if self._erro is not None:
+            raise self._erro
+
+
+    def cancelar(self):
+        """Interrompe o estágio (os testes deixam de ser lidos e os downloads pendentes são cancelados)"""
+        self._cancelado.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
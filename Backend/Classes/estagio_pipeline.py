@@ -0,0 +1,83 @@
+from typing import Iterable
+import threading
+import logging
+import queue
+
+logger = logging.getLogger(__name__)
+
+
+class EstagioPipeline:
+    """
+    Estágio de um pipeline de geradores: consome o gerador anterior em uma thread própria e
+    entrega os itens por uma fila limitada. O estágio seguinte começa assim que o primeiro
+    item fica pronto e o estágio anterior é pausado quando a fila enche (backpressure)
+    """
+
+    # Constantes
+    _FIM = object()  # marca o fim dos itens na fila
+    TEMPO_ESPERA_FILA = 0.5  # segundos entre verificações de cancelamento
+
+    # Construtor
+    def __init__(self, itens: Iterable, tamanho_fila: int, nome: str = "fut-estagio"):
+        """
+        Inicia o estágio
+
+        Args:
+            itens (Iterable): Gerador (ou iterável) do estágio anterior
+            tamanho_fila (int): Número máximo de itens prontos aguardando o próximo estágio
+            nome (str): Nome da thread do estágio
+        """
+        self.produzidos = 0
+        self.finalizado = False
+        self._fila = queue.Queue(maxsize=max(1, tamanho_fila))
+        self._cancelado = threading.Event()
+        self._erro = None
+        self._thread = threading.Thread(target=self._produzir, args=(itens,), name=nome, daemon=True)
+        self._thread.start()
+
+
+    def _produzir(self, itens: Iterable):
+        """Consome o estágio anterior colocando seus itens na fila"""
+        try:
+            for item in itens:
+                if not self._colocar(item):
+                    return
+                self.produzidos += 1
+        except Exception as e:
+            logger.error(f"Erro no estágio {self._thread.name}: {e}")
+            self._erro = e
+        finally:
+            self.finalizado = True
+            self._colocar(self._FIM)
+
+
+    def _colocar(self, item) -> bool:
+        """Coloca um item na fila, aguardando espaço; retorna False se o estágio foi cancelado"""
+        while not self._cancelado.is_set():
+            try:
+                self._fila.put(item, timeout=self.TEMPO_ESPERA_FILA)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+    def __iter__(self):
+        """
+        Entrega os itens na ordem produzida
+
+        Raises:
+            Exception: Erro ocorrido no estágio anterior (após os itens já produzidos)
+        """
+        while True:
+            item = self._fila.get()
+            if item is self._FIM:
+                break
+            yield item
+        if self._erro is not None:
+            raise self._erro
+
+
+    def cancelar(self):
+        """Interrompe o estágio (o gerador anterior deixa de ser consumido)"""
+        self._cancelado.set()
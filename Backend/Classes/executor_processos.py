@@ -0,0 +1,169 @@
+from concurrent.futures import CancelledError as FuturoCanceladoError
+from collections import deque
+from pathlib import Path
+import subprocess
+import threading
+import asyncio
+import logging
+import signal
+import sys
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorProcessos:
+    """
+    Executa os processos do validator_cli em um event loop asyncio (em uma thread própria).
+
+    A saída de cada processo é lida enquanto ele executa: as últimas linhas ficam em um
+    buffer circular limitado e a saída completa vai para um arquivo de log (opcional),
+    sem acumular tudo em memória. Cada processo roda em seu próprio grupo de processos,
+    que é encerrado por inteiro em caso de timeout, cancelamento ou Ctrl+C
+    """
+
+    # Constantes
+    TAMANHO_BLOCO_LEITURA = 64 * 1024
+    TEMPO_MAXIMO_FINALIZACAO = 10  # segundos aguardando os processos serem encerrados
+
+    # Construtor
+    def __init__(self, max_processos: int, linhas_buffer: int = 200, salvar_logs: bool = False):
+        """
+        Inicia o event loop do executor
+
+        Args:
+            max_processos (int): Número máximo de processos simultâneos (semáforo)
+            linhas_buffer (int): Últimas linhas de saída mantidas em memória por processo
+            salvar_logs (bool): Grava a saída completa de cada processo no arquivo de log informado
+        """
+        self.linhas_buffer = max(1, linhas_buffer)
+        self.salvar_logs = salvar_logs
+        self.encerrado = False
+        self._loop = asyncio.new_event_loop()
+        self._semaforo = asyncio.Semaphore(max(1, max_processos))
+        self._tarefas = set()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fut-executor-processos", daemon=True)
+        self._thread.start()
+
+
+    def executar(self, comando: list[str], tempo_timeout: float, caminho_log: Path = None) -> tuple[int, str]:
+        """
+        Executa um comando e aguarda o seu término (pode ser chamado de qualquer thread)
+
+        Args:
+            comando (list[str]): Comando a ser executado
+            tempo_timeout (float): Tempo máximo de execução (segundos)
+            caminho_log (Path): Arquivo onde a saída completa é gravada (opcional)
+
+        Returns:
+            tuple[int, str]: Código de saída e as últimas linhas da saída
+
+        Raises:
+            subprocess.TimeoutExpired: Se o processo exceder tempo_timeout (o grupo de processos é encerrado)
+            RuntimeError: Se o executor foi encerrado
+        """
+        if self.encerrado:
+            raise RuntimeError("Executor de processos encerrado")
+        futuro = asyncio.run_coroutine_threadsafe(self._registrar_tarefa(comando, tempo_timeout, caminho_log), self._loop)
+        try:
+            return futuro.result()
+        except FuturoCanceladoError:
+            raise RuntimeError("Execução cancelada pelo encerramento do executor")
+
+
+    async def _registrar_tarefa(self, comando: list[str], tempo_timeout: float, caminho_log: Path|None) -> tuple[int, str]:
+        """Executa o comando como uma tarefa rastreada (cancelada no encerramento)"""
+        tarefa = asyncio.current_task()
+        self._tarefas.add(tarefa)
+        try:
+            async with self._semaforo:
+                return await self._executar(comando, tempo_timeout, caminho_log)
+        finally:
+            self._tarefas.discard(tarefa)
+
+
+    async def _executar(self, comando: list[str], tempo_timeout: float, caminho_log: Path|None) -> tuple[int, str]:
+        """Inicia o processo, transmite sua saída e aplica o timeout"""
+        if sys.platform == "win32":
+            opcoes_grupo = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            opcoes_grupo = {'start_new_session': True}  # Novo grupo: killpg alcança a JVM e seus filhos
+        processo = await asyncio.create_subprocess_exec(
+            *comando, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, **opcoes_grupo
+        )
+        ultimas_linhas = deque(maxlen=self.linhas_buffer)
+        arquivo_log = open(caminho_log, "wb") if caminho_log is not None and self.salvar_logs else None
+        try:
+            await asyncio.wait_for(self._transmitir_saida(processo, ultimas_linhas, arquivo_log), tempo_timeout)
+            codigo_retorno = await processo.wait()
+        except asyncio.TimeoutError:
+            await self._encerrar_grupo(processo)
+            raise subprocess.TimeoutExpired(comando, tempo_timeout, output="\n".join(ultimas_linhas))
+        except BaseException:  # Cancelamento (encerrar/Ctrl+C) ou erro de leitura
+            await self._encerrar_grupo(processo)
+            raise
+        finally:
+            if arquivo_log is not None:
+                arquivo_log.close()
+        return codigo_retorno, "\n".join(ultimas_linhas)
+
+
+    async def _transmitir_saida(self, processo: asyncio.subprocess.Process, ultimas_linhas: deque, arquivo_log):
+        """Lê a saída em blocos até o processo fechá-la, mantendo só as últimas linhas em memória"""
+        linha_parcial = b""
+        while True:
+            bloco = await processo.stdout.read(self.TAMANHO_BLOCO_LEITURA)
+            if not bloco:
+                break
+            if arquivo_log is not None:
+                arquivo_log.write(bloco)
+            *linhas, linha_parcial = (linha_parcial + bloco).split(b"\n")
+            ultimas_linhas.extend(linha.decode("utf-8", errors="replace").rstrip("\r") for linha in linhas)
+        if linha_parcial:
+            ultimas_linhas.append(linha_parcial.decode("utf-8", errors="replace"))
+
+
+    @staticmethod
+    async def _encerrar_grupo(processo: asyncio.subprocess.Process):
+        """Encerra o processo e todos os processos do seu grupo"""
+        if processo.returncode is not None:
+            return
+        try:
+            if sys.platform == "win32":
+                encerrador = await asyncio.create_subprocess_exec(
+                    "taskkill", "/F", "/T", "/PID", str(processo.pid),
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL
+                )
+                await encerrador.wait()
+            else:
+                os.killpg(processo.pid, signal.SIGKILL)
+        except (OSError, ProcessLookupError):
+            pass
+        try:
+            processo.kill()
+        except ProcessLookupError:
+            pass
+        await processo.wait()
+
+
+    def encerrar(self):
+        """Cancela as execuções em andamento (encerrando seus processos) e para o event loop"""
+        if self.encerrado:
+            return
+        self.encerrado = True
+
+        async def _cancelar_tarefas():
+            tarefas = list(self._tarefas)
+            for tarefa in tarefas:
+                tarefa.cancel()
+            if tarefas:
+                await asyncio.wait(tarefas, timeout=self.TEMPO_MAXIMO_FINALIZACAO)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancelar_tarefas(), self._loop).result(self.TEMPO_MAXIMO_FINALIZACAO + 1)
+        except Exception as e:
+            logger.warning(f"Erro ao encerrar os processos do validator: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=self.TEMPO_MAXIMO_FINALIZACAO)
+        if not self._loop.is_running():
+            self._loop.close()
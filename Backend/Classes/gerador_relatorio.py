@@ -15,20 +15,51 @@ class GeradorRelatorios:
         3: 'tempo_execucao', # em segundos
         4: 'justificativa_arquivo_invalido', # string ou None
         5: 'conteudo_dict', # dict
+        6: 'resultado_validacao', # dict com as issues já lidas ou None (ler de caminho_output)
         }
 
     erros_esperados = {'error': [], 'warning': [], 'fatal':[], 'information': []}
 
-    def __init__(self, casos_de_teste : list[dict]):
+    relatorio_unitario = {
+        'status' : False,
+        'yaml_valido' : None,
+        'motivo_da_invalidez': None,
+        'tempo_de_execucao' : None,
+        'correspondencia': [],
+        'status_real': None,
+        'status_esperado': None,
+        'discordancia':
+                {
+                    'issue_esperada_ausente_no_real' : [],
+                    'issue_real_ausente_na_esperada' : [],
+                },
+    }
+
+    # casos_de_teste pode ser vazio: os casos são então adicionados um a um (adicionarCasoDeTeste) durante a execução
+    def __init__(self, casos_de_teste : list[dict], metricas_execucao: dict = None):
         self.casos_de_teste_ = casos_de_teste
+        self.metricas_execucao_ = metricas_execucao
+        self.relatorios_ = {}
+        self.issues_corretas_ = None
+        self.issues_reais_ = None
+
+    # Contadores agregados, criados no primeiro uso (erros_esperados pode ser modificado antes)
+    def _iniciarContadores(self):
+        if self.issues_corretas_ is None:
+            self.issues_corretas_ = {f"%_{chave}_reais_acertados": 0 for chave in self.erros_esperados.keys()}
+            self.issues_reais_ = {f"quantidade_{chave}_reais_totais": 0 for chave in self.erros_esperados.keys()}
 
     # Função que extrai os dados contidos nos arquivos dos resultados esperados (vindos do caso de teste) e os resultados reais (vindos do validador)
-    def processarSaidas(self, caminho_saida_esperada: pathlib.Path, conteudo_dict: dict, yaml_valido:bool)-> list:
+    # Se o resultado do validator já foi lido durante a execução (saída em memória), o arquivo não é aberto novamente
+    def processarSaidas(self, caminho_saida_esperada: pathlib.Path, conteudo_dict: dict, yaml_valido:bool, resultado_validacao: dict = None)-> list:
         resultados_reais = None
         resultados_esperados = None
         if yaml_valido:
-            with open(caminho_saida_esperada, mode='r', encoding='utf8') as arquivo:
-                dicionario_saida_real = json.load(arquivo)
+            if resultado_validacao is not None:
+                dicionario_saida_real = resultado_validacao
+            else:
+                with open(caminho_saida_esperada, mode='r', encoding='utf8') as arquivo:
+                    dicionario_saida_real = json.load(arquivo)
 
             dicionario_saida_esperada = conteudo_dict
             
@@ -106,61 +137,50 @@ class GeradorRelatorios:
         except Exception as e:
             logger.error(f"Erro em compararResultados: {e}")
 
-    # Função que gera os relatórios unitários e o relatório final
-    def gerarRelatorios(self,tempo_execucao_total:float):
+    # Função que compara um caso de teste assim que ele é executado e guarda apenas o seu relatório unitário
+    def adicionarCasoDeTeste(self, dicionario: dict):
         try:
-            relatorios = {}
-            relatorio_unitario = {
-                'status' : False,
-                'yaml_valido' : None,
-                'motivo_da_invalidez': None,
-                'tempo_de_execucao' : None,
-                'correspondencia': [],
-                'status_real': None,
-                'status_esperado': None,
-                'discordancia':
-                        {
-                            'issue_esperada_ausente_no_real' : [],
-                            'issue_real_ausente_na_esperada' : [],
-                        },
-            }
-            copia_relatorio_unitario = deepcopy(relatorio_unitario)
-            resultados = map(
-                self.compararResultados,
-                [
-                    self.processarSaidas(dicionario[self.chaves[2]], dicionario[self.chaves[5]],  dicionario[self.chaves[1]] ) + [dicionario[self.chaves[3]], dicionario[self.chaves[4]]]
-                    for dicionario in self.casos_de_teste_
-                ]
+            self._iniciarContadores()
+            relat = self.compararResultados(
+                self.processarSaidas(dicionario[self.chaves[2]], dicionario[self.chaves[5]],  dicionario[self.chaves[1]], dicionario.get(self.chaves.get(6)) ) + [dicionario[self.chaves[3]], dicionario[self.chaves[4]]]
             )
-            issues_corretas = {}
-            issues_reais = {}
-            for chave in self.erros_esperados.keys():
-                issues_corretas[f"%_{chave}_reais_acertados"] = 0
-                issues_reais[f"quantidade_{chave}_reais_totais"] = 0
-            for relat in resultados:
-                in_congruencias, yaml_valido, tempo_de_execucao, status, status_esperado, status_real, caminho_yaml, quantidades, quantidades_totais, motivo_da_invalidez, = relat
-                relatorio_unitario['yaml_valido'] = yaml_valido
-                relatorio_unitario['motivo_da_invalidez'] = motivo_da_invalidez
-                if yaml_valido:
-                    relatorio_unitario['status_esperado'] = status_esperado
-                    relatorio_unitario['tempo_de_execucao'] = tempo_de_execucao
-                    relatorio_unitario['status'] = status
-                    relatorio_unitario['status_esperado'] = status_esperado
-                    relatorio_unitario['status_real'] = status_real
-                    for item in in_congruencias:
-                        if item[2] and item[3] == 0:
-                            relatorio_unitario['correspondencia'].append({'tipo':item[0], 'codigo':item[1], 'descricao': item[2][0], 'local': item[2][1]})
-                        elif not item[2] and item[3] == 0:
-                            relatorio_unitario['discordancia']['issue_esperada_ausente_no_real'].append({'tipo':item[0], 'codigo':item[1], 'descricao': None, 'local': None})
-                        elif item[3] == 1:
-                            relatorio_unitario['discordancia']['issue_real_ausente_na_esperada'].append({'tipo':item[0], 'codigo':item[1], 'descricao': item[2][0], 'local': item[2][1]})
-                    
-                    for chave in self.erros_esperados.keys():
-                        issues_corretas[f"%_{chave}_reais_acertados"] += quantidades[chave]
-                        issues_reais[f"quantidade_{chave}_reais_totais"] += quantidades_totais[chave]
-
-                relatorios[str(caminho_yaml)] = relatorio_unitario
-                relatorio_unitario = deepcopy(copia_relatorio_unitario)
+            in_congruencias, yaml_valido, tempo_de_execucao, status, status_esperado, status_real, caminho_yaml, quantidades, quantidades_totais, motivo_da_invalidez, = relat
+            relatorio_unitario = deepcopy(self.relatorio_unitario)
+            relatorio_unitario['yaml_valido'] = yaml_valido
+            relatorio_unitario['motivo_da_invalidez'] = motivo_da_invalidez
+            if yaml_valido:
+                relatorio_unitario['status_esperado'] = status_esperado
+                relatorio_unitario['tempo_de_execucao'] = tempo_de_execucao
+                relatorio_unitario['status'] = status
+                relatorio_unitario['status_esperado'] = status_esperado
+                relatorio_unitario['status_real'] = status_real
+                for item in in_congruencias:
+                    if item[2] and item[3] == 0:
+                        relatorio_unitario['correspondencia'].append({'tipo':item[0], 'codigo':item[1], 'descricao': item[2][0], 'local': item[2][1]})
+                    elif not item[2] and item[3] == 0:
+                        relatorio_unitario['discordancia']['issue_esperada_ausente_no_real'].append({'tipo':item[0], 'codigo':item[1], 'descricao': None, 'local': None})
+                    elif item[3] == 1:
+                        relatorio_unitario['discordancia']['issue_real_ausente_na_esperada'].append({'tipo':item[0], 'codigo':item[1], 'descricao': item[2][0], 'local': item[2][1]})
+                
+                for chave in self.erros_esperados.keys():
+                    self.issues_corretas_[f"%_{chave}_reais_acertados"] += quantidades[chave]
+                    self.issues_reais_[f"quantidade_{chave}_reais_totais"] += quantidades_totais[chave]
+
+            self.relatorios_[str(caminho_yaml)] = relatorio_unitario
+        except Exception as e:
+            logger.error(f"Erro em adicionarCasoDeTeste: {e}")
+
+    # Função que gera os relatórios unitários (dos casos ainda não adicionados) e o relatório final
+    def gerarRelatorios(self,tempo_execucao_total:float):
+        try:
+            for dicionario in self.casos_de_teste_:
+                self.adicionarCasoDeTeste(dicionario)
+            self.casos_de_teste_ = []
+            self._iniciarContadores()
+
+            relatorios = dict(self.relatorios_)
+            issues_corretas = dict(self.issues_corretas_)
+            issues_reais = dict(self.issues_reais_)
             issue_correta_soma_parcial = max(sum(issues_corretas.values()),1)
 
             tempo_total = tempo_execucao_total
@@ -177,6 +197,8 @@ class GeradorRelatorios:
             }
             relatorio_final.update(issues_reais)
             relatorio_final.update(issues_corretas)
+            if self.metricas_execucao_:
+                relatorio_final['metricas_execucao'] = self.metricas_execucao_
             relatorios['relatorio_final'] = relatorio_final
             return relatorios
         except Exception as e:
@@ -223,6 +245,8 @@ class GeradorRelatorios:
     # Função que adiciona o relatório final no csv
     def adicionarCsv(self,caminho_csv: pathlib.Path, relatorio_final: dict):
         try:
+            # Métricas detalhadas (dicts) ficam apenas nos relatórios JSON/HTML
+            relatorio_final = {chave: valor for chave, valor in relatorio_final.items() if not isinstance(valor, dict)}
             fieldnames = relatorio_final.keys()
 
             with open(caminho_csv, 'a', newline='', encoding='utf-8') as arquivo:
@@ -1,10 +1,49 @@
+from Backend.Classes.buscador_arquivos import BuscadorArquivos
+from Backend.Classes.cache_testes import CacheTestes
+from Backend.Classes.teste import Teste
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from typing import Iterable, Iterator
 from pathlib import Path
-import yaml
+import multiprocessing
+import itertools
 import logging
+import yaml
+import time
+import sys
+import os
 
 logger = logging.getLogger(__name__)
 
+try:
+    CarregadorBase = yaml.CSafeLoader  # LibYAML (C), quando o PyYAML foi compilado com ela
+except AttributeError:
+    CarregadorBase = yaml.SafeLoader
+
 class GerenciadorArquivoTeste:
+    # Constantes
+    TAMANHO_BLOCO_LEITURA = 64  # arquivos lidos por tarefa do pool de processos
+    BLOCOS_POR_PROCESSO = 2  # blocos em andamento por processo (limita a memória da leitura)
+    TAMANHO_MINIMO_STREAMING = 1024 * 1024  # suites a partir deste tamanho (bytes) são lidas teste a teste
+
+    class _Carregador(CarregadorBase):
+        """Carregador dos arquivos de teste: itens vazios de listas viram "" já na construção"""
+
+        def construir_lista(self, no):
+            lista = []
+            yield lista
+            lista.extend("" if item is None else item for item in self.construct_sequence(no))
+
+    _Carregador.add_constructor('tag:yaml.org,2002:seq', _Carregador.construir_lista)
+
+    class _CarregadorSuite(_Carregador, yaml.composer.Composer):
+        """Carregador das suites grandes: lê os eventos do arquivo e constrói um nó (teste) por vez"""
+
+        def __init__(self, arquivo):
+            super().__init__(arquivo)
+            self.anchors = {}
+
     def __init__(self):
         pass
 
@@ -37,7 +76,9 @@ class GerenciadorArquivoTeste:
         Recebe os comandos escritos pelo usuário, verificando os seguintes casos:
         1. Todos os arquivos .yaml da pasta atual (entrada vazia)
         2. O arquivo específico
-        3. Os arquivos que tenham o mesmo prefixo (uso de '*')
+        3. Todos os arquivos .yaml de uma pasta e das suas subpastas
+        4. Os arquivos que correspondem a um padrão glob (*, ?, [...] e ** recursivo)
+        Arquivos e pastas listados em .futignore são ignorados nas buscas (casos 1, 3 e 4)
 
         Args: 
             argumentos_entrada: Entrada para determinar a lista de arquivos de teste
@@ -45,65 +86,274 @@ class GerenciadorArquivoTeste:
         Returns:
             list: Lista de paths para cada yaml encontrado
         """
-        arquivos_yaml = []
+        return list(self.gerar_arquivos_teste(argumentos_entrada))
+
+
+    def gerar_arquivos_teste(self, argumentos_entrada) -> Iterator[Path]:
+        """
+        Versão sob demanda de gerar_lista_arquivos_teste: cada arquivo é entregue assim
+        que encontrado (sem repetições), permitindo que a leitura dos testes comece antes
+        do fim da busca
+
+        Args: 
+            argumentos_entrada: Entrada para determinar a lista de arquivos de teste
         
+        Yields:
+            Path: Cada yaml encontrado
+        """
         # Garantir que argumentos_entrada é uma lista
         argumentos_entrada = self._padronizar_argumentos_entrada(argumentos_entrada)
-        
-        # Ler todos da pasta atual se não há argumentos
+        buscador = BuscadorArquivos()
+
+        # Ler todos da pasta atual (sem subpastas) se não há argumentos
         if len(argumentos_entrada) == 0:
-            arquivos_yaml = list(Path.cwd().glob('*.yaml')) + list(Path.cwd().glob('*.yml'))
-        else:
-            # Processar arquivos especificados
-            for caminho_arquivo in argumentos_entrada:
-                arquivo_atual = Path(caminho_arquivo)
+            yield from buscador.buscar("*")
+            return
+        if len(argumentos_entrada) == 1:
+            yield from buscador.buscar(argumentos_entrada[0])
+            return
 
-                # Converter caminho relativo para absoluto
-                if not arquivo_atual.is_absolute():
-                    arquivo_atual = Path.cwd() / arquivo_atual
+        # Vários argumentos podem encontrar o mesmo arquivo
+        arquivos_entregues = set()
+        for argumento in argumentos_entrada:
+            for arquivo in buscador.buscar(argumento):
+                if arquivo not in arquivos_entregues:
+                    arquivos_entregues.add(arquivo)
+                    yield arquivo
 
-                # Processar wildcards
-                if '*' in arquivo_atual.name:
-                    prefixo_pesquisa = str(arquivo_atual.name).split('*')[0]
-                    arquivos_encontrados = list(arquivo_atual.parent.glob(f"{prefixo_pesquisa}*.yaml"))
-                    arquivos_encontrados.extend(list(arquivo_atual.parent.glob(f"{prefixo_pesquisa}*.yml")))
-                    arquivos_yaml.extend(arquivos_encontrados)
-                else:
-                    # Verificar se o arquivo tem extensão válida e existe
-                    if (arquivo_atual.suffix in [".yaml", ".yml"]) and arquivo_atual.exists():
-                        arquivos_yaml.append(arquivo_atual)
 
-        # Remover duplicatas e arquivos inexistentes
-        arquivos_yaml = list(set(arquivos_yaml))
-        arquivos_yaml = [arquivo for arquivo in arquivos_yaml if arquivo.exists()]
+    def carregar_yaml(self, arquivo: Path) -> tuple[dict, str]:
+        """Load YAML file and validate it's valid YAML syntax"""
+        try:
+            with open(arquivo, 'rb') as arquivo:
+                return self._interpretar_yaml(arquivo.read())
+        except Exception as e:
+            return None, f"Erro ao carregar arquivo: {e}"
+
 
-        return arquivos_yaml
+    def _interpretar_yaml(self, conteudo: bytes) -> tuple[dict, str]:
+        """Interpreta o conteúdo de um arquivo de teste (conteúdo e motivo de ser inválido)"""
+        try:
+            return yaml.load(conteudo, Loader=self._Carregador), None
+        except yaml.YAMLError as e:
+            return None, f"YAML inválido: {e}"
+        except Exception as e:
+            return None, f"Erro ao carregar arquivo: {e}"
 
 
-    def _limpar_conteudo_yaml(self, dados: dict) -> dict:
+    @staticmethod
+    def _carregar_bloco(arquivos: list[Path], path_schema: Path = None) -> list[tuple[dict, str, tuple|None]]:
         """
-        Padroniza as informações recebidas do arquivo de teste.
+        Lê (e valida pelo schema, se informado) um bloco de arquivos de teste (executado nos processos do pool)
 
-        Args:
-            dados (dict): Entrada a ser tratada
-        
         Returns:
-            dict: Entrada tratada
+            list[tuple[dict, str, tuple|None]]: Conteúdo, motivo de ser inválido e assinatura do arquivo
+                                                (tamanho, data de modificação e hash; None se não foi lido)
         """
-        if isinstance(dados, dict):
-            return {chave: self._limpar_conteudo_yaml(valor) for chave, valor in dados.items()}
-        elif isinstance(dados, list):
-            return [self._limpar_conteudo_yaml(item) if item is not None else "" for item in dados]
-        return dados
+        gerenciador_arquivo_teste = GerenciadorArquivoTeste()
+        resultados = []
+        for arquivo in arquivos:
+            try:
+                informacoes = os.stat(arquivo)
+                with open(arquivo, 'rb') as arquivo_teste:
+                    conteudo_bruto = arquivo_teste.read()
+            except Exception as e:
+                resultados.append((None, f"Erro ao carregar arquivo: {e}", None))
+                continue
+            conteudo, razao_invalidez = gerenciador_arquivo_teste._interpretar_yaml(conteudo_bruto)
+            if razao_invalidez is None and path_schema is not None:
+                teste = Teste(arquivo, conteudo)
+                teste.validar_schema(path_schema)
+                razao_invalidez = teste.justificativa_teste_invalido or None
+            assinatura = (informacoes.st_size, informacoes.st_mtime_ns, CacheTestes.calcular_hash(conteudo_bruto))
+            resultados.append((conteudo, razao_invalidez, assinatura))
+        return resultados
 
 
-    def carregar_yaml(self, arquivo: Path) -> tuple[dict, str]:
-        """Load YAML file and validate it's valid YAML syntax"""
+    @staticmethod
+    def _criar_pool_leitura(num_processos: int) -> ProcessPoolExecutor|None:
+        """Pool de processos da leitura (None se não for possível criá-lo)"""
+        metodos = multiprocessing.get_all_start_methods()
+        # Sem fork: a leitura acontece em uma thread e o processo já tem outras threads.
+        # Executáveis congelados só reexecutam o ponto de entrada com spawn (freeze_support em fut.py)
+        usar_forkserver = "forkserver" in metodos and not getattr(sys, "frozen", False)
+        contexto = multiprocessing.get_context("forkserver" if usar_forkserver else "spawn")
         try:
-            with open(arquivo, 'r', encoding='utf-8') as arquivo:
-                dados = yaml.safe_load(arquivo)
-            return self._limpar_conteudo_yaml(dados), None
-        except yaml.YAMLError as e:
-            return None, f"YAML inválido: {e}"
-        except Exception as e:
-            return None, f"Erro ao carregar arquivo: {e}"
\ No newline at end of file
+            return ProcessPoolExecutor(max_workers=num_processos, mp_context=contexto)
+        except (OSError, NotImplementedError, ValueError) as e:
+            logger.warning(f"Leitura dos testes em paralelo indisponível, lendo em um único processo: {e}")
+            return None
+
+
+    def carregar_yamls(self, arquivos: Iterable[Path], num_processos: int = 1, estatisticas: dict = None, path_schema: Path = None, cache_testes: CacheTestes = None) -> Iterator[tuple[Path, dict, str]]:
+        """
+        Lê os arquivos de teste em blocos, na ordem recebida. O primeiro bloco é lido neste
+        processo (execuções pequenas não iniciam processos); os demais, com num_processos > 1,
+        são lidos em paralelo por um pool de processos. Arquivos inalterados são obtidos do cache
+
+        Args:
+            arquivos (Iterable[Path]): Arquivos YAML (lista ou gerador)
+            num_processos (int): Processos de leitura
+            estatisticas (dict): Recebe 'arquivos', 'em_cache', 'tempo_leitura' (segundos, sem contar a espera
+                                 pelo consumidor) e 'processos' (opcional)
+            path_schema (Path): Schema dos arquivos de teste; se informado, o motivo de invalidez inclui
+                                os erros de schema (opcional)
+            cache_testes (CacheTestes): Cache dos testes já lidos e validados (opcional, exige path_schema)
+
+        Yields:
+            tuple[Path, dict, str]: Arquivo, conteúdo e motivo de o arquivo ser inválido (ou None)
+        """
+        estatisticas = {} if estatisticas is None else estatisticas
+        estatisticas.update({'arquivos': 0, 'em_cache': 0, 'tempo_leitura': 0.0, 'processos': 1})
+        if path_schema is None:
+            cache_testes = None
+        leitura = self._ler_blocos(arquivos, num_processos, estatisticas, path_schema, cache_testes)
+        try:
+            inicio = time.perf_counter()
+            for resultado in leitura:
+                estatisticas['arquivos'] += 1
+                estatisticas['tempo_leitura'] += time.perf_counter() - inicio
+                yield resultado
+                inicio = time.perf_counter()
+        finally:
+            leitura.close()
+
+
+    def _ler_blocos(self, arquivos: Iterable[Path], num_processos: int, estatisticas: dict, path_schema: Path|None, cache_testes: CacheTestes|None) -> Iterator[tuple[Path, dict, str]]:
+        """Divide os arquivos em blocos e os lê, mantendo no máximo BLOCOS_POR_PROCESSO blocos por processo em andamento"""
+        iterador_arquivos = iter(arquivos)
+        blocos = iter(lambda: list(itertools.islice(iterador_arquivos, self.TAMANHO_BLOCO_LEITURA)), [])
+        pool = None
+        pendentes = deque()
+        try:
+            for bloco in blocos:
+                em_cache = {}
+                grandes = {indice for indice, arquivo in enumerate(bloco) if self._arquivo_grande(arquivo)}
+                if cache_testes is not None:
+                    for indice, arquivo in enumerate(bloco):
+                        teste_em_cache = cache_testes.obter(arquivo) if indice not in grandes else None
+                        if teste_em_cache is not None:
+                            em_cache[indice] = teste_em_cache
+                    estatisticas['em_cache'] += len(em_cache)
+                a_ler = [arquivo for indice, arquivo in enumerate(bloco) if indice not in em_cache and indice not in grandes]
+                if a_ler and pool is None and num_processos > 1 and estatisticas['arquivos'] > 0:
+                    pool = self._criar_pool_leitura(num_processos)
+                    num_processos = num_processos if pool is not None else 1
+                    estatisticas['processos'] = num_processos
+                futuro = pool.submit(GerenciadorArquivoTeste._carregar_bloco, a_ler, path_schema) if pool is not None and a_ler else None
+                pendentes.append((bloco, em_cache, grandes, a_ler, futuro))
+                limite_pendentes = num_processos * self.BLOCOS_POR_PROCESSO if pool is not None else 1
+                while len(pendentes) >= limite_pendentes:
+                    yield from self._entregar_bloco(*pendentes.popleft(), path_schema, cache_testes)
+            while pendentes:
+                yield from self._entregar_bloco(*pendentes.popleft(), path_schema, cache_testes)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+    def _entregar_bloco(self, bloco: list[Path], em_cache: dict, grandes: set, a_ler: list[Path], futuro, path_schema: Path|None, cache_testes: CacheTestes|None) -> Iterator[tuple[Path, dict, str]]:
+        """
+        Resultados de um bloco, na ordem: do cache, do pool (futuro), lidos neste processo
+        (futuro None ou pool interrompido) ou, para arquivos grandes, abertos como suite em streaming.
+        Os arquivos lidos (exceto os grandes) são guardados no cache
+        """
+        lidos = None
+        if futuro is not None:
+            try:
+                lidos = futuro.result()
+            except BrokenProcessPool as e:
+                logger.warning(f"Pool de leitura interrompido, lendo o bloco neste processo: {e}")
+        if lidos is None:
+            lidos = self._carregar_bloco(a_ler, path_schema) if a_ler else []
+        lidos = iter(lidos)
+        for indice, arquivo in enumerate(bloco):
+            if indice in em_cache:
+                conteudo, razao_invalidez = em_cache[indice]
+            elif indice in grandes:
+                conteudo, razao_invalidez = self._abrir_suite(arquivo, path_schema)
+            else:
+                conteudo, razao_invalidez, assinatura = next(lidos)
+                if cache_testes is not None:
+                    cache_testes.guardar(arquivo, conteudo, razao_invalidez, assinatura)
+            yield arquivo, conteudo, razao_invalidez
+
+
+    def _arquivo_grande(self, arquivo: Path) -> bool:
+        """Indica se o arquivo deve ser lido em streaming (tamanho a partir de TAMANHO_MINIMO_STREAMING)"""
+        try:
+            return os.path.getsize(arquivo) >= self.TAMANHO_MINIMO_STREAMING
+        except OSError:
+            return False
+
+
+    def _abrir_suite(self, arquivo: Path, path_schema: Path|None) -> tuple[dict, str]:
+        """
+        Abre um arquivo grande: se for uma suite, os testes ('tests') são lidos sob demanda,
+        um por vez; caso contrário o arquivo é lido e validado normalmente
+
+        Returns:
+            tuple[dict, str]: Conteúdo (com 'tests' como gerador, para suites) e motivo de ser inválido (ou None)
+        """
+        try:
+            with open(arquivo, 'rb') as arquivo_suite:
+                carregador = self._CarregadorSuite(arquivo_suite)
+                try:
+                    cabecalho = self._posicionar_em_testes(carregador)
+                finally:
+                    carregador.dispose()
+        except (OSError, yaml.YAMLError):
+            cabecalho = None
+        if cabecalho is None:
+            conteudo, razao_invalidez, _ = self._carregar_bloco([arquivo], path_schema)[0]
+            return conteudo, razao_invalidez
+        logger.info(f"Suite {arquivo} lida em streaming")
+        cabecalho['tests'] = self._gerar_testes_suite(arquivo)
+        return cabecalho, None
+
+
+    def _posicionar_em_testes(self, carregador: "GerenciadorArquivoTeste._CarregadorSuite") -> dict|None:
+        """
+        Lê as chaves da suite anteriores a 'tests', parando no início da lista de testes
+
+        Returns:
+            dict|None: Chaves lidas ou None se o arquivo não for uma suite com suite_name antes de 'tests'
+        """
+        for evento in (yaml.StreamStartEvent, yaml.DocumentStartEvent, yaml.MappingStartEvent):
+            if not carregador.check_event(evento):
+                return None
+            carregador.get_event()
+        cabecalho = {}
+        while not carregador.check_event(yaml.MappingEndEvent):
+            chave = carregador.construct_document(carregador.compose_node(None, None))
+            if chave == 'tests':
+                if 'suite_name' in cabecalho and carregador.check_event(yaml.SequenceStartEvent):
+                    return cabecalho
+                return None
+            cabecalho[chave] = carregador.construct_document(carregador.compose_node(None, None))
+        return None
+
+
+    def _gerar_testes_suite(self, arquivo: Path) -> Iterator:
+        """
+        Lê os testes de uma suite um por vez (apenas o teste atual fica em memória)
+
+        Yields:
+            Os dados de cada teste da lista 'tests'
+
+        Raises:
+            yaml.YAMLError: Se o arquivo tiver um erro após o início da lista de testes
+        """
+        with open(arquivo, 'rb') as arquivo_suite:
+            carregador = self._CarregadorSuite(arquivo_suite)
+            try:
+                if self._posicionar_em_testes(carregador) is None:
+                    raise yaml.YAMLError("a suite foi alterada durante a leitura")
+                carregador.get_event()  # Início da lista de testes
+                indice = 0
+                while not carregador.check_event(yaml.SequenceEndEvent):
+                    dados_teste = carregador.construct_document(carregador.compose_node(None, indice))
+                    yield "" if dados_teste is None else dados_teste
+                    indice += 1
+            finally:
+                carregador.dispose()
@@ -1,5 +1,9 @@
 from Backend.Classes.arquivo_downloader import ArquivoDownloader
 from pathlib import Path
+import subprocess
+import shutil
+import json
+import os
 import platform
 import tarfile
 import zipfile
@@ -16,10 +20,23 @@ class GerenciadorJava:
     """
     MAXIMO_TENTATIVAS_PADRAO = 3
     TEMPO_ESPERA_TENTATIVA = 300  # segundos
+    NOME_MANIFESTO = "jdk_manifesto.json"
+    VERSAO_MINIMA_JAVA_SISTEMA = 17
+
+    # Executável resolvido por pasta de arquivos (uma vez por processo)
+    _executaveis_resolvidos = {}
+    _java_sistema = None
+    _java_sistema_verificado = False
     
     # Construtor
-    def __init__(self, path_arquivos: Path):
+    def __init__(self, path_arquivos: Path, usar_java_sistema: bool = False):
+        """
+        Args:
+            path_arquivos (Path): Pasta onde o JDK é baixado e extraído
+            usar_java_sistema (bool): Usar um Java 17+ do sistema, se encontrado, em vez do JDK baixado
+        """
         self.path_arquivos = path_arquivos
+        self.usar_java_sistema = usar_java_sistema
     
     def _criar_java_path(self):
         """ 
@@ -38,12 +55,18 @@ class GerenciadorJava:
         self.path_java_compresso =  self.path_arquivos / java_file
 
 
-    def java_instalado(self) -> bool:
+    def java_instalado(self, downloader: ArquivoDownloader = None) -> bool:
         """
         Baixa o arquivo Java se não existir
+
+        Args:
+            downloader (ArquivoDownloader): Downloader a ser usado (opcional, ex: com espelhos configurados)
         """
         
         self._criar_java_path()
+
+        if self._java_do_sistema() is not None:
+            return True
         
         if self.path_java_compresso.exists():
             logger.info("Java ja instalado")
@@ -63,25 +86,37 @@ class GerenciadorJava:
         
         logger.info(f"Baixando java usando {url}")
         try:
-            downloader = ArquivoDownloader(self.TEMPO_ESPERA_TENTATIVA)
-            downloader.baixar_arquivo(url, self.path_java_compresso)
+            downloader = downloader or ArquivoDownloader(self.TEMPO_ESPERA_TENTATIVA)
+            # O Adoptium publica o SHA-256 de cada arquivo em <url>.sha256.txt
+            downloader.baixar_arquivo(url, self.path_java_compresso, url_checksum=f"{url}.sha256.txt")
             return True
         except Exception as e:
             logger.error(f"Erro ao instalar o java: {e}")
             return False
         
         
-    def extrair_java(self):
+    def extrair_java(self) -> bool:
         """
-        Extrai o arquivo Java comprimido
+        Extrai o arquivo Java comprimido, apenas se o JDK extraído não estiver íntegro
+        (manifesto de extração com checksum do arquivo e versão do Java)
+
+        Returns:
+            bool: True se o JDK extraído está pronto para uso
         """
         
         if not hasattr(self, 'path_java_compresso'):
             self._criar_java_path()
+
+        if self._java_do_sistema() is not None:
+            return True
         
         if not self.path_java_compresso.exists():
             logger.error("Arquivo Java não encontrado para extração")
             return False
+
+        if self._extracao_integra():
+            logger.info("JDK já extraído e íntegro, extração ignorada")
+            return True
         
         # Diretório de destino (mesmo diretório do arquivo)
         destino = self.path_java_compresso.parent
@@ -101,19 +136,143 @@ class GerenciadorJava:
                     tar_ref.extractall(destino)
             
             logger.info("Java extraído com sucesso")
+            GerenciadorJava._executaveis_resolvidos.pop(self.path_arquivos, None)
+            self._salvar_manifesto()
             return True
             
         except Exception as e:
             logger.error(f"Erro ao extrair Java: {e}")
             return False
 
+
+    def _ler_manifesto(self) -> dict|None:
+        """Lê o manifesto da última extração (None se não existir ou for inválido)"""
+        try:
+            with open(self.path_arquivos / self.NOME_MANIFESTO, "r", encoding="utf-8") as arquivo_manifesto:
+                return json.load(arquivo_manifesto)
+        except (OSError, ValueError):
+            return None
+
+
+    def _salvar_manifesto(self):
+        """Registra o arquivo extraído (tamanho, data, checksum), o executável e a versão do Java"""
+        java_exe = self._procurar_java_executavel()
+        if java_exe is None:
+            return
+        estatisticas_arquivo = self.path_java_compresso.stat()
+        manifesto = {
+            'arquivo': self.path_java_compresso.name,
+            'tamanho': estatisticas_arquivo.st_size,
+            'data_modificacao': estatisticas_arquivo.st_mtime,
+            'sha256': ArquivoDownloader.calcular_sha256(self.path_java_compresso),
+            'executavel': str(java_exe.relative_to(self.path_arquivos)),
+            'versao_java': self.obter_versao_java(java_exe),
+        }
+        caminho_manifesto = self.path_arquivos / self.NOME_MANIFESTO
+        caminho_temporario = caminho_manifesto.with_suffix(".tmp")
+        with open(caminho_temporario, "w", encoding="utf-8") as arquivo_manifesto:
+            json.dump(manifesto, arquivo_manifesto, indent=4)
+        os.replace(caminho_temporario, caminho_manifesto)
+
+
+    def _extracao_integra(self) -> bool:
+        """
+        Verifica se o JDK extraído corresponde ao arquivo atual e continua íntegro
+
+        Returns:
+            bool: True se a extração pode ser reaproveitada
+        """
+        manifesto = self._ler_manifesto()
+        if not manifesto or manifesto.get('arquivo') != self.path_java_compresso.name:
+            return False
+
+        java_exe = self.path_arquivos / manifesto.get('executavel', '')
+        if not java_exe.is_file():
+            return False
+        versao_java = self._ler_versao_release(java_exe)
+        if versao_java is not None and versao_java != manifesto.get('versao_java'):
+            return False
+
+        estatisticas_arquivo = self.path_java_compresso.stat()
+        if estatisticas_arquivo.st_size != manifesto.get('tamanho'):
+            return False
+        if estatisticas_arquivo.st_mtime != manifesto.get('data_modificacao'):
+            # Arquivo possivelmente substituído: o checksum decide
+            if ArquivoDownloader.calcular_sha256(self.path_java_compresso) != manifesto.get('sha256'):
+                return False
+            self._salvar_manifesto()
+        return True
+
+
+    def _java_do_sistema(self) -> Path|None:
+        """
+        Procura um Java do sistema (JAVA_HOME ou PATH) com versão suficiente, se habilitado
+
+        Returns:
+            Path|None: Executável do Java do sistema ou None
+        """
+        if not self.usar_java_sistema:
+            return None
+        if GerenciadorJava._java_sistema_verificado:
+            return GerenciadorJava._java_sistema
+        GerenciadorJava._java_sistema_verificado = True
+
+        nome_executavel = 'java.exe' if platform.system().lower() == 'windows' else 'java'
+        candidatos = []
+        if os.environ.get('JAVA_HOME'):
+            candidatos.append(Path(os.environ['JAVA_HOME']) / 'bin' / nome_executavel)
+        java_path = shutil.which('java')
+        if java_path:
+            candidatos.append(Path(java_path))
+
+        for candidato in candidatos:
+            if not candidato.is_file():
+                continue
+            versao_principal = self.obter_versao_principal_java(self.obter_versao_java(candidato))
+            if versao_principal is not None and versao_principal >= self.VERSAO_MINIMA_JAVA_SISTEMA:
+                logger.info(f"Usando o Java do sistema: {candidato} (versão {versao_principal})")
+                GerenciadorJava._java_sistema = candidato
+                return candidato
+        logger.info(f"Nenhum Java {self.VERSAO_MINIMA_JAVA_SISTEMA}+ encontrado no sistema, usando o JDK do fut")
+        return None
+
+
+    def resolver_java_executavel(self) -> Path|None:
+        """
+        Resolve novamente o executável Java (ex: após mudança de configuração) e o guarda para o processo
+
+        Returns:
+            Path|None: Caminho para o executável Java
+        """
+        GerenciadorJava._executaveis_resolvidos.pop(self.path_arquivos, None)
+        return self.obter_java_executavel()
+
+
     def obter_java_executavel(self) -> Path|None:
         """
-        Retorna o caminho para o executável Java extraído
+        Retorna o caminho para o executável Java (resolvido uma única vez por processo)
+        """
+        if self.path_arquivos in GerenciadorJava._executaveis_resolvidos:
+            return GerenciadorJava._executaveis_resolvidos[self.path_arquivos]
+
+        java_exe = self._java_do_sistema()
+        if java_exe is None:
+            manifesto = self._ler_manifesto() or {}
+            java_exe = self.path_arquivos / manifesto['executavel'] if manifesto.get('executavel') else None
+            if java_exe is None or not java_exe.is_file():
+                java_exe = self._procurar_java_executavel()
+
+        if java_exe is None:
+            logger.error("Executável Java não encontrado após extração")
+            return None
+        GerenciadorJava._executaveis_resolvidos[self.path_arquivos] = java_exe
+        return java_exe
+
+
+    def _procurar_java_executavel(self) -> Path|None:
+        """
+        Procura o executável Java na pasta extraída
         """
-        if not hasattr(self, 'path_java_compresso'):
-            self._criar_java_path()
-        
         destino = self.path_arquivos
         sistema = platform.system().lower()
         
@@ -136,6 +295,65 @@ class GerenciadorJava:
                     
                     if java_exe.exists():
                         return java_exe
-        
-        logger.error("Executável Java não encontrado após extração")
-        return None
\ No newline at end of file
+        return None
+
+
+    @staticmethod
+    def _ler_versao_release(java_path: Path) -> str|None:
+        """Lê a versão do Java do arquivo 'release' do JDK (None se não existir)"""
+        arquivo_release = Path(java_path).resolve().parent.parent / 'release'
+        if not arquivo_release.exists():
+            return None
+        conteudo = arquivo_release.read_text(encoding='utf-8', errors='ignore')
+        versao_encontrada = re.search(r'^JAVA_VERSION="([^"]+)"', conteudo, re.MULTILINE)
+        return versao_encontrada.group(1) if versao_encontrada else None
+
+
+    @staticmethod
+    def obter_versao_java(java_path: Path|None) -> str|None:
+        """
+        Obtém a versão do Java (ex: '21.0.2'), lendo o arquivo 'release' do JDK
+        ou, se ele não existir, a saída de 'java -version'
+
+        Args:
+            java_path (Path): Caminho para o executável Java (None usa o "java" do sistema)
+
+        Returns:
+            str|None: Versão do Java ou None se não for possível determinar
+        """
+        if java_path is not None:
+            versao_release = GerenciadorJava._ler_versao_release(java_path)
+            if versao_release:
+                return versao_release
+        try:
+            resultado = subprocess.run(
+                [str(java_path) if java_path else "java", "-version"],
+                capture_output=True, text=True, timeout=30
+            )
+            # 'java -version' escreve no stderr: openjdk version "21.0.2" 2024-01-16
+            versao_encontrada = re.search(r'version "([^"]+)"', resultado.stderr + resultado.stdout)
+            return versao_encontrada.group(1) if versao_encontrada else None
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Não foi possível obter a versão do Java: {e}")
+            return None
+
+
+    @staticmethod
+    def obter_versao_principal_java(versao_java: str|None) -> int|None:
+        """
+        Extrai a versão principal do Java ('21.0.2' -> 21, '1.8.0_392' -> 8)
+
+        Args:
+            versao_java (str): Versão completa do Java
+
+        Returns:
+            int|None: Versão principal ou None se inválida
+        """
+        if not versao_java:
+            return None
+        numeros = re.findall(r'\d+', versao_java)
+        if not numeros:
+            return None
+        if numeros[0] == '1' and len(numeros) > 1:
+            return int(numeros[1])
+        return int(numeros[0])
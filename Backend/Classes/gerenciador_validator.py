@@ -1,8 +1,14 @@
 from pathlib import Path
-from json import dump
+from json import dump, load
 from Backend.Classes.exceptions import ExcecaoTemplate
 from Backend.Classes.arquivo_downloader import ArquivoDownloader
+from Backend.Classes.cache_ferramentas import CacheFerramentas
+from Backend.Classes.executor_processos import ExecutorProcessos
+from contextlib import nullcontext
+import threading
 import time
+import json
+import os
 import subprocess
 import requests
 import zipfile
@@ -18,15 +24,28 @@ class GerenciadorValidator:
     URL_DOWNLOAD_VALIDADOR = "https://github.com/hapifhir/org.hl7.fhir.core/releases/latest/download/validator_cli.jar"
     URL_API_GITHUB = "https://api.github.com/repos/hapifhir/org.hl7.fhir.core/releases/latest"
     MAXIMO_TENTATIVAS_PADRAO = 3
-    TEMPO_ESPERA_TENTATIVA = 300  # segundos
+    TEMPO_ESPERA_TENTATIVA = 2  # segundos (dobrado a cada tentativa)
+    TEMPO_TIMEOUT_DOWNLOAD = 300  # segundos
+    SUFIXO_ESTADO_ATUALIZACAO = ".atualizacao.json"
+    SUFIXO_PENDENTE = ".pendente"
+
+    # Validators cuja atualização já foi verificada neste processo
+    _validators_verificados = set()
+    _lock_verificacao = threading.Lock()
+    URL_EXTENSAO_ARQUIVO_OUTCOME = "http://hl7.org/fhir/StructureDefinition/operationoutcome-file"
 
     # Construtor
-    def __init__(self, caminho_validador: Path):
+    def __init__(self, caminho_validador: Path, argumentos_jvm: list[str] = None, cache_ferramentas: CacheFerramentas = None, argumentos_validator: list[str] = None, executor_processos: ExecutorProcessos = None, sha256_validator: str = None):
         """
         Inicializa o gerenciador do validator_cli
         
         Args:
             caminho_validador (Path): Caminho onde o validator_cli será armazenado
+            argumentos_jvm (list[str]): Argumentos passados à JVM ao executar o validator (opcional)
+            cache_ferramentas (CacheFerramentas): Cache compartilhado onde o validator é instalado por versão (opcional)
+            argumentos_validator (list[str]): Argumentos do validator_cli usados em toda validação, ex: -tx (opcional)
+            executor_processos (ExecutorProcessos): Executor asyncio dos processos do validator (opcional, padrão subprocess.run)
+            sha256_validator (str): SHA-256 fixado do validator_cli.jar; downloads com outro conteúdo são rejeitados (opcional)
             
         Raises:
             TypeError: Se caminho_validador não for Path
@@ -34,6 +53,12 @@ class GerenciadorValidator:
         """
         self._validar_path(caminho_validador)
         self.caminho_validador = caminho_validador
+        self.argumentos_jvm = argumentos_jvm or []
+        self.cache_ferramentas = cache_ferramentas
+        self.argumentos_validator = argumentos_validator or []
+        self.executor_processos = executor_processos
+        self.sha256_validator = (sha256_validator or "").strip().lower() or None
+        self._prefixos_comando = {}
 
 
     def _validar_path(self, caminho: Path):
@@ -158,7 +183,7 @@ class GerenciadorValidator:
                 if numero_tentativas < self.MAXIMO_TENTATIVAS_PADRAO:
                     logger.warning(f"Erro na tentativa {numero_tentativas} de conexão com git")
                     print(f"\rErro na tentativa {numero_tentativas} de conexão, reiniciando...")
-                    time.sleep(self.TEMPO_ESPERA_TENTATIVA)
+                    time.sleep(self.TEMPO_ESPERA_TENTATIVA * 2 ** (numero_tentativas - 1))
                 else:
                     logger.warning(f"Erro ao conectar com github do validator_cli: {e}")
                     versao_local = self.verificar_versao_validator(self.caminho_validador)
@@ -188,19 +213,125 @@ class GerenciadorValidator:
                 downloader_callback.baixar_arquivo(
                     self.URL_DOWNLOAD_VALIDADOR, 
                     caminho_instalacao, 
+                    sha256_esperado=self.sha256_validator,
                 )
             except Exception as e:
                 logger.fatal(f"Erro ao instalar o validator_cli: {e}")
                 raise e
 
 
-    def atualizar_validator_cli(self, tempo_timeout_requests: int, downloader_callback: ArquivoDownloader):
+    def _caminho_controle(self, sufixo: str = "") -> Path:
+        """Arquivos de controle do validator (no cache de ferramentas, compartilhados entre as versões)"""
+        if self.cache_ferramentas is not None:
+            base = self.cache_ferramentas.pasta_validator / CacheFerramentas.NOME_VALIDATOR
+        else:
+            base = self.caminho_validador
+        return base.with_name(base.name + sufixo)
+
+
+    def _caminho_estado_atualizacao(self) -> Path:
+        """Arquivo com o resultado da última verificação de atualização"""
+        return self._caminho_controle(self.SUFIXO_ESTADO_ATUALIZACAO)
+
+
+    def _caminho_pendente(self) -> Path:
+        """Versão nova baixada em segundo plano, aplicada na próxima inicialização"""
+        return self._caminho_controle(self.SUFIXO_PENDENTE)
+
+
+    def _caminho_temporario(self) -> Path:
+        """Destino exclusivo deste processo para downloads (execuções simultâneas não disputam o arquivo)"""
+        if self.cache_ferramentas is not None:
+            return self.cache_ferramentas.caminho_temporario_validator()
+        return self.caminho_validador.with_name(f"temp_{os.getpid()}_validator_cli.jar")
+
+
+    def _bloqueio_instalacao(self):
+        """Lock entre processos usado na instalação/atualização (nenhum sem o cache de ferramentas)"""
+        if self.cache_ferramentas is not None:
+            return self.cache_ferramentas.bloqueio(CacheFerramentas.PASTA_VALIDATOR)
+        return nullcontext()
+
+
+    def _publicar_validator(self, caminho_novo: Path) -> str:
+        """
+        Torna um validator baixado o validator em uso. No cache de ferramentas ele é instalado
+        na pasta da sua versão, sem substituir o jar usado por outras execuções
+
+        Args:
+            caminho_novo (Path): Jar baixado
+
+        Returns:
+            str: Versão do validator publicado
+
+        Raises:
+            ExcecaoTemplate: Se o jar baixado não for um validator_cli válido
+        """
+        versao = self.verificar_versao_validator(caminho_novo)
+        if not versao:
+            caminho_novo.unlink(missing_ok=True)
+            raise ExcecaoTemplate("Arquivo validator_cli baixado é inválido")
+        if self.cache_ferramentas is not None:
+            self.caminho_validador = self.cache_ferramentas.instalar_validator(caminho_novo, versao)
+        else:
+            os.replace(caminho_novo, self.caminho_validador)
+        return versao
+
+
+    def _ler_estado_atualizacao(self) -> dict:
+        """Lê o estado da última verificação de atualização (vazio se não existir)"""
+        try:
+            with open(self._caminho_estado_atualizacao(), "r", encoding="utf-8") as arquivo_estado:
+                estado = json.load(arquivo_estado)
+            return estado if isinstance(estado, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+
+    def _salvar_estado_atualizacao(self, versao_mais_recente: str|None):
+        """Registra o momento e o resultado da verificação de atualização"""
+        estado = {'ultima_verificacao': time.time(), 'versao_mais_recente': versao_mais_recente}
+        caminho_estado = self._caminho_estado_atualizacao()
+        caminho_temporario = caminho_estado.with_suffix(".tmp")
+        try:
+            with open(caminho_temporario, "w", encoding="utf-8") as arquivo_estado:
+                json.dump(estado, arquivo_estado)
+            os.replace(caminho_temporario, caminho_estado)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o estado da verificação de atualização: {e}")
+
+
+    def aplicar_atualizacao_pendente(self) -> bool:
+        """
+        Substitui o validator pela versão baixada em segundo plano numa execução anterior
+
+        Returns:
+            bool: True se uma atualização foi aplicada
+        """
+        caminho_pendente = self._caminho_pendente()
+        if not caminho_pendente.exists():
+            return False
+        try:
+            versao_pendente = self._publicar_validator(caminho_pendente)
+        except ExcecaoTemplate:
+            logger.warning("Atualização pendente do validator_cli inválida, descartando")
+            return False
+        logger.info(f"validator_cli atualizado para a versão {versao_pendente}")
+        print(f"\rvalidator_cli atualizado para a versão {versao_pendente}")
+        return True
+
+
+    def atualizar_validator_cli(self, tempo_timeout_requests: int, downloader_callback: ArquivoDownloader, intervalo_verificacao_horas: float = 0, modo_offline: bool = False, em_segundo_plano: bool = False):
         """
-        Atualiza o validator_cli para a versão mais recente
+        Atualiza o validator_cli para a versão mais recente.
+        A verificação ocorre no máximo uma vez por processo e uma vez a cada intervalo_verificacao_horas
         
         Args:
             tempo_timeout_requests (int): Timeout para requisições HTTP
             downloader_callback (ArquivoDownloader): Instancia de ArquivoDownloader que fará os download
+            intervalo_verificacao_horas (float): Tempo mínimo entre verificações no GitHub (0 verifica sempre)
+            modo_offline (bool): Não faz nenhuma requisição de rede
+            em_segundo_plano (bool): Baixa a nova versão em segundo plano (aplicada na próxima execução)
             
         Raises:
             requests.exceptions.Timeout: Timeout nas requisições
@@ -209,42 +340,87 @@ class GerenciadorValidator:
         """
         logger.info("Buscando atualizações do validator_cli")
 
+        # Execuções simultâneas esperam aqui em vez de baixar/substituir o mesmo arquivo
+        with self._bloqueio_instalacao():
+            if self.cache_ferramentas is not None:
+                # Outra execução pode ter instalado uma versão enquanto o lock era aguardado
+                self.caminho_validador = self.cache_ferramentas.caminho_validator_atual() or self.caminho_validador
+            self._verificar_atualizacao(tempo_timeout_requests, downloader_callback, intervalo_verificacao_horas, modo_offline, em_segundo_plano)
+
+
+    def _verificar_atualizacao(self, tempo_timeout_requests: int, downloader_callback: ArquivoDownloader, intervalo_verificacao_horas: float, modo_offline: bool, em_segundo_plano: bool):
+        """Instala ou atualiza o validator_cli (chamado com o lock de instalação adquirido)"""
         # Verificar se o validator já existe
         if self.caminho_validador.exists():
+            chave_validator = str(self._caminho_controle().resolve())
+            with self._lock_verificacao:
+                if chave_validator in self._validators_verificados:
+                    logger.debug("Atualização do validator_cli já verificada neste processo")
+                    return
+                self._validators_verificados.add(chave_validator)
+
+            self.aplicar_atualizacao_pendente()
+
             # Verificar versão atual
             try:
                 versao_atual = self.verificar_versao_validator(self.caminho_validador)
             except Exception as e:
                 raise ExcecaoTemplate("Arquivo validator_cli inválido", e)
 
-            # Obter versão mais recente
-            versao_mais_recente = self._obter_versao_mais_recente_github(tempo_timeout_requests)
+            if modo_offline:
+                logger.info("Modo offline: verificação de atualização do validator_cli ignorada")
+                return
+            if self.sha256_validator:
+                # Com o SHA-256 fixado a versão também é fixa: a última versão publicada seria rejeitada
+                logger.info("SHA-256 do validator_cli fixado: verificação de atualização ignorada")
+                return
+
+            estado = self._ler_estado_atualizacao()
+            tempo_desde_verificacao = time.time() - estado.get('ultima_verificacao', 0)
+            if 0 <= tempo_desde_verificacao < intervalo_verificacao_horas * 3600:
+                logger.info("Verificação de atualização recente, usando o resultado salvo")
+                versao_mais_recente = estado.get('versao_mais_recente')
+            else:
+                # Obter versão mais recente
+                versao_mais_recente = self._obter_versao_mais_recente_github(tempo_timeout_requests)
+                self._salvar_estado_atualizacao(versao_mais_recente)
             
             if versao_mais_recente and self._precisa_atualizar(versao_atual, versao_mais_recente):
-                self._executar_atualizacao(downloader_callback)
+                if em_segundo_plano:
+                    self._iniciar_atualizacao_segundo_plano(downloader_callback)
+                else:
+                    self._executar_atualizacao(downloader_callback)
             else:
                 logger.info("Verificação de atualização finalizada")
         else:
+            if modo_offline:
+                raise FileNotFoundError(f"validator_cli não encontrado em {self.caminho_validador} e o modo offline está ativo")
             logger.info("Nenhuma instância de validator_cli encontrada, iniciando download")
             print("\rO validator padrão não foi encontrado ou não existe!\nIniciando sua instalação.")
-            self.instalar_validator_cli(downloader_callback)
+            if self.cache_ferramentas is None:
+                self.instalar_validator_cli(downloader_callback)
+            else:
+                self._executar_atualizacao(downloader_callback)
 
 
-    def atualizar_validator_cli_seguro(self, tempo_timeout_requests: int, downloader_callback: ArquivoDownloader=None) -> bool:
+    def atualizar_validator_cli_seguro(self, tempo_timeout_requests: int, downloader_callback: ArquivoDownloader=None, intervalo_verificacao_horas: float = 0, modo_offline: bool = False, em_segundo_plano: bool = False) -> bool:
         """
         Versão segura que lida com erros sem interromper o programa principal
         
         Args:
             tempo_timeout_requests (int): Timeout para requisições HTTP
             downloader_callback (ArquivoDownloader): Instancia de ArquivoDownloader que fará os download
+            intervalo_verificacao_horas (float): Tempo mínimo entre verificações no GitHub (0 verifica sempre)
+            modo_offline (bool): Não faz nenhuma requisição de rede
+            em_segundo_plano (bool): Baixa a nova versão em segundo plano (aplicada na próxima execução)
             
         Returns:
             bool: True se atualizou com sucesso, False caso contrário
         """
         try:
             if not downloader_callback:
-                downloader_callback = ArquivoDownloader(self.TEMPO_ESPERA_TENTATIVA)
-            self.atualizar_validator_cli(tempo_timeout_requests, downloader_callback)
+                downloader_callback = ArquivoDownloader(self.TEMPO_TIMEOUT_DOWNLOAD)
+            self.atualizar_validator_cli(tempo_timeout_requests, downloader_callback, intervalo_verificacao_horas, modo_offline, em_segundo_plano)
             return True
         except ExcecaoTemplate as e:
             logger.fatal(f"O arquivo do validator_cli é inválido: {e}")
@@ -257,6 +433,37 @@ class GerenciadorValidator:
             return False
 
 
+    def _iniciar_atualizacao_segundo_plano(self, downloader_callback: ArquivoDownloader):
+        """
+        Baixa a nova versão do validator em uma thread, sem bloquear a execução atual.
+        O arquivo baixado fica pendente e substitui o validator na próxima inicialização
+
+        Args:
+            downloader_callback (ArquivoDownloader): Instancia de ArquivoDownloader que fará o download
+        """
+        def _baixar_versao_pendente():
+            caminho_temporario = self._caminho_temporario()
+            try:
+                self.instalar_validator_cli(downloader_callback, caminho_temporario)
+                versao = self.verificar_versao_validator(caminho_temporario)
+                if versao and self.cache_ferramentas is not None:
+                    # Instalada lado a lado: esta execução continua usando o jar atual
+                    with self._bloqueio_instalacao():
+                        self.cache_ferramentas.instalar_validator(caminho_temporario, versao)
+                    logger.info("Nova versão do validator_cli instalada, será usada na próxima execução")
+                elif versao:
+                    os.replace(caminho_temporario, self._caminho_pendente())
+                    logger.info("Nova versão do validator_cli baixada, será usada na próxima execução")
+            except Exception as e:
+                logger.warning(f"Erro ao baixar atualização do validator_cli em segundo plano: {e}")
+            finally:
+                caminho_temporario.unlink(missing_ok=True)
+
+        logger.info("Baixando nova versão do validator_cli em segundo plano")
+        # daemon: um download incompleto é descartado e refeito na próxima execução
+        threading.Thread(target=_baixar_versao_pendente, name="fut-atualizacao-validator", daemon=True).start()
+
+
     def _executar_atualizacao(self, downloader_callback: ArquivoDownloader):
         """
         Executa o processo de atualização do validator
@@ -267,9 +474,8 @@ class GerenciadorValidator:
         Raises:
             Exception: Erros durante processo de atualização
         """
+        caminho_temporario = self._caminho_temporario()
         try:
-            caminho_temporario = self.caminho_validador.with_name("temp_validator_cli.jar")
-            
             # Fazer download da nova versão usando o downloader_callback
             logger.info("Fazendo download da nova versão do validator_cli")
             self.instalar_validator_cli(downloader_callback, caminho_temporario)
@@ -278,15 +484,16 @@ class GerenciadorValidator:
             # Substituir arquivo antigo
             if caminho_temporario.exists():
                 logger.info("Atualizando o validator_cli")
-                self.caminho_validador.unlink()  # Remove arquivo antigo
-                caminho_temporario.rename(self.caminho_validador)
+                self._publicar_validator(caminho_temporario)
                 
         except Exception as e:
             logger.error(f"Erro ao atualizar validator: {e}")
             raise e
+        finally:
+            caminho_temporario.unlink(missing_ok=True)
         
 
-    def validar_arquivo_fhir(self, arquivo_validar: Path, pasta_relatorio: Path, num_teste: int, tempo_timeout: int, java_path: Path = None, argumentos_extras: str = None) -> list:
+    def validar_arquivo_fhir(self, arquivo_validar: Path, pasta_relatorio: Path, num_teste: int, tempo_timeout: int, java_path: Path = None, argumentos_extras: list[str] = None) -> list:
         """
         Executa validação do arquivo FHIR usando validator_cli.jar
         
@@ -296,7 +503,7 @@ class GerenciadorValidator:
             num_teste (int): Número do teste
             tempo_timeout (int): Timeout para execução
             java_path (Path): Caminho para o executável Java (opcional)
-            argumentos_extras (str): Argumentos adicionais para validação
+            argumentos_extras (list[str]): Argumentos adicionais para validação
             
         Returns:
             List: [Caminho do relatório JSON, Tempo de execução em segundos]
@@ -315,34 +522,17 @@ class GerenciadorValidator:
                 logger.warning(f"Arquivo não encontrado: {arquivo_validar}")
                 raise FileNotFoundError(f"Arquivo de entrada não encontrado: {arquivo_validar}")
 
-            nome_relatorio = f"{arquivo_validar.stem}_{str(num_teste)}.json"
-            caminho_relatorio = pasta_relatorio / nome_relatorio
+            caminho_relatorio = pasta_relatorio / self.nome_relatorio(arquivo_validar, num_teste)
             
-            # Usa o java_path fornecido ou fallback para "java" do sistema
-            java_executable = str(java_path.resolve()) if java_path else "java"
-            
-            comando = [
-                java_executable, '-Dfile.encoding=UTF-8', "-jar", str(self.caminho_validador.resolve()),
-                str(arquivo_validar.resolve()),
-                "-output", str(caminho_relatorio.resolve()),
-                "-version", "4.0.1"
-            ]
-            
-            if argumentos_extras:
-                comando += argumentos_extras if isinstance(argumentos_extras, list) else [argumentos_extras]
+            comando = self.montar_comando([arquivo_validar], caminho_relatorio, java_path, argumentos_extras)
 
             inicio = time.time()
-            resultado = subprocess.run(
-                comando, 
-                capture_output=True, 
-                text=True, 
-                timeout=tempo_timeout
-            )
+            self._executar_comando(comando, tempo_timeout, caminho_relatorio.with_suffix(".log"))
             fim = time.time()
 
             # Criar relatório manual se não foi gerado
             if not caminho_relatorio.exists():
-                self._criar_relatorio_erro(
+                self.criar_relatorio_erro(
                     caminho_relatorio,
                     "non-existent ig or resource or profile"
                 )
@@ -351,7 +541,7 @@ class GerenciadorValidator:
 
         except subprocess.TimeoutExpired:
             logger.warning(f"Timeout na validação de {arquivo_validar}")
-            self._criar_relatorio_timeout(caminho_relatorio, tempo_timeout)
+            self.criar_relatorio_timeout(caminho_relatorio, tempo_timeout)
             return [caminho_relatorio, tempo_timeout]
         
         # Exceções aqui provavelmente são problemas do código, não do validator
@@ -360,7 +550,177 @@ class GerenciadorValidator:
             raise e
 
 
-    def _criar_relatorio_erro(self, caminho_relatorio: Path, mensagem_erro: str) -> None:
+    def validar_lote_fhir(self, arquivos_validar: list[Path], pasta_relatorio: Path, numeros_teste: list[int], tempo_timeout: int, java_path: Path = None, argumentos_extras: list[str] = None) -> list[list]:
+        """
+        Valida vários arquivos FHIR de mesmo contexto em uma única execução do validator_cli
+        e separa o resultado combinado em um relatório por arquivo
+        
+        Args:
+            arquivos_validar (list[Path]): Arquivos FHIR a serem validados
+            pasta_relatorio (Path): Pasta onde os relatórios serão salvos
+            numeros_teste (list[int]): Número de cada teste (mesma ordem de arquivos_validar)
+            tempo_timeout (int): Timeout para a execução do lote inteiro
+            java_path (Path): Caminho para o executável Java (opcional)
+            argumentos_extras (list[str]): Argumentos de contexto compartilhados pelo lote
+            
+        Returns:
+            list[list]: [Caminho do relatório JSON, Tempo de execução em segundos] de cada arquivo
+            
+        Raises:
+            FileNotFoundError: Algum arquivo do lote não foi encontrado
+            subprocess.TimeoutExpired: O lote excedeu tempo_timeout (nenhum relatório é criado)
+        """
+        arquivos_resolvidos = []
+        for arquivo_validar in arquivos_validar:
+            arquivo_validar = arquivo_validar.expanduser()
+            if not arquivo_validar.is_absolute():
+                arquivo_validar = Path.cwd() / arquivo_validar
+            if not arquivo_validar.exists():
+                logger.warning(f"Arquivo não encontrado: {arquivo_validar}")
+                raise FileNotFoundError(f"Arquivo de entrada não encontrado: {arquivo_validar}")
+            arquivos_resolvidos.append(arquivo_validar.resolve())
+
+        caminhos_relatorio = [
+            pasta_relatorio / self.nome_relatorio(arquivo, num_teste)
+            for arquivo, num_teste in zip(arquivos_resolvidos, numeros_teste)
+        ]
+        caminho_saida_lote = pasta_relatorio / f"lote_{str(numeros_teste[0])}.json"
+        comando = self.montar_comando(arquivos_resolvidos, caminho_saida_lote, java_path, argumentos_extras)
+
+        inicio = time.time()
+        self._executar_comando(comando, tempo_timeout, caminho_saida_lote.with_suffix(".log"))
+        tempo_por_arquivo = (time.time() - inicio) / len(arquivos_resolvidos)
+
+        resultados_separados = self._separar_saida_lote(caminho_saida_lote, arquivos_resolvidos)
+        caminho_saida_lote.unlink(missing_ok=True)
+
+        saidas = []
+        for caminho_relatorio, resultado in zip(caminhos_relatorio, resultados_separados):
+            if resultado is None:
+                self.criar_relatorio_erro(caminho_relatorio, "non-existent ig or resource or profile")
+            else:
+                with open(caminho_relatorio, mode="w", encoding="utf8") as arquivo:
+                    dump(resultado, arquivo, indent=4, ensure_ascii=False)
+            saidas.append([caminho_relatorio, tempo_por_arquivo])
+        return saidas
+
+
+    def _executar_comando(self, comando: list[str], tempo_timeout: float, caminho_log: Path):
+        """
+        Executa o validator_cli pelo executor asyncio (saída transmitida e grupo de processos
+        encerrado no timeout) ou, sem executor, com subprocess.run
+
+        Args:
+            comando (list[str]): Comando montado por montar_comando
+            tempo_timeout (float): Tempo máximo de execução
+            caminho_log (Path): Arquivo de log da execução (usado pelo executor, se habilitado)
+
+        Raises:
+            subprocess.TimeoutExpired: Se a execução exceder tempo_timeout
+        """
+        if self.executor_processos is None:
+            subprocess.run(comando, capture_output=True, text=True, timeout=tempo_timeout)
+            return
+        codigo_retorno, ultimas_linhas = self.executor_processos.executar(comando, tempo_timeout, caminho_log)
+        if codigo_retorno != 0:
+            logger.debug(f"validator_cli terminou com código {codigo_retorno}: {ultimas_linhas[-2000:]}")
+
+
+    def _separar_saida_lote(self, caminho_saida_lote: Path, arquivos_validados: list[Path]) -> list[dict|None]:
+        """
+        Separa a saída do validator (Bundle de OperationOutcome) em um resultado por arquivo
+        
+        Args:
+            caminho_saida_lote (Path): Saída combinada gerada pelo validator
+            arquivos_validados (list[Path]): Arquivos validados, na ordem passada ao validator
+            
+        Returns:
+            list[dict|None]: OperationOutcome de cada arquivo (None se não encontrado)
+        """
+        if not caminho_saida_lote.exists():
+            return [None] * len(arquivos_validados)
+        try:
+            with open(caminho_saida_lote, mode="r", encoding="utf8") as arquivo:
+                saida = load(arquivo)
+        except ValueError as e:
+            logger.warning(f"Saída do lote inválida: {e}")
+            return [None] * len(arquivos_validados)
+
+        # Com um único arquivo o validator gera o OperationOutcome diretamente
+        if saida.get('resourceType') == 'OperationOutcome':
+            outcomes = [saida]
+        else:
+            outcomes = [entrada.get('resource', {}) for entrada in saida.get('entry', [])]
+
+        # Associar cada OperationOutcome ao seu arquivo pela extensão 'operationoutcome-file'
+        outcome_por_arquivo = {}
+        for outcome in outcomes:
+            for extensao in outcome.get('extension', []):
+                if extensao.get('url') == self.URL_EXTENSAO_ARQUIVO_OUTCOME:
+                    outcome_por_arquivo[str(Path(extensao.get('valueString', '')).resolve())] = outcome
+
+        resultados = []
+        for indice, arquivo in enumerate(arquivos_validados):
+            outcome = outcome_por_arquivo.get(str(arquivo))
+            # Fallback: mesma ordem de entrada
+            if outcome is None and not outcome_por_arquivo and indice < len(outcomes):
+                outcome = outcomes[indice]
+            resultados.append(outcome)
+        return resultados
+
+
+    @staticmethod
+    def nome_relatorio(arquivo_validar: Path, num_teste: int) -> str:
+        """
+        Nome do arquivo de saída do validator para um teste
+
+        Args:
+            arquivo_validar (Path): Arquivo FHIR validado
+            num_teste (int): Número do teste
+
+        Returns:
+            str: Nome do relatório JSON
+        """
+        return f"{arquivo_validar.stem}_{str(num_teste)}.json"
+
+
+    def montar_comando(self, arquivos_validar: list[Path], caminho_saida: Path, java_path: Path = None, argumentos_extras: list[str] = None, argumentos_adicionais_cli: list = None) -> list[str]:
+        """
+        Monta a linha de comando usada para executar o validator_cli
+        
+        Args:
+            arquivos_validar (list[Path]): Arquivos FHIR a serem validados
+            caminho_saida (Path): Arquivo onde o validator escreverá o OperationOutcome
+            java_path (Path): Caminho para o executável Java (opcional)
+            argumentos_extras (list[str]): Argumentos de contexto do teste (-ig, -profile), um elemento por flag ou valor
+            argumentos_adicionais_cli (list): Argumentos extras do validator_cli (opcional)
+            
+        Returns:
+            list[str]: Comando pronto para ser usado pelo subprocess
+        """
+        # Início do comando (java, JVM e jar) resolvido uma vez por java/validator
+        chave_prefixo = (java_path, self.caminho_validador)
+        prefixo = self._prefixos_comando.get(chave_prefixo)
+        if prefixo is None:
+            # Usa o java_path fornecido ou fallback para "java" do sistema
+            java_executable = str(java_path.resolve()) if java_path else "java"
+            prefixo = [java_executable, '-Dfile.encoding=UTF-8', *self.argumentos_jvm, "-jar", str(self.caminho_validador.resolve())]
+            self._prefixos_comando[chave_prefixo] = prefixo
+        
+        comando = list(prefixo)
+        comando += [str(arquivo.resolve()) for arquivo in arquivos_validar]
+        comando += [
+            "-output", str(caminho_saida.resolve()),
+            "-version", "4.0.1"
+        ]
+        comando += self.argumentos_validator
+        comando += [str(argumento) for argumento in argumentos_extras or []]
+        if argumentos_adicionais_cli:
+            comando += argumentos_adicionais_cli
+        return comando
+
+
+    def criar_relatorio_erro(self, caminho_relatorio: Path, mensagem_erro: str) -> None:
         """
         Cria relatório JSON para casos de erro
         
@@ -381,7 +741,7 @@ class GerenciadorValidator:
             dump(dicionario_erro, arquivo, indent=4, ensure_ascii=False)
 
 
-    def _criar_relatorio_timeout(self, caminho_relatorio: Path, tempo_timeout: int) -> None:
+    def criar_relatorio_timeout(self, caminho_relatorio: Path, tempo_timeout: int) -> None:
         """
         Cria relatório JSON para casos de timeout
         
@@ -390,4 +750,4 @@ class GerenciadorValidator:
             tempo_timeout (int): Tempo de timeout que ocorreu
         """
         mensagem_timeout = f"tentativa de validar arquivo excedeu {tempo_timeout} segundos"
-        self._criar_relatorio_erro(caminho_relatorio, mensagem_timeout)
\ No newline at end of file
+        self.criar_relatorio_erro(caminho_relatorio, mensagem_timeout)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from Backend.Classes.controlador_configuracao import ControladorConfiguracao
 from Backend.Classes.validador_arquivo import ValidadorArquivo
 from Backend.Classes.configurador_validator import ConfiguradorValidator
+from Backend.Classes.cache_ferramentas import CacheFerramentas
 from pathlib import Path
 import shutil
 import sys
@@ -83,6 +84,8 @@ class GestorCaminho:
             'settings': self.path_settings,
             'arquivos': self.path_arquivos,
             'script_frontend': self.path_script_frontend,
+            'ferramentas': self.cache_ferramentas.raiz,
+            'jdk': self.cache_ferramentas.pasta_jdk,
         }
         
         if path_desejado not in paths:
@@ -132,10 +135,15 @@ class GestorCaminho:
                 self.path_schema_configuracoes
             )
         
+        # JDK e validator ficam no cache de ferramentas, compartilhado entre execuções simultâneas
+        self.cache_ferramentas = CacheFerramentas(self.path_arquivos)
+        self.cache_ferramentas.migrar_instalacao_legada(self.path_arquivos)
+
         # Configurar validator usando o ConfiguradorValidator
         configurador_validator = ConfiguradorValidator(
             self.controlador_configuracao, 
-            self.path_arquivos
+            self.path_arquivos,
+            self.cache_ferramentas
         )
         self.path_validator = configurador_validator.resolver_caminho_validator()
         self.path_pasta_validator = configurador_validator.definir_pasta_validator()
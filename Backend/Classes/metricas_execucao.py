@@ -0,0 +1,51 @@
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class MetricasExecucao:
+    """
+    Armazena as métricas de uma execução de testes (thread-safe),
+    que são incluídas no relatorio_final
+    """
+
+    # Construtor
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+
+    def registrar(self, nome_metrica: str, valor):
+        """
+        Registra (ou sobrescreve) o valor de uma métrica
+
+        Args:
+            nome_metrica (str): Nome da métrica
+            valor: Valor da métrica (deve ser serializável em JSON)
+        """
+        with self._lock:
+            self._metricas[nome_metrica] = valor
+
+
+    def incrementar(self, nome_metrica: str, quantidade: int|float = 1):
+        """
+        Incrementa uma métrica numérica
+
+        Args:
+            nome_metrica (str): Nome da métrica
+            quantidade (int|float): Valor a ser somado
+        """
+        with self._lock:
+            self._metricas[nome_metrica] = self._metricas.get(nome_metrica, 0) + quantidade
+
+
+    def return_metricas(self) -> dict:
+        """
+        Retorna uma cópia das métricas registradas
+
+        Returns:
+            dict: Métricas da execução
+        """
+        with self._lock:
+            return dict(self._metricas)
@@ -0,0 +1,181 @@
+from Backend.Classes.gerenciador_validator import GerenciadorValidator
+from Backend.Classes.escalonador_contexto import EscalonadorContexto
+from Backend.Classes.teste import Teste
+from typing import NamedTuple, Iterable, Iterator
+from pathlib import Path
+import logging
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class ItemPlano(NamedTuple):
+    """Um teste do plano de execução, com todos os dados necessários para executá-lo"""
+    numero: int
+    teste: Teste
+    caminho_instancia: Path|None
+    caminho_saida: Path|None
+    contexto: tuple
+    comando: tuple
+    custo_estimado: float
+    justificativa: str
+
+
+class PlanoExecucao:
+    """
+    Plano imutável de uma execução, compilado uma única vez a partir dos testes preparados:
+    caminhos do java e do validator, arquivo de saída de cada teste, comando normalizado,
+    grupos de contexto e custo estimado. Pode ser exportado como JSON (fut plan / --dry-run)
+    sem iniciar nenhuma JVM
+    """
+
+    # Constantes (estimativa de custo, em segundos)
+    CUSTO_TESTE = 1.0  # inicialização e validação de uma instância pequena
+    CUSTO_POR_MB = 0.5  # tamanho da instância
+    CUSTO_CONTEXTO = 2.0  # carga de cada IG/perfil/recurso, paga uma vez por grupo de contexto
+
+    # Construtor
+    def __init__(self, itens: tuple[ItemPlano, ...], path_java: Path|None, path_validator: Path, argumentos_jvm: tuple, tamanho_lote: int):
+        """
+        Use PlanoExecucao.compilar para criar um plano
+
+        Args:
+            itens (tuple[ItemPlano, ...]): Testes do plano, na ordem de entrada
+            path_java (Path|None): Executável java usado (None => java do sistema)
+            path_validator (Path): validator_cli usado
+            argumentos_jvm (tuple): Argumentos da JVM de cada processo
+            tamanho_lote (int): Número máximo de testes de mesmo contexto por execução do validator
+        """
+        self.itens = itens
+        self.path_java = path_java
+        self.path_validator = path_validator
+        self.argumentos_jvm = argumentos_jvm
+        self.tamanho_lote = tamanho_lote
+        grupos = {}
+        for item in itens:
+            if not item.justificativa:
+                grupos.setdefault(item.contexto, []).append(item.numero)
+        self.grupos = {contexto: tuple(numeros) for contexto, numeros in grupos.items()}
+
+
+    @classmethod
+    def compilar(cls, lista_testes: list[Teste], gerenciador_validator: GerenciadorValidator, path_java: Path|None, pasta_relatorio: Path, tamanho_lote: int = 1) -> "PlanoExecucao":
+        """
+        Compila o plano de execução em uma única passagem pelos testes
+
+        Args:
+            lista_testes (list[Teste]): Testes preparados
+            gerenciador_validator (GerenciadorValidator): Monta o comando de cada teste (validator e argumentos)
+            path_java (Path|None): Executável java resolvido
+            pasta_relatorio (Path): Pasta das saídas do validator
+            tamanho_lote (int): Número máximo de testes por execução do validator
+
+        Returns:
+            PlanoExecucao: Plano compilado
+        """
+        itens = tuple(cls.gerar_itens(lista_testes, gerenciador_validator, path_java, pasta_relatorio))
+        plano = cls(itens, path_java, gerenciador_validator.caminho_validador, tuple(gerenciador_validator.argumentos_jvm), tamanho_lote)
+        logger.info(f"Plano de execução: {len(itens)} testes em {len(plano.grupos)} grupos de contexto")
+        return plano
+
+
+    @classmethod
+    def gerar_itens(cls, testes: Iterable[Teste], gerenciador_validator: GerenciadorValidator, path_java: Path|None, pasta_relatorio: Path, detalhar: bool = True) -> Iterator[ItemPlano]:
+        """
+        Gera os itens do plano sob demanda, um teste por vez (usado pela execução para não
+        manter o plano inteiro em memória)
+
+        Args:
+            testes (Iterable[Teste]): Testes preparados (lista ou gerador)
+            gerenciador_validator (GerenciadorValidator): Monta o comando de cada teste
+            path_java (Path|None): Executável java resolvido
+            pasta_relatorio (Path): Pasta das saídas do validator
+            detalhar (bool): Monta o comando e estima o custo de cada item (False na execução, onde
+                             o comando é montado por quem valida: teste isolado, lote ou pool)
+
+        Yields:
+            ItemPlano: Item de cada teste, na ordem de entrada
+        """
+        contextos_vistos = set()
+        for numero, teste in enumerate(testes):
+            contexto = EscalonadorContexto.normalizar_contexto(teste)
+            if teste.justificativa_teste_invalido or not isinstance(teste.conteudo, dict):
+                yield ItemPlano(numero, teste, None, None, contexto, (), 0.0, teste.justificativa_teste_invalido or "Conteúdo inválido")
+                continue
+
+            caminho_instancia = Path(str(teste.conteudo.get('caminho_instancia', ""))).expanduser()
+            if not caminho_instancia.is_absolute():
+                caminho_instancia = Path.cwd() / caminho_instancia
+            caminho_saida = pasta_relatorio / GerenciadorValidator.nome_relatorio(caminho_instancia, numero)
+            if not detalhar:
+                yield ItemPlano(numero, teste, caminho_instancia, caminho_saida, contexto, (), 0.0, "")
+                continue
+            comando = gerenciador_validator.montar_comando([caminho_instancia], caminho_saida, path_java, teste.argumentos_validator)
+
+            custo = cls.CUSTO_TESTE
+            try:
+                custo += cls.CUSTO_POR_MB * os.stat(caminho_instancia).st_size / (1024 * 1024)
+            except OSError:
+                pass  # Instância inexistente: o validator gera o erro adequado
+            if contexto not in contextos_vistos:
+                contextos_vistos.add(contexto)
+                custo += cls.CUSTO_CONTEXTO * sum(len(secao) for secao in contexto)
+            yield ItemPlano(numero, teste, caminho_instancia, caminho_saida, contexto, tuple(comando), round(custo, 3), "")
+
+
+    def itens_executaveis(self) -> list[ItemPlano]:
+        """Itens que iniciam o validator (sem justificativa de invalidez)"""
+        return [item for item in self.itens if not item.justificativa]
+
+
+    def custo_total(self) -> float:
+        """Custo estimado (em segundos de validator) de todos os testes"""
+        return round(sum(item.custo_estimado for item in self.itens), 3)
+
+
+    def para_dict(self) -> dict:
+        """
+        Representação serializável do plano
+
+        Returns:
+            dict: Resumo, grupos de contexto e testes
+        """
+        return {
+            'java': str(self.path_java) if self.path_java else "java",
+            'validator': str(self.path_validator),
+            'argumentos_jvm': list(self.argumentos_jvm),
+            'tamanho_lote': self.tamanho_lote,
+            'numero_de_testes': len(self.itens),
+            'numero_de_testes_executaveis': len(self.itens_executaveis()),
+            'numero_de_grupos': len(self.grupos),
+            'custo_estimado_total': self.custo_total(),
+            'grupos': [
+                {'igs': list(contexto[0]), 'profiles': list(contexto[1]), 'resources': list(contexto[2]), 'testes': list(numeros)}
+                for contexto, numeros in self.grupos.items()
+            ],
+            'testes': [
+                {
+                    'numero': item.numero,
+                    'arquivo_teste': str(item.teste.path_arquivo_teste),
+                    'test_id': item.teste.conteudo.get('test_id') if isinstance(item.teste.conteudo, dict) else None,
+                    'instancia': str(item.caminho_instancia) if item.caminho_instancia else None,
+                    'saida': str(item.caminho_saida) if item.caminho_saida else None,
+                    'comando': list(item.comando),
+                    'custo_estimado': item.custo_estimado,
+                    'justificativa': item.justificativa or None,
+                }
+                for item in self.itens
+            ],
+        }
+
+
+    def exportar_json(self, caminho_saida: Path):
+        """
+        Grava o plano em um arquivo JSON
+
+        Args:
+            caminho_saida (Path): Arquivo de destino
+        """
+        with open(caminho_saida, mode="w", encoding="utf8") as arquivo:
+            json.dump(self.para_dict(), arquivo, indent=4, ensure_ascii=False)
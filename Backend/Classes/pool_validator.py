@@ -0,0 +1,339 @@
+from Backend.Classes.gerenciador_validator import GerenciadorValidator
+from pathlib import Path
+import subprocess
+import threading
+import tempfile
+import logging
+import shutil
+import json
+import time
+import sys
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class TrabalhadorValidator:
+    """
+    Processo do validator_cli mantido vivo entre validações (watch mode).
+    O contexto (IGs, perfis e recursos) é carregado uma única vez e reaproveitado.
+    """
+
+    INTERVALO_VERIFICACAO = 0.05  # segundos
+    TEMPO_ESPERA_ENCERRAMENTO = 5  # segundos
+    ARGUMENTOS_WATCH_MODE = ["-watch-mode", "all", "-watch-scan-delay", "100", "-watch-settle-time", "50"]
+
+    # Construtor
+    def __init__(self, id_trabalhador: int, chave_contexto: tuple, pasta_trabalho: Path):
+        """
+        Inicializa o trabalhador (o processo só é iniciado na primeira validação)
+
+        Args:
+            id_trabalhador (int): Identificador do trabalhador
+            chave_contexto (tuple): Contexto de validação atendido (argumentos + extensão do arquivo)
+            pasta_trabalho (Path): Pasta exclusiva do trabalhador
+        """
+        self.id_trabalhador = id_trabalhador
+        self.chave_contexto = chave_contexto
+        self.pasta_trabalho = pasta_trabalho
+        self.pasta_trabalho.mkdir(parents=True, exist_ok=True)
+        self.arquivo_entrada = self.pasta_trabalho / f"entrada{chave_contexto[1]}"
+        self.arquivo_saida = self.pasta_trabalho / "saida.json"
+        self.processo = None
+        self.numero_validacoes = 0
+        self._encerrado = threading.Event()
+        self._lock = threading.Lock()
+
+
+    def _iniciar(self, comando: list[str]):
+        """Inicia o processo do validator em watch mode"""
+        logger.info(f"Iniciando trabalhador {self.id_trabalhador} do pool do validator")
+        with open(self.pasta_trabalho / "validator.log", "ab") as arquivo_log:
+            self.processo = subprocess.Popen(
+                comando,
+                stdout=arquivo_log,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                start_new_session=(sys.platform != "win32"),
+            )
+
+
+    def esta_vivo(self) -> bool:
+        """Verifica se o processo do validator continua em execução"""
+        return self.processo is not None and self.processo.poll() is None
+
+
+    def obter_memoria_mb(self) -> float|None:
+        """
+        Obtém a memória residente (RSS) do processo do validator
+
+        Returns:
+            float|None: Memória em MB ou None se não for possível medir (ex: fora do Linux)
+        """
+        if not self.esta_vivo():
+            return None
+        try:
+            with open(f"/proc/{self.processo.pid}/status", "r", encoding="utf-8") as arquivo_status:
+                for linha in arquivo_status:
+                    if linha.startswith("VmRSS:"):
+                        return int(linha.split()[1]) / 1024
+        except (OSError, ValueError, IndexError):
+            return None
+        return None
+
+
+    def validar(self, arquivo_validar: Path, caminho_relatorio: Path, tempo_timeout: float, comando: list[str]) -> float:
+        """
+        Valida um arquivo reaproveitando o processo do validator
+
+        Args:
+            arquivo_validar (Path): Arquivo FHIR a ser validado
+            caminho_relatorio (Path): Onde o OperationOutcome será salvo
+            tempo_timeout (float): Tempo máximo de espera pelo resultado
+            comando (list[str]): Comando usado caso o processo precise ser iniciado
+
+        Returns:
+            float: Tempo de execução em segundos
+
+        Raises:
+            subprocess.TimeoutExpired: Se o validator não responder a tempo
+            RuntimeError: Se o processo do validator for encerrado (inesperadamente ou pelo encerramento do pool)
+        """
+        inicio = time.time()
+        self.arquivo_saida.unlink(missing_ok=True)
+
+        # Escrita atômica para o watch mode nunca ler um arquivo parcial
+        arquivo_temporario = self.pasta_trabalho / "entrada.tmp"
+        shutil.copyfile(arquivo_validar, arquivo_temporario)
+        os.replace(arquivo_temporario, self.arquivo_entrada)
+
+        with self._lock:
+            if self._encerrado.is_set():
+                raise RuntimeError(f"Trabalhador {self.id_trabalhador} do validator foi encerrado")
+            if self.processo is None:
+                self._iniciar(comando)
+
+        while True:
+            if self.arquivo_saida.exists():
+                try:
+                    with open(self.arquivo_saida, "r", encoding="utf8") as arquivo:
+                        json.load(arquivo)
+                    break
+                except (ValueError, OSError):
+                    pass  # Saída ainda está sendo escrita
+            if self._encerrado.is_set():
+                raise RuntimeError(f"Trabalhador {self.id_trabalhador} do validator foi encerrado")
+            if not self.esta_vivo():
+                raise RuntimeError(f"Trabalhador {self.id_trabalhador} do validator foi encerrado inesperadamente")
+            if time.time() - inicio > tempo_timeout:
+                raise subprocess.TimeoutExpired(comando, tempo_timeout)
+            time.sleep(self.INTERVALO_VERIFICACAO)
+
+        shutil.copyfile(self.arquivo_saida, caminho_relatorio)
+        self.numero_validacoes += 1
+        return time.time() - inicio
+
+
+    def encerrar(self):
+        """
+        Encerra o processo do validator e remove a pasta de trabalho.
+        Uma validação em andamento é interrompida (validar lança RuntimeError)
+        """
+        with self._lock:
+            self._encerrado.set()
+            if self.esta_vivo():
+                logger.info(f"Encerrando trabalhador {self.id_trabalhador} do pool do validator")
+                self.processo.terminate()
+                try:
+                    self.processo.wait(timeout=self.TEMPO_ESPERA_ENCERRAMENTO)
+                except subprocess.TimeoutExpired:
+                    self.processo.kill()
+                    self.processo.wait()
+        shutil.rmtree(self.pasta_trabalho, ignore_errors=True)
+
+
+class PoolValidator:
+    """
+    Pool de processos do validator_cli de longa duração.
+    Cada trabalhador atende um único contexto de validação e é reciclado
+    após um número máximo de validações ou ao ultrapassar o limite de memória.
+    """
+
+    # Construtor
+    def __init__(self, gerenciador_validator: GerenciadorValidator, java_path: Path, max_trabalhadores: int, max_validacoes: int, limite_memoria_mb: int):
+        """
+        Inicializa o pool (os processos são criados sob demanda)
+
+        Args:
+            gerenciador_validator (GerenciadorValidator): Instância usada para montar os comandos
+            java_path (Path): Caminho para o executável Java
+            max_trabalhadores (int): Número máximo de processos simultâneos
+            max_validacoes (int): Validações antes de reciclar um trabalhador
+            limite_memoria_mb (int): Memória (RSS) máxima antes de reciclar um trabalhador
+        """
+        self.gerenciador_validator = gerenciador_validator
+        self.java_path = java_path
+        self.max_trabalhadores = max(1, max_trabalhadores)
+        self.max_validacoes = max_validacoes
+        self.limite_memoria_mb = limite_memoria_mb
+        self.pasta_pool = Path(tempfile.mkdtemp(prefix="fut-pool-"))
+        self._trabalhadores_livres = []
+        self._trabalhadores_ocupados = set()
+        self._numero_trabalhadores = 0
+        self._proximo_id = 0
+        self._encerrado = False
+        self._condicao = threading.Condition()
+        self.estatisticas = {'trabalhadores_iniciados': 0, 'trabalhadores_reciclados': 0}
+
+
+    def _trabalhador_saudavel(self, trabalhador: TrabalhadorValidator) -> bool:
+        """
+        Verifica se o trabalhador pode continuar sendo reutilizado
+
+        Args:
+            trabalhador (TrabalhadorValidator): Trabalhador a ser verificado
+
+        Returns:
+            bool: True se o trabalhador pode receber novas validações
+        """
+        if not trabalhador.esta_vivo():
+            return False
+        if trabalhador.numero_validacoes >= self.max_validacoes:
+            logger.info(f"Reciclando trabalhador {trabalhador.id_trabalhador}: limite de validações atingido")
+            return False
+        memoria_mb = trabalhador.obter_memoria_mb()
+        if memoria_mb is not None and memoria_mb > self.limite_memoria_mb:
+            logger.info(f"Reciclando trabalhador {trabalhador.id_trabalhador}: memória ({memoria_mb:.0f} MB) acima do limite")
+            return False
+        return True
+
+
+    def _adquirir(self, chave_contexto: tuple) -> TrabalhadorValidator:
+        """
+        Obtém um trabalhador para o contexto, criando ou substituindo um se necessário
+
+        Args:
+            chave_contexto (tuple): Contexto de validação desejado
+
+        Returns:
+            TrabalhadorValidator: Trabalhador reservado para uso exclusivo
+        """
+        with self._condicao:
+            while True:
+                if self._encerrado:
+                    raise RuntimeError("Pool do validator já foi encerrado")
+                # 1. Reaproveitar um trabalhador livre do mesmo contexto
+                for trabalhador in self._trabalhadores_livres:
+                    if trabalhador.chave_contexto == chave_contexto:
+                        self._trabalhadores_livres.remove(trabalhador)
+                        self._trabalhadores_ocupados.add(trabalhador)
+                        return trabalhador
+                # 2. Substituir um trabalhador livre de outro contexto
+                if self._numero_trabalhadores >= self.max_trabalhadores and self._trabalhadores_livres:
+                    trabalhador_antigo = self._trabalhadores_livres.pop(0)
+                    trabalhador_antigo.encerrar()
+                    self._numero_trabalhadores -= 1
+                # 3. Criar um novo trabalhador
+                if self._numero_trabalhadores < self.max_trabalhadores:
+                    self._numero_trabalhadores += 1
+                    self._proximo_id += 1
+                    self.estatisticas['trabalhadores_iniciados'] += 1
+                    trabalhador = TrabalhadorValidator(
+                        self._proximo_id, chave_contexto, self.pasta_pool / f"trabalhador_{self._proximo_id}"
+                    )
+                    self._trabalhadores_ocupados.add(trabalhador)
+                    return trabalhador
+                self._condicao.wait()
+
+
+    def _liberar(self, trabalhador: TrabalhadorValidator, reutilizavel: bool):
+        """
+        Devolve o trabalhador ao pool ou o recicla
+
+        Args:
+            trabalhador (TrabalhadorValidator): Trabalhador a ser devolvido
+            reutilizavel (bool): False se o trabalhador deve ser descartado
+        """
+        with self._condicao:
+            if trabalhador not in self._trabalhadores_ocupados:
+                return  # Já encerrado junto com o pool
+            self._trabalhadores_ocupados.remove(trabalhador)
+            if reutilizavel and not self._encerrado and self._trabalhador_saudavel(trabalhador):
+                self._trabalhadores_livres.append(trabalhador)
+            else:
+                trabalhador.encerrar()
+                self._numero_trabalhadores -= 1
+                self.estatisticas['trabalhadores_reciclados'] += 1
+            self._condicao.notify_all()
+
+
+    def validar_arquivo_fhir(self, arquivo_validar: Path, pasta_relatorio: Path, num_teste: int, tempo_timeout: int, argumentos_extras: list[str] = None) -> list:
+        """
+        Executa validação do arquivo FHIR usando um trabalhador do pool.
+        Segue o mesmo contrato de GerenciadorValidator.validar_arquivo_fhir
+
+        Args:
+            arquivo_validar (Path): Arquivo FHIR a ser validado
+            pasta_relatorio (Path): Pasta onde relatório será salvo
+            num_teste (int): Número do teste
+            tempo_timeout (int): Timeout para execução
+            argumentos_extras (list[str]): Argumentos adicionais para validação
+
+        Returns:
+            List: [Caminho do relatório JSON, Tempo de execução em segundos]
+
+        Raises:
+            FileNotFoundError: Arquivo não encontrado
+        """
+        arquivo_validar = arquivo_validar.expanduser()
+        if not arquivo_validar.is_absolute():
+            arquivo_validar = Path.cwd() / arquivo_validar
+        if not arquivo_validar.exists():
+            logger.warning(f"Arquivo não encontrado: {arquivo_validar}")
+            raise FileNotFoundError(f"Arquivo de entrada não encontrado: {arquivo_validar}")
+
+        caminho_relatorio = pasta_relatorio / f"{arquivo_validar.stem}_{str(num_teste)}.json"
+        chave_contexto = (tuple(argumentos_extras or ()), arquivo_validar.suffix.lower())
+        trabalhador = self._adquirir(chave_contexto)
+        reutilizavel = False
+        try:
+            comando = self.gerenciador_validator.montar_comando(
+                [trabalhador.arquivo_entrada], trabalhador.arquivo_saida, self.java_path,
+                argumentos_extras, TrabalhadorValidator.ARGUMENTOS_WATCH_MODE
+            )
+            tempo_execucao = trabalhador.validar(arquivo_validar, caminho_relatorio, tempo_timeout, comando)
+            reutilizavel = True
+            return [caminho_relatorio, tempo_execucao]
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Timeout na validação de {arquivo_validar} (pool)")
+            self.gerenciador_validator.criar_relatorio_timeout(caminho_relatorio, tempo_timeout)
+            return [caminho_relatorio, tempo_timeout]
+        except RuntimeError as e:
+            if self._encerrado:
+                raise  # Pool encerrado (ex: Ctrl+C): a pasta dos relatórios pode já ter sido removida
+            logger.warning(f"Erro no trabalhador do pool: {e}")
+            self.gerenciador_validator.criar_relatorio_erro(caminho_relatorio, "non-existent ig or resource or profile")
+            return [caminho_relatorio, 0]
+        finally:
+            self._liberar(trabalhador, reutilizavel)
+
+
+    def encerrar(self):
+        """
+        Encerra todos os trabalhadores, inclusive os que estão validando (as validações em
+        andamento retornam imediatamente com erro), e remove a pasta do pool
+        """
+        with self._condicao:
+            if self._encerrado:
+                return  # Já encerrado pela interrupção da execução
+            self._encerrado = True
+            trabalhadores = self._trabalhadores_livres + list(self._trabalhadores_ocupados)
+            self._trabalhadores_livres = []
+            self._trabalhadores_ocupados = set()
+            self._numero_trabalhadores -= len(trabalhadores)
+            self._condicao.notify_all()
+        # Fora do lock: validações interrompidas precisam dele para devolver o trabalhador
+        for trabalhador in trabalhadores:
+            trabalhador.encerrar()
+        logger.info(f"Pool do validator encerrado: {self.estatisticas}")
+        shutil.rmtree(self.pasta_pool, ignore_errors=True)
@@ -1,16 +1,23 @@
 from Backend.Classes.teste import Teste
+from Backend.Classes.compilador_recursos import CompiladorRecursos
+from typing import Iterator
 from pathlib import Path
 import logging
+import yaml
 
 logger = logging.getLogger(__name__)
 
 class PreparadorTeste:
     # Construtor
-    def __init__(self):
-        pass
+    def __init__(self, compilador_recursos: CompiladorRecursos = None):
+        """
+        Args:
+            compilador_recursos (CompiladorRecursos): Compila context.resources em um único pacote (opcional)
+        """
+        self.compilador_recursos = compilador_recursos
 
 
-    def _gerar_argumentos_validator(self, dict_contexto: dict, secao_interesse: str, prefixo: str) -> str:
+    def _gerar_argumentos_validator(self, dict_contexto: dict, secao_interesse: str, prefixo: str) -> list[str]:
         """
         Formata os argumentos do contexto para comandos usados pelo validator_cli.
         
@@ -20,15 +27,35 @@ class PreparadorTeste:
             prefixo (str): Prefixo para os argumentos
             
         Returns:
-            str: String com argumentos formatados
+            list[str]: Argumentos formatados (um elemento por flag ou valor)
         """
-        argumentos_formatados = ''
+        argumentos_formatados = []
         if dict_contexto.get(secao_interesse):
             if dict_contexto[secao_interesse] not in [None, "", [""]]:
-                argumentos_formatados = f"-{prefixo} " + f" -{prefixo} ".join(dict_contexto[secao_interesse])
+                for valor in dict_contexto[secao_interesse]:
+                    argumentos_formatados += [f"-{prefixo}", str(valor)]
         return argumentos_formatados
 
 
+    def _gerar_argumentos_recursos(self, dict_contexto: dict) -> list[str]:
+        """
+        Formata os recursos locais do contexto: um único -ig com o pacote compilado
+        ou, se não for possível compilá-los, um -ig por arquivo
+
+        Args:
+            dict_contexto (dict): Dicionário com o contexto
+
+        Returns:
+            list[str]: Argumentos formatados (um elemento por flag ou valor)
+        """
+        recursos = dict_contexto.get('resources')
+        if self.compilador_recursos is not None and recursos not in [None, "", [""]]:
+            caminho_pacote = self.compilador_recursos.compilar(recursos)
+            if caminho_pacote is not None:
+                return ["-ig", str(caminho_pacote)]
+        return self._gerar_argumentos_validator(dict_contexto, 'resources', 'ig')
+
+
     def _encontrar_arquivo_instancia(self, teste: Teste, caminho_teste: Path) -> Teste:
         """
         Localiza o arquivo de instância necessário para o teste.
@@ -74,45 +101,59 @@ class PreparadorTeste:
         teste_cru = Teste(path_arquivo_teste, dados)
         teste = self._encontrar_arquivo_instancia(teste_cru, path_arquivo_teste)
         if len(teste.justificativa_teste_invalido) == 0:
-            teste.argumentos_validator += self._gerar_argumentos_validator(teste.conteudo['context'], 'igs', 'ig')
-            teste.argumentos_validator += self._gerar_argumentos_validator(teste.conteudo['context'], 'profiles', 'profile')
-            teste.argumentos_validator += self._gerar_argumentos_validator(teste.conteudo['context'], 'resources', 'ig')
+            contexto = teste.conteudo['context']
+            teste.argumentos_validator += self._gerar_argumentos_validator(contexto, 'igs', 'ig')
+            teste.argumentos_validator += self._gerar_argumentos_validator(contexto, 'profiles', 'profile')
+            teste.argumentos_validator += self._gerar_argumentos_recursos(contexto)
         
         return teste
 
 
-    def processar_testes(self, dados: dict, arquivo_origem: Path, path_schema: Path,  justificativa_teste_invalido: str = None) -> list[Teste]:
+    def processar_testes(self, dados: dict, arquivo_origem: Path, path_schema: Path,  justificativa_teste_invalido: str = None, schema_validado: bool = False) -> Iterator[Teste]:
         """
         Processa um dicionário que pode ser uma suite ou um teste único,
-        retornando uma lista de objetos Teste.
+        entregando os objetos Teste um por vez (suites grandes têm 'tests' lido sob demanda).
 
         Args:
             dados (dict): Dicionário com dados da suite ou teste único
             arquivo_origem (Path): Caminho do arquivo de origem
+            path_schema (Path): Schema dos arquivos de teste
+            justificativa_teste_invalido (str): Motivo de o arquivo não poder ser lido (opcional)
+            schema_validado (bool): Os dados já foram validados pelo schema (na leitura ou pelo cache de testes)
 
-        Returns:
-            list[Teste]: Lista com um ou mais objetos Teste
+        Yields:
+            Teste: Um ou mais objetos Teste
         """
 
         # Criar teste já errado
         if justificativa_teste_invalido:
-            temp_teste = Teste(arquivo_origem, dados, "Invalido", justificativa_teste_invalido)
-            return [temp_teste]
+            yield Teste(arquivo_origem, dados, "Invalido", justificativa_teste_invalido)
+            return
 
         # Não é => Fazer validação com o schema
         teste_cru = Teste(arquivo_origem, dados)
-        teste_cru.validar_schema(path_schema)
+        if schema_validado:
+            teste_cru.estado_atual = "Suite" if isinstance(dados, dict) and 'suite_name' in dados else "Válido"
+        elif not teste_cru.validar_schema(path_schema):
+            logger.info(f"Teste {arquivo_origem} não segue o schema: {teste_cru.justificativa_teste_invalido}")
+            yield teste_cru
+            return
         
         # Verificar se é uma suite
         if teste_cru.estado_atual == "Suite":
-            testes = []
+            numero_teste = 0
             # É uma suite - processar cada teste
-            for teste_data in dados['tests']:
-                temp_teste = self._criar_teste(teste_data, arquivo_origem)
-                # Tornar enderecos unicos
-                temp_teste.path_arquivo_teste = Path(str(temp_teste.path_arquivo_teste) + str(len(testes)+1))
-                testes.append(temp_teste)
-            return testes
+            try:
+                for teste_data in dados['tests']:
+                    numero_teste += 1
+                    temp_teste = self._criar_teste(teste_data, arquivo_origem)
+                    # Tornar enderecos unicos
+                    temp_teste.path_arquivo_teste = Path(str(temp_teste.path_arquivo_teste) + str(numero_teste))
+                    yield temp_teste
+            except yaml.YAMLError as e:
+                # Suite lida em streaming com erro após os testes já entregues
+                logger.warning(f"Suite {arquivo_origem} interrompida no teste {numero_teste + 1}: {e}")
+                yield Teste(Path(str(arquivo_origem) + str(numero_teste + 1)), dados, "Invalido", f"YAML inválido: {e}")
         else:
             # É um teste único
-            return [self._criar_teste(dados, arquivo_origem)]
\ No newline at end of file
+            yield self._criar_teste(dados, arquivo_origem)
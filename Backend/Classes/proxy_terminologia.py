@@ -0,0 +1,301 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import threading
+import requests
+import hashlib
+import logging
+import time
+import json
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyTerminologia:
+    """
+    Proxy HTTP local, com cache em disco, entre o validator_cli e a rede: servidor de
+    terminologia ($validate-code, $expand, ...) e registro de pacotes FHIR.
+
+    As respostas são reutilizadas enquanto estiverem dentro da validade (TTL); se o servidor
+    estiver inacessível, uma resposta vencida é usada. No modo replay nenhuma requisição sai
+    da máquina e apenas as respostas já gravadas são servidas
+    """
+
+    # Constantes
+    PASTA_CACHE = "cache_terminologia"
+    PREFIXO_TERMINOLOGIA = "/tx"
+    PREFIXO_PACOTES = "/pacotes"
+    SERVIDOR_TERMINOLOGIA_PADRAO = "http://tx.fhir.org"
+    SERVIDOR_PACOTES_PADRAO = "https://packages.fhir.org"
+    # Cabeçalhos que mudam o conteúdo da resposta (fazem parte da chave do cache)
+    CABECALHOS_CHAVE = ("Accept", "Content-Type", "Accept-Language")
+    CABECALHOS_RESPOSTA = ("Content-Type", "Content-Disposition", "ETag", "Last-Modified")
+
+    # Construtor
+    def __init__(self, path_arquivos: Path, servidor_terminologia: str, validade_horas: float, modo_replay: bool = False, tempo_timeout: int = 60, servidor_pacotes: str = SERVIDOR_PACOTES_PADRAO):
+        """
+        Inicializa o proxy (ainda sem escutar conexões, ver iniciar())
+
+        Args:
+            path_arquivos (Path): Pasta de arquivos do projeto (onde o cache é guardado)
+            servidor_terminologia (str): URL do servidor de terminologia real (ex: http://tx.fhir.org)
+            validade_horas (float): Tempo, em horas, em que uma resposta é reutilizada sem consultar o servidor
+            modo_replay (bool): Serve apenas respostas gravadas, sem acesso à rede
+            tempo_timeout (int): Tempo máximo de cada requisição ao servidor real (segundos)
+            servidor_pacotes (str): URL do registro de pacotes FHIR real
+        """
+        self.pasta_cache = path_arquivos / self.PASTA_CACHE
+        self.pasta_cache.mkdir(parents=True, exist_ok=True)
+        self.servidores = {
+            self.PREFIXO_TERMINOLOGIA: (servidor_terminologia or self.SERVIDOR_TERMINOLOGIA_PADRAO).rstrip("/"),
+            self.PREFIXO_PACOTES: servidor_pacotes.rstrip("/"),
+        }
+        self.validade_segundos = max(0, validade_horas) * 3600
+        self.modo_replay = modo_replay
+        self.tempo_timeout = tempo_timeout
+        self.endereco = None
+        self.requisicoes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.respostas_vencidas = 0
+        self.ausentes_replay = 0
+        self.erros = 0
+        self._servidor = None
+        self._lock = threading.Lock()
+        self._sessoes = threading.local()
+
+
+    def iniciar(self) -> str:
+        """
+        Começa a escutar em uma porta livre de 127.0.0.1
+
+        Returns:
+            str: Endereço base do proxy
+        """
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ManipuladorProxy)
+        self._servidor.daemon_threads = True
+        self._servidor.proxy = self
+        self.endereco = f"http://127.0.0.1:{self._servidor.server_address[1]}"
+        self._escrever_configuracao_fhir()
+        threading.Thread(target=self._servidor.serve_forever, name="fut-proxy-terminologia", daemon=True).start()
+        logger.info(f"Proxy de terminologia em {self.endereco} ({'replay' if self.modo_replay else 'cache'})")
+        return self.endereco
+
+
+    def _caminho_configuracao_fhir(self) -> Path:
+        """Arquivo fhir-settings usado pelo validator para encontrar o registro de pacotes (um por processo, pois a porta varia)"""
+        return self.pasta_cache / f"fhir-settings.{os.getpid()}.json"
+
+
+    def _escrever_configuracao_fhir(self):
+        """Aponta o registro de pacotes do validator para o proxy"""
+        configuracao = {
+            'ignoreDefaultPackageServers': True,
+            'servers': [{
+                'url': self.endereco + self.PREFIXO_PACOTES,
+                'type': "npm-package",
+                'authenticationType': "none",
+            }],
+        }
+        self._caminho_configuracao_fhir().write_text(json.dumps(configuracao, indent=2), encoding="utf-8")
+
+
+    def obter_argumentos_validator(self) -> list[str]:
+        """
+        Argumentos do validator_cli que direcionam terminologia e pacotes ao proxy
+
+        Returns:
+            list[str]: Argumentos -tx e -fhir-settings (vazio se o proxy não foi iniciado)
+        """
+        if self.endereco is None:
+            return []
+        return ["-tx", self.endereco + self.PREFIXO_TERMINOLOGIA, "-fhir-settings", str(self._caminho_configuracao_fhir())]
+
+
+    def encerrar(self):
+        """Para de aceitar conexões"""
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+            self._caminho_configuracao_fhir().unlink(missing_ok=True)
+
+
+    def _calcular_chave(self, metodo: str, caminho: str, cabecalhos, corpo: bytes) -> str:
+        """Chave da resposta: método, URL, cabeçalhos relevantes e corpo da requisição"""
+        hash_chave = hashlib.sha256()
+        for componente in (metodo, caminho, *(cabecalhos.get(nome, "") for nome in self.CABECALHOS_CHAVE)):
+            hash_chave.update(componente.encode("utf-8") + b"\0")
+        hash_chave.update(corpo)
+        return hash_chave.hexdigest()
+
+
+    def _caminho_entrada(self, chave: str) -> Path:
+        """Caminho da resposta gravada (dividido por prefixo para evitar diretórios enormes)"""
+        return self.pasta_cache / chave[:2] / f"{chave}.bin"
+
+
+    def _ler_entrada(self, chave: str) -> tuple[dict, bytes]|None:
+        """
+        Lê uma resposta gravada: uma linha JSON com os metadados seguida do corpo
+
+        Returns:
+            tuple[dict, bytes]|None: Metadados e corpo, ou None se não existir/estiver corrompida
+        """
+        try:
+            dados = self._caminho_entrada(chave).read_bytes()
+            metadados, corpo = dados.split(b"\n", 1)
+            return json.loads(metadados), corpo
+        except (OSError, ValueError):
+            return None
+
+
+    def _gravar_entrada(self, chave: str, status: int, cabecalhos: dict, corpo: bytes):
+        """Grava uma resposta no cache (escrita atômica)"""
+        caminho = self._caminho_entrada(chave)
+        caminho_temporario = caminho.with_name(f"{chave}.{os.getpid()}.{threading.get_ident()}.tmp")
+        metadados = {'status': status, 'cabecalhos': cabecalhos, 'gravado_em': time.time()}
+        try:
+            caminho.parent.mkdir(exist_ok=True)
+            caminho_temporario.write_bytes(json.dumps(metadados).encode("utf-8") + b"\n" + corpo)
+            os.replace(caminho_temporario, caminho)
+        except OSError as e:
+            caminho_temporario.unlink(missing_ok=True)
+            logger.warning(f"Não foi possível gravar a resposta no cache de terminologia: {e}")
+
+
+    def _sessao(self) -> requests.Session:
+        """Sessão HTTP (conexões reaproveitadas) da thread atual"""
+        if not hasattr(self._sessoes, 'sessao'):
+            self._sessoes.sessao = requests.Session()
+        return self._sessoes.sessao
+
+
+    def _contar(self, nome_contador: str):
+        """Incrementa um contador de estatísticas"""
+        with self._lock:
+            setattr(self, nome_contador, getattr(self, nome_contador) + 1)
+
+
+    def processar(self, metodo: str, caminho: str, cabecalhos, corpo: bytes) -> tuple[int, dict, bytes]:
+        """
+        Responde uma requisição do validator, pelo cache ou pelo servidor real
+
+        Args:
+            metodo (str): Método HTTP
+            caminho (str): Caminho requisitado ao proxy (com a query)
+            cabecalhos: Cabeçalhos da requisição
+            corpo (bytes): Corpo da requisição
+
+        Returns:
+            tuple[int, dict, bytes]: Status, cabeçalhos e corpo da resposta
+        """
+        prefixo = next((prefixo for prefixo in self.servidores if caminho == prefixo or caminho.startswith(prefixo + "/") or caminho.startswith(prefixo + "?")), None)
+        if prefixo is None:
+            return 404, {'Content-Type': "text/plain"}, b"Caminho desconhecido"
+        self._contar('requisicoes')
+        url = self.servidores[prefixo] + caminho[len(prefixo):]
+        chave = self._calcular_chave(metodo, url, cabecalhos, corpo)
+        entrada = self._ler_entrada(chave)
+
+        if entrada is not None and (self.modo_replay or time.time() - entrada[0].get('gravado_em', 0) < self.validade_segundos):
+            self._contar('acertos')
+            return self._montar_resposta(prefixo, entrada[0]['status'], entrada[0]['cabecalhos'], entrada[1])
+
+        if self.modo_replay:
+            self._contar('ausentes_replay')
+            logger.info(f"Modo replay: resposta não gravada para {metodo} {url}")
+            return 504, {'Content-Type': "application/fhir+json"}, self._operation_outcome(f"Resposta não gravada no cache de terminologia (modo replay): {metodo} {url}")
+
+        self._contar('falhas')
+        try:
+            resposta = self._sessao().request(
+                metodo, url, data=corpo or None, timeout=self.tempo_timeout,
+                headers={nome: cabecalhos[nome] for nome in (*self.CABECALHOS_CHAVE, "User-Agent") if cabecalhos.get(nome)},
+            )
+        except requests.exceptions.RequestException as e:
+            if entrada is not None:
+                self._contar('respostas_vencidas')
+                logger.info(f"Servidor inacessível, usando resposta vencida do cache: {e}")
+                return self._montar_resposta(prefixo, entrada[0]['status'], entrada[0]['cabecalhos'], entrada[1])
+            self._contar('erros')
+            return 502, {'Content-Type': "application/fhir+json"}, self._operation_outcome(f"Erro ao acessar {url}: {e}")
+
+        cabecalhos_resposta = {nome: resposta.headers[nome] for nome in self.CABECALHOS_RESPOSTA if nome in resposta.headers}
+        if resposta.status_code == 200:
+            self._gravar_entrada(chave, resposta.status_code, cabecalhos_resposta, resposta.content)
+        return self._montar_resposta(prefixo, resposta.status_code, cabecalhos_resposta, resposta.content)
+
+
+    def _montar_resposta(self, prefixo: str, status: int, cabecalhos: dict, corpo: bytes) -> tuple[int, dict, bytes]:
+        """
+        Ajusta a resposta do registro de pacotes: URLs absolutas do registro (tarballs)
+        passam a apontar para o proxy. Feito na entrega, pois a porta muda a cada execução
+        """
+        if prefixo == self.PREFIXO_PACOTES and "json" in cabecalhos.get('Content-Type', ""):
+            corpo = corpo.replace(self.servidores[prefixo].encode("utf-8"), (self.endereco + prefixo).encode("utf-8"))
+        return status, cabecalhos, corpo
+
+
+    @staticmethod
+    def _operation_outcome(mensagem: str) -> bytes:
+        """OperationOutcome de erro devolvido ao validator"""
+        return json.dumps({
+            'resourceType': "OperationOutcome",
+            'issue': [{'severity': "error", 'code': "exception", 'diagnostics': mensagem}],
+        }).encode("utf-8")
+
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna as estatísticas de uso do proxy na execução
+
+        Returns:
+            dict: Requisições, acertos, falhas, taxa de acertos, respostas vencidas usadas, ausentes no replay e erros
+        """
+        with self._lock:
+            return {
+                'requisicoes': self.requisicoes,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acertos': round(self.acertos / self.requisicoes, 4) if self.requisicoes else 0.0,
+                'respostas_vencidas': self.respostas_vencidas,
+                'ausentes_replay': self.ausentes_replay,
+                'erros': self.erros,
+                'modo_replay': self.modo_replay,
+            }
+
+
+class _ManipuladorProxy(BaseHTTPRequestHandler):
+    """Recebe as requisições HTTP do validator e as repassa ao ProxyTerminologia"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _ler_corpo(self) -> bytes:
+        """Lê o corpo da requisição (Content-Length ou chunked)"""
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            partes = []
+            while True:
+                tamanho = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if tamanho == 0:
+                    self.rfile.readline()
+                    return b"".join(partes)
+                partes.append(self.rfile.read(tamanho))
+                self.rfile.readline()
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(tamanho) if tamanho else b""
+
+    def _tratar(self):
+        status, cabecalhos, corpo = self.server.proxy.processar(self.command, self.path, self.headers, self._ler_corpo())
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(corpo)
+
+    do_GET = do_POST = do_HEAD = _tratar
+
+    def log_message(self, formato, *args):
+        logger.debug(f"Proxy de terminologia: {formato % args}")
@@ -0,0 +1,290 @@
+from Backend.Classes.arquivo_downloader import ArquivoDownloader
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import threading
+import requests
+import tarfile
+import logging
+import shutil
+import json
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedorPacotes:
+    """
+    Baixa os pacotes FHIR (IGs) usados pelos testes e todas as suas dependências para o
+    cache de pacotes do validator_cli (~/.fhir/packages), antes da validação dos testes
+    que os usam. Cada pacote é baixado uma única vez, em paralelo, e pacotes inexistentes
+    no registro são identificados antes de iniciar o validator
+    """
+
+    # Constantes
+    PASTA_PACOTES_PADRAO = Path.home() / ".fhir" / "packages"
+    SERVIDOR_PACOTES_PADRAO = "https://packages.fhir.org"
+    VERSAO_CACHE_PACOTES = 3  # versão do layout do cache esperada pelo validator (packages.ini)
+    VERSOES_IGNORADAS = ("current", "dev")  # builds de CI, resolvidos pelo próprio validator
+    PADRAO_PACOTE = re.compile(r"[A-Za-z][A-Za-z0-9\-_]*(\.[A-Za-z0-9\-_]+)+(#[A-Za-z0-9.\-_+]+)?")
+    EXTENSOES_ARQUIVO = (".tgz", ".gz", ".zip", ".json", ".xml", ".jar")  # IGs locais, não pacotes do registro
+
+    # Construtor
+    def __init__(self, servidor_pacotes: str = SERVIDOR_PACOTES_PADRAO, pasta_pacotes: Path = None, num_threads: int = 4, tempo_timeout: int = 60, modo_offline: bool = False, downloader: ArquivoDownloader = None):
+        """
+        Inicializa o resolvedor
+
+        Args:
+            servidor_pacotes (str): URL do registro de pacotes FHIR
+            pasta_pacotes (Path): Cache de pacotes do validator (padrão: ~/.fhir/packages)
+            num_threads (int): Downloads simultâneos
+            tempo_timeout (int): Tempo máximo de cada requisição ao registro (segundos)
+            modo_offline (bool): Apenas verifica o cache, sem acesso à rede
+            downloader (ArquivoDownloader): Downloader dos pacotes (opcional, ex: com espelhos configurados)
+        """
+        self.servidor_pacotes = (servidor_pacotes or self.SERVIDOR_PACOTES_PADRAO).rstrip("/")
+        self.pasta_pacotes = pasta_pacotes or self.PASTA_PACOTES_PADRAO
+        self.num_threads = max(1, num_threads)
+        self.tempo_timeout = tempo_timeout
+        self.modo_offline = modo_offline
+        self.downloader = downloader or ArquivoDownloader(tempo_timeout)
+        self._sessoes = threading.local()
+        self._locks_pacotes = {}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def coletar_igs(cls, lista_testes: list) -> dict[str, list]:
+        """
+        Reúne os pacotes declarados em context.igs dos testes. Entradas que são
+        arquivos/pastas locais ou URLs são ignoradas
+
+        Args:
+            lista_testes (list[Teste]): Testes da execução
+
+        Returns:
+            dict[str, list]: Referência do pacote ("id#versão" ou "id") => testes que o usam
+        """
+        igs_testes = {}
+        for teste in lista_testes:
+            if teste.justificativa_teste_invalido or not isinstance(teste.conteudo, dict):
+                continue
+            for ig in (teste.conteudo.get('context') or {}).get('igs') or []:
+                ig = str(ig).strip()
+                if cls.PADRAO_PACOTE.fullmatch(ig) and not ig.lower().endswith(cls.EXTENSOES_ARQUIVO) and not Path(ig).exists():
+                    igs_testes.setdefault(ig, []).append(teste)
+        return igs_testes
+
+
+    @staticmethod
+    def _separar_referencia(referencia: str) -> tuple[str, str|None]:
+        """Separa "id#versão" em (id, versão)"""
+        id_pacote, _, versao = referencia.partition("#")
+        return id_pacote, (versao or None)
+
+
+    def _pasta_pacote(self, id_pacote: str, versao: str) -> Path:
+        """Pasta do pacote no cache do validator"""
+        return self.pasta_pacotes / f"{id_pacote}#{versao}"
+
+
+    def _versoes_em_cache(self, id_pacote: str) -> dict:
+        """
+        Versões de um pacote já presentes no cache, no formato do manifesto do registro
+
+        Returns:
+            dict: Manifesto com as versões instaladas (usado por _escolher_versao)
+        """
+        versoes = {}
+        try:
+            with os.scandir(self.pasta_pacotes) as entradas:
+                for entrada in entradas:
+                    id_entrada, separador, versao = entrada.name.partition("#")
+                    if separador and id_entrada == id_pacote and versao and (Path(entrada.path) / "package" / "package.json").exists():
+                        versoes[versao] = {}
+        except OSError:
+            pass
+        return {'versions': versoes}
+
+
+    def _sessao(self) -> requests.Session:
+        """Sessão HTTP da thread atual"""
+        if not hasattr(self._sessoes, 'sessao'):
+            self._sessoes.sessao = requests.Session()
+        return self._sessoes.sessao
+
+
+    def _obter_manifesto(self, id_pacote: str) -> dict|None:
+        """
+        Busca no registro a lista de versões de um pacote
+
+        Returns:
+            dict|None: Manifesto do pacote ou None se ele não existir no registro
+
+        Raises:
+            requests.exceptions.RequestException: Erros de acesso ao registro
+        """
+        resposta = self._sessao().get(f"{self.servidor_pacotes}/{id_pacote}", timeout=self.tempo_timeout, headers={'Accept': "application/json"})
+        if resposta.status_code == 404:
+            return None
+        resposta.raise_for_status()
+        return resposta.json()
+
+
+    @staticmethod
+    def _chave_versao(versao: str) -> tuple:
+        """Chave de ordenação de versões (partes numéricas comparadas como números)"""
+        return tuple((0, int(parte), "") if parte.isdigit() else (1, 0, parte) for parte in re.split(r"[.\-]", versao))
+
+
+    def _escolher_versao(self, manifesto: dict, versao: str|None) -> str|None:
+        """
+        Resolve a versão pedida: exata, com curinga (ex: 4.0.x) ou a mais recente se omitida
+
+        Returns:
+            str|None: Versão existente no registro ou None
+        """
+        versoes = list((manifesto.get('versions') or {}).keys())
+        if not versao or versao == "latest":
+            return (manifesto.get('dist-tags') or {}).get('latest') or max(versoes, key=self._chave_versao, default=None)
+        if versao in versoes:
+            return versao
+        if "x" in versao.split("."):
+            padrao = re.compile(re.escape(versao).replace(r"x", r"[^.]+") + "$")
+            compativeis = [candidata for candidata in versoes if padrao.match(candidata)]
+            return max(compativeis, key=self._chave_versao, default=None)
+        return None
+
+
+    def _ler_dependencias(self, pasta_pacote: Path) -> dict:
+        """Dependências declaradas no package.json de um pacote do cache"""
+        try:
+            with open(pasta_pacote / "package" / "package.json", "r", encoding="utf-8") as arquivo_pacote:
+                return json.load(arquivo_pacote).get('dependencies') or {}
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+
+    def _garantir_cache(self):
+        """Cria a pasta do cache com o packages.ini esperado pelo validator (evita que ele limpe o cache)"""
+        self.pasta_pacotes.mkdir(parents=True, exist_ok=True)
+        arquivo_ini = self.pasta_pacotes / "packages.ini"
+        if not arquivo_ini.exists():
+            arquivo_ini.write_text(f"[cache]\nversion = {self.VERSAO_CACHE_PACOTES}\n", encoding="utf-8")
+
+
+    def _instalar(self, id_pacote: str, versao: str, url_tarball: str):
+        """
+        Baixa e extrai um pacote para o cache. A extração é feita numa pasta temporária e
+        publicada com um rename, de modo que o validator nunca vê um pacote incompleto
+
+        Raises:
+            Exception: Erros de download ou extração
+        """
+        destino = self._pasta_pacote(id_pacote, versao)
+        sufixo_temporario = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        caminho_tarball = self.pasta_pacotes / f"{id_pacote}#{versao}.tgz{sufixo_temporario}"
+        pasta_temporaria = self.pasta_pacotes / f"{id_pacote}#{versao}{sufixo_temporario}"
+        try:
+            self.downloader.baixar_arquivo(url_tarball, caminho_tarball)
+            with tarfile.open(caminho_tarball, "r:gz") as tar:
+                if hasattr(tarfile, "data_filter"):
+                    tar.extractall(pasta_temporaria, filter="data")  # Impede caminhos fora da pasta
+                else:
+                    tar.extractall(pasta_temporaria)
+            if not (pasta_temporaria / "package" / "package.json").exists():
+                raise ValueError(f"Pacote {id_pacote}#{versao} sem package/package.json")
+            try:
+                os.rename(pasta_temporaria, destino)
+            except OSError:
+                if not destino.exists():  # Se existir, outro processo instalou o mesmo pacote
+                    raise
+        finally:
+            caminho_tarball.unlink(missing_ok=True)
+            shutil.rmtree(pasta_temporaria, ignore_errors=True)
+
+
+    def _resolver_pacote(self, referencia: str) -> tuple[str, str, str|None, dict]:
+        """
+        Garante que um pacote esteja no cache
+
+        Args:
+            referencia (str): "id#versão" ou "id"
+
+        Returns:
+            tuple: (referência, situação, referência resolvida ou motivo, dependências)
+                   situação é 'em_cache', 'instalado', 'ignorado', 'ausente' ou 'erro'
+        """
+        id_pacote, versao = self._separar_referencia(referencia)
+        if versao in self.VERSOES_IGNORADAS:
+            return referencia, 'ignorado', referencia, {}
+        if versao and "x" not in versao.split(".") and self._pasta_pacote(id_pacote, versao).exists():
+            return referencia, 'em_cache', referencia, self._ler_dependencias(self._pasta_pacote(id_pacote, versao))
+        if self.modo_offline:
+            # Sem versão ou com curinga: usa a versão compatível mais recente já em cache
+            versao_em_cache = self._escolher_versao(self._versoes_em_cache(id_pacote), versao)
+            if versao_em_cache is not None:
+                return referencia, 'em_cache', f"{id_pacote}#{versao_em_cache}", self._ler_dependencias(self._pasta_pacote(id_pacote, versao_em_cache))
+            return referencia, 'ausente', "não está no cache de pacotes e o modo offline está ativo", {}
+
+        try:
+            manifesto = self._obter_manifesto(id_pacote)
+            if manifesto is None:
+                return referencia, 'ausente', "pacote não encontrado no registro", {}
+            versao_resolvida = self._escolher_versao(manifesto, versao)
+            if versao_resolvida is None:
+                return referencia, 'ausente', f"versão {versao} não encontrada no registro", {}
+            pasta_pacote = self._pasta_pacote(id_pacote, versao_resolvida)
+            # Referências diferentes (ex: "id" e "id#1.0.0") podem resolver para a mesma versão
+            with self._lock:
+                lock_pacote = self._locks_pacotes.setdefault(pasta_pacote.name, threading.Lock())
+            with lock_pacote:
+                if pasta_pacote.exists():
+                    return referencia, 'em_cache', f"{id_pacote}#{versao_resolvida}", self._ler_dependencias(pasta_pacote)
+
+                dados_versao = manifesto['versions'][versao_resolvida] or {}
+                url_tarball = (dados_versao.get('dist') or {}).get('tarball') or f"{self.servidor_pacotes}/{id_pacote}/{versao_resolvida}"
+                logger.info(f"Baixando o pacote {id_pacote}#{versao_resolvida}")
+                self._instalar(id_pacote, versao_resolvida, url_tarball)
+            return referencia, 'instalado', f"{id_pacote}#{versao_resolvida}", self._ler_dependencias(pasta_pacote)
+        except Exception as e:
+            logger.warning(f"Erro ao obter o pacote {referencia}: {e}")
+            return referencia, 'erro', str(e), {}
+
+
+    def resolver(self, referencias: list[str]) -> dict:
+        """
+        Garante que os pacotes e todo o seu fecho de dependências estejam no cache.
+        As dependências são resolvidas em ondas; cada onda é baixada em paralelo
+
+        Args:
+            referencias (list[str]): Pacotes no formato "id#versão" ou "id"
+
+        Returns:
+            dict: 'em_cache', 'instalados', 'ignorados' (listas), 'ausentes' e 'erros' (referência => motivo)
+        """
+        resultado = {'em_cache': [], 'instalados': [], 'ignorados': [], 'ausentes': {}, 'erros': {}}
+        if not referencias:
+            return resultado
+        self._garantir_cache()
+
+        visitados = set()
+        pendentes = sorted(set(referencias))
+        with ThreadPoolExecutor(max_workers=self.num_threads, thread_name_prefix="fut-pacotes") as executor:
+            while pendentes:
+                visitados.update(pendentes)
+                proximos = set()
+                for referencia, situacao, detalhe, dependencias in executor.map(self._resolver_pacote, pendentes):
+                    if situacao == 'em_cache':
+                        resultado['em_cache'].append(detalhe)
+                    elif situacao == 'instalado':
+                        resultado['instalados'].append(detalhe)
+                    elif situacao == 'ignorado':
+                        resultado['ignorados'].append(detalhe)
+                    elif situacao == 'ausente':
+                        resultado['ausentes'][referencia] = detalhe
+                    else:
+                        resultado['erros'][referencia] = detalhe
+                    proximos.update(f"{id_dependencia}#{versao}" for id_dependencia, versao in dependencias.items())
+                pendentes = sorted(proximos - visitados)
+        return resultado
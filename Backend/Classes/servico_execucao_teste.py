@@ -1,17 +1,41 @@
 from Backend.Classes.gerenciador_arquivo_teste import GerenciadorArquivoTeste
 from Backend.Classes.gerenciador_validator import GerenciadorValidator
 from Backend.Classes.gerenciador_java import GerenciadorJava
+from Backend.Classes.arquivo_downloader import ArquivoDownloader
 from Backend.Classes.preparador_teste import PreparadorTeste
+from Backend.Classes.compilador_recursos import CompiladorRecursos
+from Backend.Classes.controlador_admissao import ControladorAdmissao
+from Backend.Classes.detector_recursos import DetectorRecursos
+from Backend.Classes.configurador_jvm import ConfiguradorJvm
+from Backend.Classes.cache_resultado import CacheResultado
+from Backend.Classes.cache_testes import CacheTestes
+from Backend.Classes.backend_cache_remoto import BackendCacheRemoto
+from Backend.Classes.proxy_terminologia import ProxyTerminologia
+from Backend.Classes.resolvedor_pacotes import ResolvedorPacotes
+from Backend.Classes.estagio_pacotes import EstagioPacotes
+from Backend.Classes.escalonador_contexto import EscalonadorContexto
+from Backend.Classes.plano_execucao import PlanoExecucao
+from Backend.Classes.metricas_execucao import MetricasExecucao
+from Backend.Classes.pool_validator import PoolValidator
+from Backend.Classes.executor_processos import ExecutorProcessos
 from Backend.Classes.gestor_caminho import GestorCaminho
 from Backend.Classes.teste import Teste
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator
 from pathlib import Path
+import threading
 import logging
+import queue
+import json
 
 logger = logging.getLogger(__name__)
 
 class ServicoExecucaoTeste:
     """Responsável por executar os testes"""
+
+    # Constantes
+    JANELA_POR_TRABALHADOR = 4  # testes em andamento (não entregues) por trabalhador
     
     # Construtor
     def __init__(self, gestor_caminho: GestorCaminho):
@@ -26,9 +50,179 @@ class ServicoExecucaoTeste:
             bool: True: Se o validator está atualizado é valido e está atualizado
                   False: Se o validator é invalido ou não foi possível atualizá-lo
         """
-        gerenciador_validator = GerenciadorValidator(self.gestor_caminho.return_path('validator'))
-        tempo_request_timeout = int(self.gestor_caminho.controlador_configuracao.obter_configuracao_segura('requests_timeout'))
-        return gerenciador_validator.atualizar_validator_cli_seguro(tempo_request_timeout)
+        path_validator = self.gestor_caminho.return_path('validator')
+        cache_ferramentas = self.gestor_caminho.cache_ferramentas
+        # Validators customizados (fora do cache de ferramentas) são atualizados no próprio lugar
+        if not path_validator.is_relative_to(cache_ferramentas.pasta_validator):
+            cache_ferramentas = None
+        controlador_configuracao = self.gestor_caminho.controlador_configuracao
+        gerenciador_validator = GerenciadorValidator(path_validator, cache_ferramentas=cache_ferramentas, sha256_validator=controlador_configuracao.obter_configuracao_segura('sha256_validator'))
+        tempo_request_timeout = int(controlador_configuracao.obter_configuracao_segura('requests_timeout'))
+        return gerenciador_validator.atualizar_validator_cli_seguro(
+            tempo_request_timeout,
+            ArquivoDownloader.a_partir_configuracao(controlador_configuracao, GerenciadorValidator.TEMPO_TIMEOUT_DOWNLOAD),
+            intervalo_verificacao_horas=controlador_configuracao.obter_configuracao_segura('intervalo_verificacao_validator_horas'),
+            modo_offline=bool(controlador_configuracao.obter_configuracao_segura('modo_offline')),
+            em_segundo_plano=True,
+        )
+
+
+    def preparar_argumentos_jvm(self, perfil_jvm: str, usar_cds: bool, tempo_timeout: int) -> list[str]:
+        """
+        Prepara os argumentos da JVM do validator (perfil de flags e arquivo CDS)
+
+        Args:
+            perfil_jvm (str): Perfil de flags da JVM
+            usar_cds (bool): Se o arquivo de Class Data Sharing deve ser gerado/usado
+            tempo_timeout (int): Tempo máximo da execução de treino que gera o arquivo CDS
+
+        Returns:
+            list[str]: Argumentos da JVM
+        """
+        configurador_jvm = ConfiguradorJvm(self.gestor_caminho.return_path('arquivos'), self.gestor_caminho.return_path('validator'))
+        arquivo_cds = None
+        if usar_cds:
+            path_java = GerenciadorJava(self.gestor_caminho.return_path('jdk')).obter_java_executavel()
+            arquivo_cds = configurador_jvm.preparar_arquivo_cds(path_java, perfil_jvm, tempo_timeout)
+        return configurador_jvm.obter_argumentos_jvm(perfil_jvm, arquivo_cds)
+
+
+    def criar_cache_resultado(self, tamanho_maximo_mb: int, endereco_remoto: str = "", timeout_remoto_ms: int = 500) -> CacheResultado:
+        """
+        Cria o cache de resultados para a versão atual do validator e do JDK
+
+        Args:
+            tamanho_maximo_mb (int): Tamanho máximo do cache local em MB
+            endereco_remoto (str): URL ou diretório do cache compartilhado (vazio desabilita)
+            timeout_remoto_ms (int): Tempo máximo de cada operação no cache compartilhado
+
+        Returns:
+            CacheResultado: Cache usado pela execução
+        """
+        path_java = GerenciadorJava(self.gestor_caminho.return_path('jdk')).obter_java_executavel()
+        return CacheResultado(
+            self.gestor_caminho.return_path('arquivos'),
+            tamanho_maximo_mb,
+            GerenciadorValidator.verificar_versao_validator(self.gestor_caminho.return_path('validator')),
+            GerenciadorJava.obter_versao_java(path_java),
+            BackendCacheRemoto(endereco_remoto, timeout_remoto_ms) if endereco_remoto else None,
+        )
+
+
+    def prefetch_pacotes(self, lista_testes: list[Teste], servidor_pacotes: str, num_threads: int, modo_offline: bool = False) -> dict:
+        """
+        Baixa, uma única vez e em paralelo, os pacotes (IGs) dos testes e suas dependências.
+        Testes que dependem de um pacote inexistente são marcados como inválidos antes da execução
+
+        Args:
+            lista_testes (list[Teste]): Testes da execução
+            servidor_pacotes (str): URL do registro de pacotes FHIR
+            num_threads (int): Downloads simultâneos
+            modo_offline (bool): Apenas verifica o cache de pacotes, sem acesso à rede
+
+        Returns:
+            dict: Resultado do ResolvedorPacotes.resolver
+        """
+        resolvedor = self._criar_resolvedor_pacotes(servidor_pacotes, num_threads, modo_offline)
+        igs_testes = ResolvedorPacotes.coletar_igs(lista_testes)
+        resultado = resolvedor.resolver(list(igs_testes))
+
+        for referencia, motivo in resultado['ausentes'].items():
+            logger.warning(f"Pacote {referencia} indisponível: {motivo}")
+            for teste in igs_testes.get(referencia, []):
+                self._marcar_pacote_ausente(teste, referencia, motivo)
+        return resultado
+
+
+    def criar_estagio_pacotes(self, testes: Iterable[Teste], servidor_pacotes: str, num_threads: int, modo_offline: bool, limite_testes: int, resultado: dict, informar_ausente: Callable = None) -> EstagioPacotes:
+        """
+        Estágio do pipeline de execução equivalente ao prefetch: os pacotes de cada teste
+        (e suas dependências) são baixados em paralelo a partir da primeira vez em que aparecem,
+        e cada teste segue para a execução assim que os seus pacotes estiverem prontos
+
+        Args:
+            testes (Iterable[Teste]): Testes lidos (gerador)
+            servidor_pacotes (str): URL do registro de pacotes FHIR
+            num_threads (int): Downloads simultâneos
+            modo_offline (bool): Apenas verifica o cache de pacotes, sem acesso à rede
+            limite_testes (int): Testes lidos mantidos em memória à espera dos pacotes ou da execução
+            resultado (dict): Acumula o resultado de ResolvedorPacotes.resolver de todos os pacotes
+            informar_ausente (Callable): Chamado quando um pacote indisponível é identificado (opcional)
+
+        Returns:
+            EstagioPacotes: Estágio que entrega os testes, marcados como inválidos se dependerem de um pacote inexistente
+        """
+        resolvedor = self._criar_resolvedor_pacotes(servidor_pacotes, num_threads, modo_offline)
+        return EstagioPacotes(testes, resolvedor, limite_testes, resultado, self._marcar_pacote_ausente, informar_ausente)
+
+
+    def _criar_resolvedor_pacotes(self, servidor_pacotes: str, num_threads: int, modo_offline: bool) -> ResolvedorPacotes:
+        """Cria o resolvedor de pacotes com o timeout e os espelhos configurados"""
+        controlador_configuracao = self.gestor_caminho.controlador_configuracao
+        tempo_timeout = int(controlador_configuracao.obter_configuracao_segura('requests_timeout'))
+        return ResolvedorPacotes(
+            servidor_pacotes, num_threads=num_threads, tempo_timeout=tempo_timeout, modo_offline=modo_offline,
+            downloader=ArquivoDownloader.a_partir_configuracao(controlador_configuracao, tempo_timeout),
+        )
+
+
+    @staticmethod
+    def _marcar_pacote_ausente(teste: Teste, referencia: str, motivo: str):
+        """Marca um teste como inválido por depender de um pacote indisponível"""
+        if teste.justificativa_teste_invalido:
+            teste.justificativa_teste_invalido += "\n"
+        teste.justificativa_teste_invalido += f"Pacote {referencia} indisponível: {motivo}"
+
+
+    def criar_proxy_terminologia(self, servidor_terminologia: str, validade_horas: float, modo_replay: bool, servidor_pacotes: str = ProxyTerminologia.SERVIDOR_PACOTES_PADRAO) -> ProxyTerminologia:
+        """
+        Cria e inicia o proxy local de terminologia e pacotes
+
+        Args:
+            servidor_terminologia (str): URL do servidor de terminologia real
+            validade_horas (float): Validade, em horas, das respostas em cache
+            modo_replay (bool): Serve apenas respostas gravadas, sem acesso à rede
+            servidor_pacotes (str): URL do registro de pacotes FHIR real
+
+        Returns:
+            ProxyTerminologia: Proxy já iniciado (deve ser encerrado ao final da execução)
+        """
+        tempo_timeout = int(self.gestor_caminho.controlador_configuracao.obter_configuracao_segura('requests_timeout'))
+        proxy = ProxyTerminologia(self.gestor_caminho.return_path('arquivos'), servidor_terminologia, validade_horas, modo_replay, tempo_timeout, servidor_pacotes or ProxyTerminologia.SERVIDOR_PACOTES_PADRAO)
+        proxy.iniciar()
+        return proxy
+
+
+    def compilar_plano(self, list_testes: list[Teste], tamanho_lote: int = 1, argumentos_jvm: list[str] = None, argumentos_validator: list[str] = None) -> PlanoExecucao:
+        """
+        Compila o plano de execução dos testes sem iniciar nenhuma JVM
+
+        Args:
+            list_testes (list[Teste]): Testes preparados
+            tamanho_lote (int): Número máximo de testes de mesmo contexto por execução do validator
+            argumentos_jvm (list[str]): Argumentos da JVM de cada processo do validator (opcional)
+            argumentos_validator (list[str]): Argumentos do validator_cli usados em toda validação (opcional)
+
+        Returns:
+            PlanoExecucao: Plano compilado
+        """
+        gerenciador_validator = GerenciadorValidator(self.gestor_caminho.return_path('validator'), argumentos_jvm or [], argumentos_validator=argumentos_validator)
+        path_java = GerenciadorJava(self.gestor_caminho.return_path('jdk')).obter_java_executavel()
+        return PlanoExecucao.compilar(list_testes, gerenciador_validator, path_java, Path(self.gestor_caminho.return_path('pasta_validator')), tamanho_lote)
+
+
+    def criar_executor_processos(self, max_processos: int, salvar_logs: bool) -> ExecutorProcessos:
+        """
+        Cria o executor asyncio dos processos do validator
+
+        Args:
+            max_processos (int): Número máximo de processos simultâneos
+            salvar_logs (bool): Grava a saída de cada teste em um .log ao lado do seu relatório
+
+        Returns:
+            ExecutorProcessos: Executor iniciado (deve ser encerrado ao final da execução)
+        """
+        return ExecutorProcessos(max_processos, salvar_logs=salvar_logs)
 
 
     def preparar_lista__arquivo_teste(self, args=None) -> list[Path]:
@@ -47,18 +241,43 @@ class ServicoExecucaoTeste:
             args = []
         
         return GerenciadorArquivoTeste().gerar_lista_arquivos_teste(args)
+
+
+    def gerar_arquivos_teste(self, args=None) -> Iterator[Path]:
+        """
+        Versão sob demanda de preparar_lista__arquivo_teste
+
+        Args:
+            args: Argumentos para criar a lista de testes
+
+        Yields:
+            Path: Endereço de cada arquivo de teste encontrado
+        """
+        if not args or not isinstance(args, list):
+            logger.debug("Argumentos inválidos para a execução dos testes, lista vazia.")
+            args = []
+        yield from GerenciadorArquivoTeste().gerar_arquivos_teste(args)
     
 
-    def _executar_teste(self, gerenciador_validator: GerenciadorValidator, teste: Teste, timeout:float, contador:int, path_java: Path):
+    def _executar_teste(self, gerenciador_validator: GerenciadorValidator, teste: Teste, timeout:float, contador:int, path_java: Path, pool_validator: PoolValidator = None):
         try:
-            output_validacao = gerenciador_validator.validar_arquivo_fhir(
-                Path(teste.conteudo['caminho_instancia']), 
-                Path(self.gestor_caminho.return_path('pasta_validator')), 
-                contador,
-                timeout, 
-                path_java,
-                teste.argumentos_validator,
-            )
+            if pool_validator is not None:
+                output_validacao = pool_validator.validar_arquivo_fhir(
+                    Path(teste.conteudo['caminho_instancia']), 
+                    Path(self.gestor_caminho.return_path('pasta_validator')), 
+                    contador,
+                    timeout, 
+                    teste.argumentos_validator,
+                )
+            else:
+                output_validacao = gerenciador_validator.validar_arquivo_fhir(
+                    Path(teste.conteudo['caminho_instancia']), 
+                    Path(self.gestor_caminho.return_path('pasta_validator')), 
+                    contador,
+                    timeout, 
+                    path_java,
+                    teste.argumentos_validator,
+                )
             teste.path_resultado = output_validacao[0]
             teste.tempo_execucao = output_validacao[1]
             teste.estado_atual = "Finalizado"
@@ -71,6 +290,47 @@ class ServicoExecucaoTeste:
             return teste
 
 
+    def _executar_lote(self, gerenciador_validator: GerenciadorValidator, lote: list[tuple[int, Teste]], timeout: float, path_java: Path) -> list[Teste]:
+        """
+        Executa um lote de testes de mesmo contexto com uma única execução do validator_cli.
+        O timeout do lote é o timeout de um teste multiplicado pelo tamanho do lote; se o lote
+        falhar ou exceder o timeout, ele é dividido ao meio e cada metade é executada novamente,
+        isolando o teste problemático sem revalidar individualmente os demais
+
+        Args:
+            gerenciador_validator (GerenciadorValidator): Instância usada para a validação
+            lote (list[tuple[int, Teste]]): Pares (número do teste, Teste) com o mesmo contexto
+            timeout (float): Timeout de cada teste
+            path_java (Path): Caminho para o executável Java
+
+        Returns:
+            list[Teste]: Os testes do lote, com os resultados preenchidos
+        """
+        if len(lote) == 1 or any(teste.justificativa_teste_invalido for _, teste in lote):
+            return [self._executar_teste(gerenciador_validator, teste, timeout, contador, path_java) for contador, teste in lote]
+        try:
+            outputs_validacao = gerenciador_validator.validar_lote_fhir(
+                [Path(teste.conteudo['caminho_instancia']) for _, teste in lote],
+                Path(self.gestor_caminho.return_path('pasta_validator')),
+                [contador for contador, _ in lote],
+                timeout * len(lote),
+                path_java,
+                lote[0][1].argumentos_validator,
+            )
+        except Exception as e:
+            # Timeout ou falha do lote => as metades são executadas separadamente até isolar o teste problemático
+            logger.warning(f"Lote de {len(lote)} testes falhou ({type(e).__name__}), dividindo o lote")
+            meio = len(lote) // 2
+            return (self._executar_lote(gerenciador_validator, lote[:meio], timeout, path_java)
+                    + self._executar_lote(gerenciador_validator, lote[meio:], timeout, path_java))
+
+        for (_, teste), output_validacao in zip(lote, outputs_validacao):
+            teste.path_resultado = output_validacao[0]
+            teste.tempo_execucao = output_validacao[1]
+            teste.estado_atual = "Finalizado"
+        return [teste for _, teste in lote]
+
+
     def preparar_lista_Teste(self, lista_arquivos: list[Path]) -> list[Teste]:
         """
         Retorna uma lista bruta de criada pela leitura dos arquivos de teste (YAML)
@@ -81,73 +341,342 @@ class ServicoExecucaoTeste:
         Returns:
             list[dict]: Uma lista dos testes encontrados nos arquivos de entrada
         """
+        return list(self.gerar_testes(lista_arquivos))
+
+
+    def gerar_testes(self, arquivos: Iterable[Path], estatisticas_leitura: dict = None) -> Iterator[Teste]:
+        """
+        Lê os arquivos de teste (YAML) sob demanda, entregando cada Teste assim que
+        o seu arquivo é lido e validado. Os arquivos são lidos em blocos por um pool
+        de processos (configuração processos_leitura_yaml) e os inalterados desde a
+        execução anterior vêm do cache de testes (configuração usar_cache_testes)
+
+        Args:
+            arquivos (Iterable[Path]): Caminhos dos arquivos YAML (lista ou gerador)
+            estatisticas_leitura (dict): Recebe o número de arquivos lidos e o tempo de leitura (opcional)
+
+        Yields:
+            Teste: Testes encontrados nos arquivos de entrada
+        """
         gerenciador_arquivo_teste = GerenciadorArquivoTeste() # instancia que será usada para lidar com arquivos
-        preparador_teste = PreparadorTeste() # instancia que será usada para preparar todos os testes
+        compilador_recursos = None
+        if self.gestor_caminho.controlador_configuracao.obter_configuracao_segura('compilar_recursos_locais'):
+            compilador_recursos = CompiladorRecursos(self.gestor_caminho.return_path('arquivos'))
+        preparador_teste = PreparadorTeste(compilador_recursos) # instancia que será usada para preparar todos os testes
+        path_schema = self.gestor_caminho.return_path('schema_yaml')
+        num_processos = int(self.gestor_caminho.controlador_configuracao.obter_configuracao_segura('processos_leitura_yaml') or 0)
+        if num_processos <= 0:
+            num_processos = DetectorRecursos().obter_cpus_disponiveis()
+        cache_testes = None
+        if self.gestor_caminho.controlador_configuracao.obter_configuracao_segura('usar_cache_testes'):
+            cache_testes = CacheTestes(self.gestor_caminho.return_path('arquivos'), path_schema)
         try:
-            # ler os arquivos
-            list_conteudo_cru = []
-            for path in lista_arquivos:
-                temp_dict = {}
-                temp_dict['conteudo'], temp_dict['razao_invalidez'] = gerenciador_arquivo_teste.carregar_yaml(path)
-                temp_dict['path_arquivo_teste'] = path
-                list_conteudo_cru.append(temp_dict)
-            # Criar os Testes
-            list_testes = []
-            for teste_parcial in list_conteudo_cru:
-                list_testes.extend(preparador_teste.processar_testes(teste_parcial['conteudo'],teste_parcial['path_arquivo_teste'] ,teste_parcial['razao_invalidez']))
+            for path, conteudo, razao_invalidez in gerenciador_arquivo_teste.carregar_yamls(arquivos, num_processos, estatisticas_leitura, path_schema, cache_testes):
+                yield from preparador_teste.processar_testes(conteudo, path, path_schema, razao_invalidez, schema_validado=True)
         except FileNotFoundError as e:
             logger.warning(f"Arquivo de teste não existe: {e}")
             raise e
-        
-        return list_testes
+        finally:
+            if cache_testes is not None:
+                cache_testes.salvar()
         
         
-    def executar_testes_paralelos(self, list_testes: list[Teste], num_threads: int, timeout: float):
+    def criar_pool_validator(self, num_trabalhadores: int, max_validacoes: int, limite_memoria_mb: int, argumentos_jvm: list[str] = None, argumentos_validator: list[str] = None) -> PoolValidator:
         """
-        Executa os testes em paralelo usando threads
+        Cria um pool de processos do validator_cli reutilizáveis entre testes
+
+        Args:
+            num_trabalhadores (int): Número máximo de processos simultâneos
+            max_validacoes (int): Validações antes de reciclar um processo
+            limite_memoria_mb (int): Memória máxima de um processo antes de reciclá-lo
+            argumentos_jvm (list[str]): Argumentos da JVM de cada processo (opcional)
+            argumentos_validator (list[str]): Argumentos do validator_cli usados em toda validação (opcional)
+
+        Returns:
+            PoolValidator: Pool pronto para uso (deve ser encerrado ao final da execução)
+        """
+        gerenciador_validator = GerenciadorValidator(self.gestor_caminho.return_path('validator'), argumentos_jvm, argumentos_validator=argumentos_validator)
+        gerenciador_java = GerenciadorJava(self.gestor_caminho.return_path('jdk'))
+        return PoolValidator(
+            gerenciador_validator, gerenciador_java.obter_java_executavel(),
+            num_trabalhadores, max_validacoes, limite_memoria_mb
+        )
+
+
+    def executar_testes_paralelos(self, list_testes: Iterable[Teste], num_threads: int, timeout: float, pool_validator: PoolValidator = None, tamanho_lote: int = 1, metricas: MetricasExecucao = None, controlador_admissao: ControladorAdmissao = None, argumentos_jvm: list[str] = None, cache_resultado: CacheResultado = None, argumentos_validator: list[str] = None, executor_processos: ExecutorProcessos = None, saida_em_memoria: bool = False):
+        """
+        Executa os testes em paralelo usando threads.
+        Os testes são distribuídos por afinidade de contexto: testes com os mesmos
+        IGs/perfis/recursos são encaminhados, sempre que possível, ao mesmo trabalhador.
+        Os testes são lidos sob demanda em uma janela limitada (JANELA_POR_TRABALHADOR por
+        trabalhador), de modo que a memória acompanha o número de trabalhadores e não o
+        tamanho da suíte; cada Teste é liberado assim que seu resultado é entregue
         
         Args:
-            lista_arquivos (list): Lista com endereços dos arquivos de teste
+            list_testes (Iterable[Teste]): Testes a serem executados (lista ou gerador)
             num_threads (int): Número máximo de threads
             timeout (float): Timeout para cada teste
+            pool_validator (PoolValidator): Pool de processos do validator reutilizáveis (opcional)
+            tamanho_lote (int): Número máximo de testes de mesmo contexto por execução do validator (1 desabilita)
+            metricas (MetricasExecucao): Onde registrar as métricas do escalonamento (opcional)
+            controlador_admissao (ControladorAdmissao): Limita os processos simultâneos pela memória (opcional)
+            argumentos_jvm (list[str]): Argumentos da JVM de cada processo do validator (opcional)
+            cache_resultado (CacheResultado): Cache dos resultados de testes inalterados (opcional)
+            argumentos_validator (list[str]): Argumentos do validator_cli usados em toda validação, ex: proxy de terminologia (opcional)
+            executor_processos (ExecutorProcessos): Executor asyncio dos processos do validator (opcional)
+            saida_em_memoria (bool): Lê a saída de cada teste uma única vez e a mantém em memória para o relatório;
+                                     o arquivo só é mantido se armazenar_saida_validator estiver ativo
             
         Yields:
             dict: Resultado de cada teste executado
         """
         logger.info("Iniciando a execução dos testes requisitados")
         
-        gerenciador_validator = GerenciadorValidator(self.gestor_caminho.return_path('validator')) # Instancia que será usada para os testes
-        gerenciador_java = GerenciadorJava(self.gestor_caminho.return_path('arquivos')) # Instancia que será usada para encontrar o java baixado
+        gerenciador_validator = GerenciadorValidator(self.gestor_caminho.return_path('validator'), argumentos_jvm or [], argumentos_validator=argumentos_validator, executor_processos=executor_processos) # Instancia que será usada para os testes
+        gerenciador_java = GerenciadorJava(self.gestor_caminho.return_path('jdk')) # Instancia que será usada para encontrar o java baixado
         
         # Executar em paralelo
-        total_testes = len(list_testes)
-        logger.info(f"Total de testes para executar: {total_testes}")
-    
-        with ThreadPoolExecutor(max_workers=num_threads) as executor:
-            # Submeter todos os testes para execução
-            future_to_teste = {
-                executor.submit(self._executar_teste, gerenciador_validator,  teste, timeout, list_testes.index(teste), gerenciador_java.obter_java_executavel()): teste 
-                for teste in list_testes
-            }
+        if hasattr(list_testes, '__len__'):
+            logger.info(f"Total de testes para executar: {len(list_testes)}")
+
+        if tamanho_lote > 1 and pool_validator is not None:
+            logger.info("Pool do validator ativo, execução em lotes desabilitada")
+            tamanho_lote = 1
 
-            # Processar resultados conforme completam
-            for future in as_completed(future_to_teste):
-                teste_original = future_to_teste[future]
+        fila_resultados = queue.Queue()
+        trabalhadores_ativos = max(1, num_threads)
+        remover_saidas = saida_em_memoria and not self.gestor_caminho.controlador_configuracao.obter_configuracao_segura('armazenar_saida_validator', False)
 
+        # Itens do plano gerados sob demanda e distribuídos pelo contexto normalizado
+        # (sem comando: cada teste, lote ou trabalhador do pool monta o seu ao validar)
+        path_java = gerenciador_java.obter_java_executavel()
+        itens_plano = PlanoExecucao.gerar_itens(list_testes, gerenciador_validator, path_java, Path(self.gestor_caminho.return_path('pasta_validator')), detalhar=False)
+        escalonador = EscalonadorContexto()
+        janela = threading.Semaphore(trabalhadores_ativos * max(1, tamanho_lote) * self.JANELA_POR_TRABALHADOR)
+        interrompido = threading.Event()
+        erros_alimentacao = []
+        alimentador = threading.Thread(
+            target=self._alimentar_escalonador, args=(itens_plano, escalonador, janela, interrompido, erros_alimentacao),
+            name="fut-alimentador", daemon=True
+        )
+    
+        try:
+            with ThreadPoolExecutor(max_workers=trabalhadores_ativos) as executor:
                 try:
-                    # Obter resultado do teste
-                    teste_resultado = future.result()
-
-                    # Criar dicionário com resultado para yield
-                    yield {
-                        'caminho_yaml': teste_resultado.path_arquivo_teste,
-                        'yaml_valido': len(teste_resultado.justificativa_teste_invalido) == 0,
-                        'caminho_output': teste_resultado.path_resultado,
-                        'tempo_execucao': teste_resultado.tempo_execucao,
-                        'justificativa_arquivo_invalido': teste_resultado.justificativa_teste_invalido,
-                        'conteudo_dict': teste_resultado.conteudo,
-                    }
+                    for id_trabalhador in range(trabalhadores_ativos):
+                        executor.submit(
+                            self._executar_trabalhador, id_trabalhador, escalonador, fila_resultados,
+                            gerenciador_validator, timeout, path_java, pool_validator, tamanho_lote, controlador_admissao, cache_resultado
+                        )
+                    alimentador.start()
+
+                    # Processar resultados conforme completam
+                    while trabalhadores_ativos:
+                        teste_resultado = fila_resultados.get()
+                        if teste_resultado is None: # Trabalhador finalizado
+                            trabalhadores_ativos -= 1
+                            continue
+                        if saida_em_memoria:
+                            self._carregar_saida_validator(teste_resultado, remover_saidas)
+                        resultado = self._formatar_resultado(teste_resultado)
+                        del teste_resultado  # Liberado assim que o resultado é entregue
+                        yield resultado
+                        janela.release()
+                finally:
+                    # Interrupção: libera o alimentador e os trabalhadores antes de aguardá-los
+                    interrompido.set()
+                    escalonador.cancelar()
+                    if trabalhadores_ativos:
+                        # Execução interrompida (ex: Ctrl+C): os processos em andamento são encerrados antes
+                        # de aguardar os trabalhadores, que de outro modo esperariam cada validação terminar
+                        if pool_validator is not None:
+                            pool_validator.encerrar()
+                        if executor_processos is not None:
+                            executor_processos.encerrar()
+            if erros_alimentacao:
+                raise erros_alimentacao[0]
+        finally:
+            escalonador.cancelar() # Caso a execução seja interrompida
+            estatisticas = escalonador.obter_estatisticas()
+            logger.info(f"Escalonamento por contexto: {estatisticas}")
+            if metricas is not None:
+                metricas.registrar('contextos_distintos', estatisticas['contextos_distintos'])
+                metricas.registrar('trocas_contexto_por_trabalhador', estatisticas['trocas_contexto_por_trabalhador'])
+                if cache_resultado is not None:
+                    metricas.registrar('cache_resultados', cache_resultado.obter_estatisticas())
+
+
+    def _alimentar_escalonador(self, itens_plano: Iterator, escalonador: EscalonadorContexto, janela: threading.Semaphore, interrompido: threading.Event, erros: list):
+        """
+        Adiciona os itens do plano ao escalonador respeitando a janela de testes em andamento
+        (executado em uma thread própria; fecha o escalonador ao terminar)
+
+        Args:
+            itens_plano (Iterator): Itens do plano gerados sob demanda
+            escalonador (EscalonadorContexto): Destino dos itens
+            janela (threading.Semaphore): Vagas de testes em andamento (liberadas na entrega do resultado)
+            interrompido (threading.Event): Sinaliza que a execução foi interrompida
+            erros (list): Onde um erro na geração dos itens é registrado
+        """
+        try:
+            for item in itens_plano:
+                while not janela.acquire(timeout=0.5):
+                    if interrompido.is_set():
+                        return
+                if interrompido.is_set():
+                    return
+                escalonador.adicionar((item.numero, item.teste), item.contexto)
+        except Exception as e:
+            logger.error(f"Erro ao preparar os testes para execução: {e}")
+            erros.append(e)
+        finally:
+            escalonador.fechar()
+
 
+    def _executar_trabalhador(self, id_trabalhador: int, escalonador: EscalonadorContexto, fila_resultados: queue.Queue, gerenciador_validator: GerenciadorValidator, timeout: float, path_java: Path, pool_validator: PoolValidator, tamanho_lote: int, controlador_admissao: ControladorAdmissao = None, cache_resultado: CacheResultado = None):
+        """
+        Executa os testes entregues pelo escalonador até não haver mais trabalho
+
+        Args:
+            id_trabalhador (int): Identificador do trabalhador
+            escalonador (EscalonadorContexto): Fonte dos testes a serem executados
+            fila_resultados (queue.Queue): Onde os testes executados são colocados (None ao finalizar)
+            gerenciador_validator (GerenciadorValidator): Instância usada para a validação
+            timeout (float): Timeout para cada teste
+            path_java (Path): Caminho para o executável Java
+            pool_validator (PoolValidator): Pool de processos do validator (opcional)
+            tamanho_lote (int): Número máximo de testes por execução do validator
+            controlador_admissao (ControladorAdmissao): Limita os processos simultâneos pela memória (opcional)
+            cache_resultado (CacheResultado): Cache dos resultados de testes inalterados (opcional)
+        """
+        try:
+            while True:
+                itens = escalonador.proximo(id_trabalhador, tamanho_lote)
+                if not itens:
+                    break
+                chaves_cache = {}
+                if cache_resultado is not None:
+                    itens = self._consultar_cache(cache_resultado, itens, chaves_cache, fila_resultados)
+                    if not itens:
+                        continue
+                # Testes inválidos não iniciam o validator e dispensam a admissão
+                precisa_validator = controlador_admissao is not None and any(not teste.justificativa_teste_invalido for _, teste in itens)
+                try:
+                    with controlador_admissao.reservar() if precisa_validator else nullcontext():
+                        testes_resultado = self._executar_itens(gerenciador_validator, itens, timeout, path_java, pool_validator, tamanho_lote)
                 except Exception as e:
-                    # Tratar erro na execução do teste
-                    logger.warning(f"Erro ao executar teste {teste_original.conteudo.get('test_id', 'N/A')}: {e}")
\ No newline at end of file
+                    # Tratar erro na execução do teste (o teste ainda é entregue, liberando sua vaga na janela)
+                    testes_resultado = []
+                    for _, teste in itens:
+                        conteudo = teste.conteudo if isinstance(teste.conteudo, dict) else {}
+                        logger.warning(f"Erro ao executar teste {conteudo.get('test_id', 'N/A')}: {e}")
+                        if teste.justificativa_teste_invalido:
+                            teste.justificativa_teste_invalido += "\n"
+                        teste.justificativa_teste_invalido += str(e)
+                        testes_resultado.append(teste)
+                for teste_resultado in testes_resultado:
+                    chave = chaves_cache.get(id(teste_resultado))
+                    if chave and teste_resultado.path_resultado and not teste_resultado.justificativa_teste_invalido:
+                        cache_resultado.armazenar(chave, Path(teste_resultado.path_resultado))
+                    fila_resultados.put(teste_resultado)
+        finally:
+            fila_resultados.put(None)
+
+
+    def _consultar_cache(self, cache_resultado: CacheResultado, itens: list[tuple[int, Teste]], chaves_cache: dict, fila_resultados: queue.Queue) -> list[tuple[int, Teste]]:
+        """
+        Entrega diretamente os testes cujo resultado já está em cache, sem iniciar o validator
+
+        Args:
+            cache_resultado (CacheResultado): Cache dos resultados
+            itens (list[tuple[int, Teste]]): Itens entregues pelo escalonador
+            chaves_cache (dict): Preenchido com a chave de cada teste não encontrado (id(teste) -> chave)
+            fila_resultados (queue.Queue): Onde os testes em cache são colocados
+
+        Returns:
+            list[tuple[int, Teste]]: Itens que ainda precisam ser validados
+        """
+        itens_pendentes = []
+        for contador, teste in itens:
+            if teste.justificativa_teste_invalido:
+                itens_pendentes.append((contador, teste))
+                continue
+            try:
+                arquivo_instancia = Path(teste.conteudo['caminho_instancia']).expanduser()
+                chave = cache_resultado.calcular_chave(arquivo_instancia, teste.argumentos_validator)
+            except (OSError, KeyError, TypeError):
+                # Instância inexistente: o validator gera o erro adequado
+                itens_pendentes.append((contador, teste))
+                continue
+
+            caminho_relatorio = Path(self.gestor_caminho.return_path('pasta_validator')) / GerenciadorValidator.nome_relatorio(arquivo_instancia, contador)
+            if cache_resultado.obter(chave, caminho_relatorio):
+                teste.path_resultado = caminho_relatorio
+                teste.tempo_execucao = 0
+                teste.estado_atual = "Finalizado"
+                fila_resultados.put(teste)
+            else:
+                chaves_cache[id(teste)] = chave
+                itens_pendentes.append((contador, teste))
+        return itens_pendentes
+
+
+    def _executar_itens(self, gerenciador_validator: GerenciadorValidator, itens: list[tuple[int, Teste]], timeout: float, path_java: Path, pool_validator: PoolValidator, tamanho_lote: int) -> list[Teste]:
+        """
+        Executa os itens entregues pelo escalonador (um teste ou um lote)
+
+        Returns:
+            list[Teste]: Testes executados
+        """
+        if tamanho_lote > 1:
+            return self._executar_lote(gerenciador_validator, itens, timeout, path_java)
+        contador, teste = itens[0]
+        return [self._executar_teste(gerenciador_validator, teste, timeout, contador, path_java, pool_validator)]
+
+
+    @staticmethod
+    def _carregar_saida_validator(teste_resultado: Teste, remover_arquivo: bool):
+        """
+        Lê uma única vez a saída do validator de um teste e guarda as issues no próprio Teste,
+        evitando que o relatório abra o arquivo novamente
+
+        Args:
+            teste_resultado (Teste): Teste já executado
+            remover_arquivo (bool): Remove o arquivo após a leitura (saída não deve ser armazenada)
+        """
+        if not teste_resultado.path_resultado or teste_resultado.justificativa_teste_invalido:
+            return
+        caminho_resultado = Path(teste_resultado.path_resultado)
+        try:
+            with open(caminho_resultado, mode="r", encoding="utf8") as arquivo:
+                teste_resultado.resultado_validacao = {'issue': json.load(arquivo).get('issue', [])}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Não foi possível ler a saída do validator {caminho_resultado}: {e}")
+            if remover_arquivo:
+                # Sem o arquivo o relatório não tem como relê-lo: o teste passa a ser inválido
+                caminho_resultado.unlink(missing_ok=True)
+                teste_resultado.justificativa_teste_invalido = f"Saída do validator ilegível: {e}"
+            return
+        if remover_arquivo:
+            caminho_resultado.unlink(missing_ok=True)
+
+
+    def _formatar_resultado(self, teste_resultado: Teste) -> dict:
+        """
+        Converte um Teste executado no dicionário consumido pelo relatório
+
+        Args:
+            teste_resultado (Teste): Teste já executado
+
+        Returns:
+            dict: Resultado do teste no formato de GeradorRelatorios
+        """
+        return {
+            'caminho_yaml': teste_resultado.path_arquivo_teste,
+            'yaml_valido': len(teste_resultado.justificativa_teste_invalido) == 0,
+            'caminho_output': teste_resultado.path_resultado,
+            'tempo_execucao': teste_resultado.tempo_execucao,
+            'justificativa_arquivo_invalido': teste_resultado.justificativa_teste_invalido,
+            'conteudo_dict': teste_resultado.conteudo,
+            'resultado_validacao': teste_resultado.resultado_validacao,
+        }
@@ -1,6 +1,7 @@
 from Backend.Classes.gerador_relatorio import GeradorRelatorios
 import pathlib
 import logging
+import shutil
 
 logger = logging.getLogger(__name__)
 class ServicoRelatorio:
@@ -13,7 +14,7 @@ class ServicoRelatorio:
         pass
     
 
-    def criar_relatorio_completo(self, resultados_validacao: list, versao_relatorio: str, tempo_execucao: float, path_csv: pathlib.Path, path_template_html: pathlib.Path = None):
+    def criar_relatorio_completo(self, resultados_validacao: list, versao_relatorio: str, tempo_execucao: float, path_csv: pathlib.Path, path_template_html: pathlib.Path = None, metricas_execucao: dict = None):
         """
         Cria relatório completo com base nos resultados da validação
         
@@ -21,11 +22,39 @@ class ServicoRelatorio:
             resultados_validacao (list): Lista dos resultados dos testes
             versao_relatorio (str): Tipo do relatório (JSON ou HTML)
             tempo_execucao (float): Tempo total de execução
+            metricas_execucao (dict): Métricas da execução incluídas no relatorio_final (opcional)
+        """
+        gerador_relatorio = GeradorRelatorios(resultados_validacao, metricas_execucao)
+        self.finalizar_relatorio(gerador_relatorio, versao_relatorio, tempo_execucao, path_csv, path_template_html)
+
+
+    def iniciar_relatorio(self) -> GeradorRelatorios:
+        """
+        Cria um relatório incremental: cada resultado é comparado ao ser adicionado
+        (GeradorRelatorios.adicionarCasoDeTeste) e apenas o relatório unitário é mantido
+
+        Returns:
+            GeradorRelatorios: Gerador sem casos de teste, a ser finalizado com finalizar_relatorio
+        """
+        return GeradorRelatorios([])
+
+
+    def finalizar_relatorio(self, gerador_relatorio: GeradorRelatorios, versao_relatorio: str, tempo_execucao: float, path_csv: pathlib.Path, path_template_html: pathlib.Path = None, metricas_execucao: dict = None, pasta_temporaria: pathlib.Path = None):
+        """
+        Escreve o relatório de um gerador (com os casos de teste já fornecidos ou adicionados)
+        
+        Args:
+            gerador_relatorio (GeradorRelatorios): Gerador com os resultados
+            versao_relatorio (str): Tipo do relatório (JSON ou HTML)
+            tempo_execucao (float): Tempo total de execução
+            metricas_execucao (dict): Métricas da execução incluídas no relatorio_final (opcional)
+            pasta_temporaria (pathlib.Path): Pasta temporária das saídas do validator, removida após o relatório (opcional)
         """
         logger.info(f"Iniciando a criação do relatório, relatório selecionado é do tipo {versao_relatorio}")
         
         try:
-            gerador_relatorio = GeradorRelatorios(resultados_validacao)
+            if metricas_execucao is not None:
+                gerador_relatorio.metricas_execucao_ = metricas_execucao
             
             if versao_relatorio == "HTML" and path_template_html.exists():
                 gerador_relatorio.gerarRelatorioHtml(tempo_execucao, path_csv, path_template_html)
@@ -34,4 +63,7 @@ class ServicoRelatorio:
                 
         except Exception as e:
             logger.error(f"Erro ao criar o relatório: {e}")
-            raise e
\ No newline at end of file
+            raise e
+        finally:
+            if pasta_temporaria is not None:
+                shutil.rmtree(pasta_temporaria, ignore_errors=True)
@@ -1,4 +1,4 @@
-from Backend.Classes.leitor_schema import LeitorSchema
+from Backend.Classes.cache_schema import CacheSchema
 from pathlib import Path
 import jsonschema
 import logging
@@ -11,8 +11,9 @@ class Teste:
         self.conteudo = conteudo
         self.estado_atual = estado_atual
         self.justificativa_teste_invalido = justificativa_teste_invalido
-        self.argumentos_validator = ""
+        self.argumentos_validator = []  # Um elemento por flag ou valor (caminhos podem conter espaços)
         self.path_resultado = None
+        self.resultado_validacao = None # issues do validator já lidas (saída em memória)
         self.tempo_execucao = -1 # Deixar claro que nao foi testado
     
 
@@ -25,8 +26,7 @@ class Teste:
                 return True
             
             # Não é => tratar como arquivo de teste normal
-            schema = LeitorSchema(path_schema).return_dados_schema() 
-            jsonschema.validate(instance=self.conteudo, schema=schema)
+            CacheSchema.obter_validador(path_schema)(self.conteudo)
             self.estado_atual = "Válido"
             return True
             
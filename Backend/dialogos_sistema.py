@@ -59,12 +59,18 @@ Sistema de teste unitário para arquivos FHIR (versão 4.0.1)
 Sem argumentos, o comando fut executa todos os testes definidos por arquivos .yaml no diretório corrente.
 Indicando arquivos específicos como fut teste/x.yml y.yml, ele executa o teste do arquivo em teste/x.yml e o teste do arquivo y.yml no diretório atual.
 Usando curingas, por exemplo, fut patient-*.yml, ele executa todos os testes cujos nomes iniciam com patient- e terminam com .yml.
+Indicando uma pasta, por exemplo, fut testes/, ele executa os testes de todos os arquivos .yaml/.yml da pasta e das suas subpastas; padrões com ** percorrem qualquer número de pastas (ex: fut "testes/**/patient-*").
+Arquivos e pastas listados em um arquivo .futignore (mesma sintaxe do .gitignore) são ignorados nas buscas.
 
 {cls.get_ansi_code("textoSublinhado")}Comandos{cls.get_ansi_code("fimTextoColorido")}:
 {cls.get_ansi_code("ciano")}--help       {cls.get_ansi_code("fimTextoColorido")}\t\tAbri o menu atual e exibe mais informações sobre o programa
 {cls.get_ansi_code("ciano")}gui          {cls.get_ansi_code("fimTextoColorido")}\t\tInicializa a interface gráfica (Ainda não foi implementada)
 {cls.get_ansi_code("ciano")}template     {cls.get_ansi_code("fimTextoColorido")}\t\tGera um arquivo .yaml que segue o template de arquivos de teste
 {cls.get_ansi_code("ciano")}configuracoes{cls.get_ansi_code("fimTextoColorido")}\t\tPermite a edição de configurações globais do sistema
+{cls.get_ansi_code("ciano")}prefetch     {cls.get_ansi_code("fimTextoColorido")}\t\tBaixa os pacotes (IGs) dos testes e suas dependências sem executá-los (ex: fut prefetch teste/)
+{cls.get_ansi_code("ciano")}plan         {cls.get_ansi_code("fimTextoColorido")}		Compila o plano de execução (comandos, saídas, grupos de contexto e custo estimado) sem iniciar a JVM e o exibe como JSON; --saida exporta para um arquivo (ex: fut plan teste/ --saida plano.json)
+{cls.get_ansi_code("ciano")}--dry-run    {cls.get_ansi_code("fimTextoColorido")}		Mesmo que plan: exibe o plano de execução em vez de executar os testes (ex: fut --dry-run teste/x.yml)
+{cls.get_ansi_code("ciano")}--no-cache   {cls.get_ansi_code("fimTextoColorido")}\t\tExecuta os testes sem reutilizar resultados do cache (ex: fut --no-cache teste/x.yml)
 
 Mais detalhes em: {cls.get_ansi_code("textoHyperlink")}https://github.com/LeonardoCFilho/fut/blob/main/Documentacao/Plano_de_construcao.md{cls.get_ansi_code("fimTextoColorido")}"""
 
@@ -77,9 +83,38 @@ Mais detalhes em: {cls.get_ansi_code("textoHyperlink")}https://github.com/Leonar
  - {cls.get_ansi_code("ciano")}timeout (int):{cls.get_ansi_code("fimTextoColorido")} Define o tempo limite, em segundos, para a execução de cada teste. Exemplo de valor: `600` (10 minutos).
  - {cls.get_ansi_code("ciano")}max_threads (int):{cls.get_ansi_code("fimTextoColorido")} Especifica o número máximo de threads a serem usadas para executar os testes paralelamente. Exemplo de valor: `4`.
  - {cls.get_ansi_code("ciano")}requests_timeout (int):{cls.get_ansi_code("fimTextoColorido")} Define o tempo limite, em segundos, que o programa aguarda para downloads finalizar. Exemplo de valor: `600` (10 minutos).
+ - {cls.get_ansi_code("ciano")}modo_offline (bool):{cls.get_ansi_code("fimTextoColorido")} Executa sem nenhum acesso à rede: não verifica atualizações nem baixa o validator ou o Java (ambos precisam já estar instalados). Exemplo de valor: `False`.
+ - {cls.get_ansi_code("ciano")}intervalo_verificacao_validator_horas (int):{cls.get_ansi_code("fimTextoColorido")} Tempo mínimo, em horas, entre verificações de atualização do validator; novas versões são baixadas em segundo plano e usadas na execução seguinte. Exemplo de valor: `24`.
+ - {cls.get_ansi_code("ciano")}espelhos_download (str):{cls.get_ansi_code("fimTextoColorido")} URLs base de espelhos, separadas por vírgula, tentadas antes das URLs oficiais (o caminho do arquivo original é mantido). Exemplo de valor: `https://artefatos.interno/github`.
+ - {cls.get_ansi_code("ciano")}segmentos_download (int):{cls.get_ansi_code("fimTextoColorido")} Número de conexões paralelas usadas no download de arquivos grandes, como o Java (`1` desabilita). Exemplo de valor: `4`.
+ - {cls.get_ansi_code("ciano")}sha256_validator (str):{cls.get_ansi_code("fimTextoColorido")} SHA-256 do validator_cli.jar esperado; o download é rejeitado se o conteúdo for diferente e a verificação de atualizações é desativada (vazio não verifica). Exemplo de valor: `3f7a…` (64 caracteres hexadecimais).
+ - {cls.get_ansi_code("ciano")}controle_memoria (bool):{cls.get_ansi_code("fimTextoColorido")} Limita a quantidade de processos simultâneos do validator pela memória disponível e define o heap (-Xmx) de cada um. Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}memoria_por_validator_mb (int):{cls.get_ansi_code("fimTextoColorido")} Estimativa inicial de memória, em MB, de cada processo do validator (ajustada pelo pico observado durante a execução). Exemplo de valor: `1536`.
+ - {cls.get_ansi_code("ciano")}tamanho_maximo_lote (int):{cls.get_ansi_code("fimTextoColorido")} Número máximo de testes com o mesmo contexto validados por uma única execução do validator (`1` desabilita). Exemplo de valor: `20`.
+ - {cls.get_ansi_code("ciano")}usar_pool_validator (bool):{cls.get_ansi_code("fimTextoColorido")} Reutiliza processos do validator entre testes de mesmo contexto, evitando iniciar uma JVM por teste. Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}max_validacoes_por_trabalhador (int):{cls.get_ansi_code("fimTextoColorido")} Número de validações feitas por um processo do pool antes dele ser reciclado. Exemplo de valor: `500`.
+ - {cls.get_ansi_code("ciano")}limite_memoria_trabalhador_mb (int):{cls.get_ansi_code("fimTextoColorido")} Memória, em MB, que um processo do pool pode usar antes de ser reciclado. Exemplo de valor: `3072`.
+ - {cls.get_ansi_code("ciano")}perfil_jvm (str):{cls.get_ansi_code("fimTextoColorido")} Flags da JVM do validator: `inicializacao` (JVMs curtas, uma por teste), `vazao` (pool ou lotes grandes) ou `padrao` (sem flags). Exemplo de valor: `inicializacao`.
+ - {cls.get_ansi_code("ciano")}usar_cds (bool):{cls.get_ansi_code("fimTextoColorido")} Gera, na primeira execução de cada versão do validator, um arquivo de Class Data Sharing que acelera a inicialização da JVM. Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}usar_cache_resultados (bool):{cls.get_ansi_code("fimTextoColorido")} Reutiliza o resultado de testes cuja instância, contexto e versões do validator/Java não mudaram desde a última execução (ignorado com `fut --no-cache`). Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}tamanho_maximo_cache_mb (int):{cls.get_ansi_code("fimTextoColorido")} Tamanho máximo, em MB, do cache de resultados; os resultados usados há mais tempo são removidos primeiro. Exemplo de valor: `512`.
+ - {cls.get_ansi_code("ciano")}endereco_cache_remoto (str):{cls.get_ansi_code("fimTextoColorido")} Cache de resultados compartilhado entre máquinas: URL de um servidor com GET/PUT ou diretório compartilhado (NFS). Vazio desabilita. Exemplo de valor: `http://cache.interno:8080/fut`.
+ - {cls.get_ansi_code("ciano")}timeout_cache_remoto_ms (int):{cls.get_ansi_code("fimTextoColorido")} Tempo máximo, em milissegundos, de cada consulta ao cache remoto; após falhas seguidas ele é ignorado até o fim da execução. Exemplo de valor: `500`.
+ - {cls.get_ansi_code("ciano")}usar_java_sistema (bool):{cls.get_ansi_code("fimTextoColorido")} Usa o Java 17+ já instalado no sistema (JAVA_HOME ou PATH), quando encontrado, dispensando o download e a extração do JDK. Exemplo de valor: `False`.
+ - {cls.get_ansi_code("ciano")}usar_proxy_terminologia (bool):{cls.get_ansi_code("fimTextoColorido")} Inicia um proxy local, com cache em disco, entre o validator e os servidores de terminologia (`$validate-code`, `$expand`) e de pacotes; a taxa de acertos aparece no relatório. Exemplo de valor: `False`.
+ - {cls.get_ansi_code("ciano")}servidor_terminologia (str):{cls.get_ansi_code("fimTextoColorido")} Servidor de terminologia consultado pelo proxy. Exemplo de valor: `http://tx.fhir.org`.
+ - {cls.get_ansi_code("ciano")}validade_cache_terminologia_horas (int):{cls.get_ansi_code("fimTextoColorido")} Tempo, em horas, em que uma resposta é reutilizada sem consultar o servidor; respostas vencidas ainda são usadas se o servidor estiver inacessível. Exemplo de valor: `168`.
+ - {cls.get_ansi_code("ciano")}modo_replay_terminologia (bool):{cls.get_ansi_code("fimTextoColorido")} O proxy responde apenas com respostas já gravadas, sem acesso à rede (sempre ativo com `modo_offline`). Exemplo de valor: `False`.
+ - {cls.get_ansi_code("ciano")}prefetch_pacotes (bool):{cls.get_ansi_code("fimTextoColorido")} Baixa em paralelo os pacotes de `context.igs` e suas dependências assim que um teste os usa pela primeira vez, sem pausar a leitura dos demais testes; pacotes inexistentes são informados assim que identificados e os testes que os usam são marcados como inválidos. Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}servidor_pacotes (str):{cls.get_ansi_code("fimTextoColorido")} Registro de pacotes FHIR usado pelo prefetch e pelo proxy de terminologia. Exemplo de valor: `https://packages.fhir.org`.
+ - {cls.get_ansi_code("ciano")}compilar_recursos_locais (bool):{cls.get_ansi_code("fimTextoColorido")} Compila, uma vez por conjunto de arquivos, os recursos de `context.resources` (JSON) em um pacote local passado ao validator como um único `-ig`. Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}usar_executor_assincrono (bool):{cls.get_ansi_code("fimTextoColorido")} Sem o pool de processos, executa o validator por um executor asyncio: a saída é lida enquanto o processo roda (apenas as últimas linhas ficam em memória; com `armazenar_saida_validator` ela é gravada em um `.log` por teste) e, no timeout ou Ctrl+C, todo o grupo de processos é encerrado. Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}saida_validator_em_memoria (bool):{cls.get_ansi_code("fimTextoColorido")} A saída de cada teste é lida uma única vez e mantida em memória para o relatório; sem `armazenar_saida_validator` o arquivo é removido logo após a leitura e a pasta temporária fica em memória (`/dev/shm`) quando disponível. Exemplo de valor: `True`.
+ - {cls.get_ansi_code("ciano")}processos_leitura_yaml (int):{cls.get_ansi_code("fimTextoColorido")} Processos que leem os arquivos de teste em paralelo, em blocos (com o LibYAML, quando disponível); `0` usa o número de CPUs disponíveis e `1` lê tudo no processo principal. A vazão da leitura aparece nas métricas do relatório. Exemplo de valor: `0`.
+ - {cls.get_ansi_code("ciano")}usar_cache_testes (bool):{cls.get_ansi_code("fimTextoColorido")} Guarda em `Arquivos/cache_testes` os testes já lidos e validados pelo schema; arquivos que não mudaram (tamanho, data de modificação e conteúdo) são usados sem ler o YAML novamente. O cache é descartado quando o schema dos testes muda. Exemplo de valor: `True`.
 
 2. {cls.get_ansi_code("textoSublinhado")}[enderecamento]{cls.get_ansi_code("fimTextoColorido")}
- - {cls.get_ansi_code("ciano")}caminho_validator (str):{cls.get_ansi_code("fimTextoColorido")} Caminho personalizado para o arquivo `validator_cli.jar`, caso seja necessário sobrescrever o caminho padrão. Exemplo de valor: `~/Downloads/validator_cli.jar`.
+ - {cls.get_ansi_code("ciano")}caminho_validator (str):{cls.get_ansi_code("fimTextoColorido")} Caminho personalizado para o arquivo `validator_cli.jar`, caso seja necessário sobrescrever o caminho padrão. Exemplo de valor: `~/Downloads/validator_cli.jar`. O validator padrão e o JDK ficam no cache de ferramentas (`Arquivos/ferramentas`), que pode ser compartilhado entre execuções simultâneas e containers definindo a variável de ambiente `FUT_CACHE_FERRAMENTAS`.
  - {cls.get_ansi_code("ciano")}armazenar_saida_validator (bool):{cls.get_ansi_code("fimTextoColorido")} Indica se a saída do validador deve ser armazenada. Valores aceitos: `True` (armazenar saída) ou `False` (não armazenar). Exemplo de valor: `False`.
 
 3. {cls.get_ansi_code("textoSublinhado")}[relatorio]{cls.get_ansi_code("fimTextoColorido")}
@@ -1,6 +1,7 @@
 from Backend.Classes.gerador_template_teste import GeradorTemplateTeste
 from Backend.Classes.servico_execucao_teste import ServicoExecucaoTeste
 from Backend.Classes.coordenador_teste import CoordenadorTestes
+from Backend.Classes.detector_recursos import DetectorRecursos
 from Backend.Classes.gestor_caminho import GestorCaminho
 from Backend.dialogos_sistema import DialogosSistema  
 from pathlib import Path
@@ -53,7 +54,7 @@ class FachadaSistema:
         """
         try:
             path_arquivo_teste = [path_arquivo_teste]
-            return ServicoExecucaoTeste(self.path_fut).preparar_lista_Teste(path_arquivo_teste)
+            return ServicoExecucaoTeste(self.coordenador_testes.gestor_caminho).preparar_lista_Teste(path_arquivo_teste)
         except Exception as e:
             raise e
         
@@ -116,6 +117,16 @@ class FachadaSistema:
             return None
 
 
+    def obter_recursos_detectados(self) -> dict:
+        """
+        Obtém os recursos de CPU e memória detectados (incluindo limites de containers)
+
+        Returns:
+            dict: Recursos detectados usados para dimensionar a execução
+        """
+        return DetectorRecursos().obter_recursos()
+
+
     def atualizar_configuracao(self, nome_configuracao: str, novo_valor) -> bool:
         """
         Atualiza o valor de uma configuração
@@ -140,12 +151,13 @@ class FachadaSistema:
 
     # === OPERAÇÕES DE TESTE ===
 
-    def executar_testes_com_entrega_gradual(self, args):
+    def executar_testes_com_entrega_gradual(self, args, usar_cache: bool = True):
         """
         Executa testes em múltiplas threads com entrega gradual dos resultados
 
         Args:
             args: Argumentos determinando os testes a serem executados
+            usar_cache: Se False, ignora o cache de resultados
 
         Yields:
             Dict com informações do teste e porcentagem de progresso
@@ -158,13 +170,46 @@ class FachadaSistema:
         try:
             logger.info("Iniciando execução de testes (entrega gradual)")
             yield from self.coordenador_testes.executar_testes_completo(
-                args
+                args, usar_cache
             )
             logger.info("Execução com entrega gradual concluída")
         except Exception as e:
             logger.error(f"Erro durante execução dos testes: {e}")
             raise
 
+    def planejar_execucao(self, args, caminho_saida: Path = None) -> dict:
+        """
+        Compila o plano de execução dos testes sem iniciar nenhuma JVM (dry-run)
+
+        Args:
+            args: Argumentos determinando os testes
+            caminho_saida: Arquivo JSON onde o plano é exportado (opcional)
+
+        Returns:
+            dict: Plano de execução
+
+        Raises:
+            ValueError: Lista de testes vazia ou argumentos inválidos
+        """
+        logger.info("Compilando o plano de execução")
+        return self.coordenador_testes.planejar_execucao(args, caminho_saida)
+
+    def prefetch_pacotes(self, args) -> dict:
+        """
+        Baixa antecipadamente os pacotes (IGs) usados pelos testes e suas dependências
+
+        Args:
+            args: Argumentos determinando os testes cujos pacotes serão baixados
+
+        Returns:
+            dict: Pacotes em cache, instalados, ignorados, ausentes e com erro
+
+        Raises:
+            ValueError: Lista de testes vazia ou argumentos inválidos
+        """
+        logger.info("Iniciando prefetch de pacotes")
+        return self.coordenador_testes.prefetch_pacotes(args)
+
     # === UTILITÁRIOS DE INTERFACE ===
     
     def obter_dialogo(self, chave_dialogo: str) -> str:
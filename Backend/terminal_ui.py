@@ -1,9 +1,11 @@
 from Backend.dialogos_sistema import DialogosSistema
 from Backend.fachada_sistema import FachadaSistema
 import streamlit.web.cli as stcli
+from pathlib import Path
 import subprocess
 import threading
 import logging
+import json
 import time
 import sys
 import os
@@ -142,6 +144,16 @@ class TerminalUI:
         """Exibe o menu de configurações."""
         logger.info("Usuário solicitou o menu de configurações")
         print(DialogosSistema.obter_dialogo('configuracoes'))
+        self._mostrar_recursos_detectados()
+
+
+    def _mostrar_recursos_detectados(self):
+        """Exibe os recursos de CPU e memória detectados (cgroup/afinidade)."""
+        ciano = DialogosSistema.get_ansi_code("ciano")
+        resetar = DialogosSistema.get_ansi_code("fimTextoColorido")
+        print(f"\n{DialogosSistema.get_ansi_code('textoSublinhado')}Recursos detectados{resetar}:")
+        for nome_recurso, valor in self.fachada.obter_recursos_detectados().items():
+            print(f" - {ciano}{nome_recurso}:{resetar} {valor if valor is not None else 'sem limite/indisponível'}")
 
 
     def _ler_configuracao(self, nome_config: str):
@@ -198,9 +210,12 @@ class TerminalUI:
             tempo_inicio = time.time()
             progresso_minimo = 0.1
 
+            usar_cache = "--no-cache" not in argumentos
+            argumentos = [argumento for argumento in argumentos if argumento != "--no-cache"]
+
             self.iniciar_spinner()
             
-            for resultado in self.fachada.executar_testes_com_entrega_gradual(argumentos):
+            for resultado in self.fachada.executar_testes_com_entrega_gradual(argumentos, usar_cache):
                 if resultado[-1] >= progresso_minimo:
                     progresso = round(resultado[-1], 1)
                     tempo_decorrido = time.time() - tempo_inicio
@@ -216,6 +231,60 @@ class TerminalUI:
             print(f"Erro na execução dos testes: {e}")
 
 
+    def _planejar_execucao(self, argumentos: list[str]):
+        """Compila o plano de execução sem executar os testes e o exibe (ou exporta) como JSON.
+
+        Args:
+            argumentos (List[str]): Lista de argumentos determinando os testes (--saida <arquivo> exporta o plano).
+        """
+        logger.info("Usuário solicitou o plano de execução")
+        argumentos = [argumento for argumento in argumentos if argumento != "--dry-run"]
+        caminho_saida = None
+        if "--saida" in argumentos:
+            indice = argumentos.index("--saida")
+            if indice + 1 >= len(argumentos):
+                print("Uso: fut plan [testes] [--saida plano.json]")
+                return
+            caminho_saida = Path(argumentos[indice + 1])
+            argumentos = argumentos[:indice] + argumentos[indice + 2:]
+        try:
+            plano = self.fachada.planejar_execucao(argumentos, caminho_saida)
+        except Exception as e:
+            print(f"Erro ao compilar o plano de execução: {e}")
+            return
+
+        if caminho_saida is None:
+            print(json.dumps(plano, indent=4, ensure_ascii=False))
+            return
+        ciano = DialogosSistema.get_ansi_code("ciano")
+        resetar = DialogosSistema.get_ansi_code("fimTextoColorido")
+        print(f"{ciano}Plano:{resetar} {plano['numero_de_testes_executaveis']}/{plano['numero_de_testes']} testes executáveis em {plano['numero_de_grupos']} grupos de contexto, custo estimado de {plano['custo_estimado_total']:.0f}s (planejado em {plano['tempo_planejamento']}s)")
+        print(f"Plano exportado para {caminho_saida}")
+
+
+    def _prefetch_pacotes(self, argumentos: list[str]):
+        """Baixa os pacotes usados pelos testes e exibe o resumo.
+
+        Args:
+            argumentos (List[str]): Lista de argumentos determinando os testes.
+        """
+        logger.info("Usuário solicitou o prefetch de pacotes")
+        try:
+            self.iniciar_spinner()
+            resultado = self.fachada.prefetch_pacotes(argumentos)
+            self.parar_spinner()
+        except Exception as e:
+            self.parar_spinner()
+            print(f"Erro ao baixar os pacotes: {e}")
+            return
+
+        ciano = DialogosSistema.get_ansi_code("ciano")
+        resetar = DialogosSistema.get_ansi_code("fimTextoColorido")
+        print(f"{ciano}Pacotes:{resetar} {len(resultado['instalados'])} baixados, {len(resultado['em_cache'])} já em cache, {len(resultado['ignorados'])} ignorados")
+        for referencia, motivo in {**resultado['ausentes'], **resultado['erros']}.items():
+            print(f" - {referencia}: {motivo}")
+
+
     def menu_principal(self, argumentos: list[str] = None):
         """Exibe o menu principal e processa comandos.
 
@@ -235,6 +304,10 @@ class TerminalUI:
                 self._mostrar_interface_grafica()
             case "template":
                 self._criar_template()
+            case "prefetch":
+                self._prefetch_pacotes(argumentos[1:])
+            case "plan":
+                self._planejar_execucao(argumentos[1:])
             case "configuracoes":
                 if len(argumentos) == 1:
                     self._mostrar_menu_configuracoes()
@@ -244,6 +317,8 @@ class TerminalUI:
                     self._atualizar_configuracao(argumentos[1], argumentos[2])
                 else:
                     print("Uso: fut configuracoes [nome] [valor]")
+            case _ if "--dry-run" in argumentos:
+                self._planejar_execucao(argumentos)
             case _:
                 print("Iniciando testes!")
                 if any(x in ["help", "ajuda"] for x in argumentos):
@@ -1,4 +1,5 @@
 from pathlib import Path
+import multiprocessing
 import sys
 import logging 
 from Backend.fachada_sistema import FachadaSistema
@@ -24,6 +25,9 @@ def organizarLogs(pathLog: Path):
 
 
 if __name__ == "__main__":
+    # Executáveis congelados (PyInstaller) iniciam os processos de leitura a partir deste ponto de entrada
+    multiprocessing.freeze_support()
+
     # Caminhos utilizados no nosso projeto
     path_arquivos = FachadaSistema().obter_caminho('arquivos')
     pathLog  = path_arquivos / 'fut_1.log'